@@ -42,12 +42,18 @@
 # SOFTWARE.
 #
 
+import os
 import threading
 from core.event_bus import EventBus
 from core.plugin_manager import PluginManager
+from core.plugin_watcher import PluginWatcher
 from core.scenario_parser import ScenarioParser
 from core.scenario_engine import ScenarioEngine
 from core.reporter import Reporter
+from core.config_loader import ConfigLoader
+from core.compiled_scenario import (
+    CompiledScenario, iter_candump_events, iter_nmea_events, merge_sources, write_compiled_scenario
+)
 
 class APIInterface:
     """
@@ -99,14 +105,20 @@ class APIInterface:
         self.plugin_dir = plugin_dir
 
         self.event_bus = EventBus(logger)
-        self.plugin_manager = PluginManager(logger, self.event_bus, plugin_dir=plugin_dir)
+        self.event_bus.configure(ConfigLoader.get("plugins"))
+        self.plugin_manager = PluginManager(
+            logger, self.event_bus, plugin_dir=plugin_dir, settings=ConfigLoader.get("plugins")
+        )
         self.parser = ScenarioParser(logger)
         self.engine = ScenarioEngine(logger, self.event_bus)
         self.reporter = Reporter()
 
+        self.plugin_watcher = None
+
         self.thread = None
         self.running = False
         self.events = []
+        self.topics = set()  # 'target.action' topics used by the loaded scenario
 
         self.on_status = None
         self.on_log = None
@@ -117,35 +129,94 @@ class APIInterface:
         """
         Parses a YAML scenario file and prepares its events for execution.
 
+        Compiled `.orsb` files (see `compile_scenario`) are memory-mapped instead
+        of parsed; their events were validated when they were compiled.
+
         Args:
-            scenario_path (str): Path to the scenario YAML file.
+            scenario_path (str): Path to the scenario YAML or .orsb file.
 
         Returns:
             bool: True if the scenario was successfully loaded.
 
         Raises:
-            ValueError: If no events are found in the scenario.
+            ValueError: If no events are found in the scenario, or if event params
+                        do not match the schemas declared by the plugins.
         """
-        self.events = self.parser.load(scenario_path)
+        if isinstance(self.events, CompiledScenario):
+            self.events.close()
+
+        if scenario_path.endswith(".orsb"):
+            self.events = CompiledScenario(scenario_path)
+            self.topics = self.events.topics
+        else:
+            self.events = self.parser.load(scenario_path)
+            self.topics = {f"{event['target']}.{event['action']}" for event in self.events}
         self.reporter.metadata["scenario_file"] = scenario_path
 
         if not self.events:
             raise ValueError("No valid events loaded.")
 
+        if not isinstance(self.events, CompiledScenario):
+            self.plugin_manager.validate_events(self.events)
+
         self._log(f"Loaded {len(self.events)} events from scenario.")
         return True
 
+    def compile_scenario(self, sources, output_path):
+        """
+        Compiles scenario sources into a single binary `.orsb` file.
+
+        Sources are merged by time. Supported inputs are YAML scenarios (parsed and
+        schema-validated), NMEA logs (`.nmea`, as gps.set_location events) and
+        `candump -L` logs (`.log` / `.candump`, as can.send events).
+
+        Args:
+            sources (list[str]): Input file paths.
+            output_path (str): Path of the .orsb file to write.
+
+        Returns:
+            int: Number of events written.
+
+        Raises:
+            ValueError: If a source type is unknown or a YAML source has no valid events.
+        """
+        streams = []
+        for source in sources:
+            extension = os.path.splitext(source)[1].lower()
+            if extension in (".yaml", ".yml"):
+                events = self.parser.load(source)
+                if not events:
+                    raise ValueError(f"No valid events loaded from {source}.")
+                self.plugin_manager.validate_events(events)
+                streams.append(events)
+            elif extension == ".nmea":
+                streams.append(iter_nmea_events(source))
+            elif extension in (".log", ".candump"):
+                streams.append(iter_candump_events(source))
+            else:
+                raise ValueError(f"Unsupported scenario source: {source}")
+
+        count = write_compiled_scenario(merge_sources(streams), output_path, self.parser.variables)
+        self._log(f"Compiled {count} events from {len(sources)} source(s) into {output_path}")
+        return count
+
     def start(self):
         """
         Starts the simulation in a background thread.
 
-        Loads plugins, begins execution of scenario events, and monitors progress.
+        Loads the plugins used by the scenario (all of them when `plugins.lazy` is
+        disabled in the config), begins execution of scenario events, and monitors progress.
+        Plugins loaded by earlier runs are reused; call `shutdown()` to release them.
         """
         if self.running:
             self._log("Simulation already running.")
             return
 
-        self.plugin_manager.load_plugins()
+        self.reporter.reset()
+        self.event_bus.reset_timing()
+        lazy = ConfigLoader.get("plugins").get("lazy", True)
+        self.plugin_manager.load_plugins(self.topics if lazy else None)
+        self.plugin_manager.prepare_events(self.events)
         self._log("Plugins loaded.")
 
         self.running = True
@@ -166,9 +237,10 @@ class APIInterface:
             self._status("error")
             self._log(f"Simulation failed: {e}")
         finally:
-            self.plugin_manager.shutdown_plugins()
+            self.reporter.metadata["plugin_timing"] = self.event_bus.timing_report()
             self.reporter.write_json("report.json")
             self._log("Simulation report written to report.json")
+            self.plugin_manager.reset_plugins()  # Keep plugins warm for the next run
             self.running = False
 
     def stop(self):
@@ -180,6 +252,42 @@ class APIInterface:
             self._status("stopped")
             self._log("Simulation stopped by user.")
 
+    def watch_plugins(self, interval=None):
+        """
+        Starts hot-reloading plugins whose `main.py` or `plugin.yaml` change on disk.
+
+        Args:
+            interval (float): Polling interval in seconds; defaults to
+                              `plugins.watch_interval` from the config.
+        """
+        if self.plugin_watcher is None:
+            if interval is None:
+                interval = ConfigLoader.get("plugins").get("watch_interval", 1.0)
+            self.plugin_watcher = PluginWatcher(self.plugin_manager, self.logger, interval)
+        self.plugin_watcher.start()
+
+    def shutdown(self):
+        """
+        Stops any running simulation and shuts down all loaded plugins.
+
+        If a simulation ran, its report.json is rewritten to include the plugin
+        shutdown timings. Call once when the application exits.
+        """
+        if self.plugin_watcher is not None:
+            self.plugin_watcher.stop()
+        self.stop()
+        if self.thread is not None:
+            self.thread.join()
+        loaded = list(self.reporter.metadata["plugins"])
+        self.plugin_manager.shutdown_plugins()
+        if self.thread is not None:
+            # Shutdown timings only exist now; keep the last run's plugin list in the report
+            self.reporter.metadata["plugins"] = loaded
+            self.reporter.write_json("report.json")
+            self.reporter.metadata["plugins"] = []
+        if isinstance(self.events, CompiledScenario):
+            self.events.close()
+
     def _log(self, msg):
         """
         Emits a log message through the registered callback or logger.
@@ -30,6 +30,8 @@ class BasePlugin:
     - on_init(): Called once at startup for initialization.
     - on_event(): Called when a subscribed event is published.
     - on_shutdown(): Called when the simulation ends.
+
+    Plugins stay loaded between runs; override on_reset() to clear per-run state.
     """
 
     def on_init(self, config):
@@ -41,17 +43,40 @@ class BasePlugin:
         """
         raise NotImplementedError("Plugin must implement on_init()")
 
+    def prepare(self, topic, data):
+        """
+        Called before the run for each distinct payload the plugin will receive.
+
+        Override it to precompile payloads (e.g. encode frames) so `on_event` has
+        less to do. The default implementation does nothing.
+
+        Args:
+            topic (str): The topic of the event (e.g., "can.send").
+            data (dict): Parameters of the event, already validated against the schema.
+        """
+        pass
+
     def on_event(self, topic, data, timestamp):
         """
         Called when a relevant event is published on the EventBus.
 
         Args:
             topic (str): The topic of the event (e.g., "gps.set_location").
-            data (dict): Parameters passed with the event.
+            data (dict): Parameters passed with the event. Read-only: loop
+                         iterations and repeated imports share one dict.
             timestamp (float): The simulation time when the event is triggered.
         """
         raise NotImplementedError("Plugin must implement on_event()")
 
+    def on_reset(self):
+        """
+        Called after each run while the plugin stays loaded for the next one.
+
+        Clears per-run state only; resources such as bus handles or sockets are
+        meant to stay open. The default implementation does nothing.
+        """
+        pass
+
     def on_shutdown(self):
         """
         Called once at the end of the simulation to clean up resources.
@@ -0,0 +1,299 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import os
+import mmap
+import heapq
+import shutil
+import struct
+import marshal
+import tempfile
+from operator import itemgetter
+from core.expressions import compile_expression
+from utils.nmea import parse_nmea
+
+MAGIC = b"ORSB"
+VERSION = 1
+
+# magic, version, reserved, event count, index offset, metadata offset
+_HEADER = struct.Struct("<4sHHQQQ")
+# time, topic id, flags, payload offset, payload length
+_ENTRY = struct.Struct("<dHHQI")
+
+_FLAG_CONDITION = 0x1  # Payload is (params, condition) instead of params
+
+
+def write_compiled_scenario(events, path, variables=None):
+    """
+    Writes time-sorted events into a binary scenario file (.orsb).
+
+    Layout: a fixed-size header, a payload heap of marshalled params, a
+    fixed-width index of (time, topic id, flags, payload offset, payload length)
+    entries, and a metadata block with the topic table and scenario variables.
+    Events are streamed: the index is spooled to a temporary file, so memory use
+    does not depend on the number of events.
+
+    Args:
+        events (iterable[dict]): Events sorted by time, as produced by ScenarioParser.
+        path (str): Output file path.
+        variables (dict): Scenario variables, used to compile conditions on read.
+
+    Returns:
+        int: Number of events written.
+
+    Raises:
+        ValueError: If events are not sorted by time.
+    """
+    topic_ids = {}
+    topics = []
+    count = 0
+    last_time = float("-inf")
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as out, tempfile.TemporaryFile() as index:
+            out.write(b"\0" * _HEADER.size)
+            offset = _HEADER.size
+
+            for event in events:
+                event_time = float(event["time"])
+                if event_time < last_time:
+                    raise ValueError(f"Events must be sorted by time ({event_time} after {last_time})")
+                last_time = event_time
+
+                topic = (event["target"], event["action"])
+                topic_id = topic_ids.get(topic)
+                if topic_id is None:
+                    if len(topics) > 0xFFFF:
+                        raise ValueError("Too many distinct topics for the .orsb format")
+                    topic_id = topic_ids[topic] = len(topics)
+                    topics.append(topic)
+
+                params = event.get("params") or {}
+                condition = event.get("condition")
+                flags = 0
+                if condition is not None:
+                    payload = marshal.dumps((params, str(condition)))
+                    flags |= _FLAG_CONDITION
+                else:
+                    payload = marshal.dumps(params)
+
+                out.write(payload)
+                index.write(_ENTRY.pack(event_time, topic_id, flags, offset, len(payload)))
+                offset += len(payload)
+                count += 1
+
+            index_offset = offset
+            index.seek(0)
+            shutil.copyfileobj(index, out)
+
+            metadata_offset = index_offset + count * _ENTRY.size
+            out.write(marshal.dumps({"topics": topics, "variables": variables or {}}))
+            out.seek(0)
+            out.write(_HEADER.pack(MAGIC, VERSION, 0, count, index_offset, metadata_offset))
+
+        os.replace(tmp_path, path)
+    except Exception:
+        # Leave no partial file next to the target
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return count
+
+
+class CompiledScenario:
+    """
+    Read-only view of a binary scenario file (.orsb), usable by the ScenarioEngine
+    in place of an event list.
+
+    The file is memory-mapped: `len()` and topic lookups read only the header and
+    metadata, and iteration decodes one fixed-width index entry and its payload at
+    a time. Startup cost and resident memory therefore do not grow with the
+    scenario length.
+
+    Example:
+        events = CompiledScenario("drive.orsb")
+        engine.run(events)
+    """
+
+    def __init__(self, path):
+        """
+        Opens and maps a compiled scenario.
+
+        Args:
+            path (str): Path to the .orsb file.
+
+        Raises:
+            ValueError: If the file is not a supported .orsb file.
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty scenario file: {path}") from None
+
+        magic, version, _, count, index_offset, metadata_offset = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a compiled scenario (v{VERSION}): {path}")
+
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._map.madvise(mmap.MADV_SEQUENTIAL)
+
+        metadata = marshal.loads(self._map[metadata_offset:])
+        self._count = count
+        self._index_offset = index_offset
+        self._topics = [tuple(topic) for topic in metadata["topics"]]
+        self.variables = metadata.get("variables", {})
+        self._conditions = {}  # Condition source -> compiled function
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def topics(self):
+        """
+        set[str]: All 'target.action' topics used by the scenario.
+        """
+        return {f"{target}.{action}" for target, action in self._topics}
+
+    def __iter__(self):
+        """
+        Yields events in time order, decoded on demand from the mapped file.
+
+        Yields:
+            dict: Events with 'time', 'target', 'action', 'params' and, when
+                  present, 'condition' / 'condition_fn'.
+        """
+        data = self._map
+        topics = self._topics
+        unpack = _ENTRY.unpack_from
+        loads = marshal.loads
+        position = self._index_offset
+
+        for _ in range(self._count):
+            event_time, topic_id, flags, offset, length = unpack(data, position)
+            position += _ENTRY.size
+            target, action = topics[topic_id]
+            payload = loads(data[offset:offset + length])
+
+            if flags & _FLAG_CONDITION:
+                params, condition = payload
+                yield {
+                    "time": event_time, "target": target, "action": action, "params": params,
+                    "condition": condition, "condition_fn": self._condition(condition),
+                }
+            else:
+                yield {"time": event_time, "target": target, "action": action, "params": payload}
+
+    def _condition(self, source):
+        """
+        Compiles a condition once per distinct source text.
+
+        Args:
+            source (str): Condition expression.
+
+        Returns:
+            callable: Compiled condition.
+        """
+        compiled = self._conditions.get(source)
+        if compiled is None:
+            compiled = self._conditions[source] = compile_expression(source, self.variables)
+        return compiled
+
+    def close(self):
+        """
+        Unmaps and closes the file.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def iter_nmea_events(path):
+    """
+    Converts an NMEA log into `gps.set_location` events, using the vectorized
+    NMEA parser (`utils.nmea`), shared with the GPS replay plugin.
+
+    Sim time 0 is the first epoch; GGA, RMC and VTG sentences with valid
+    checksums are used, so fixes also carry speed and heading when logged.
+
+    Args:
+        path (str): Path to the NMEA file.
+
+    Yields:
+        dict: Time-sorted events.
+    """
+    for offset, fix in parse_nmea(path).fixes():
+        yield {"time": offset, "target": "gps", "action": "set_location", "params": fix}
+
+
+def iter_candump_events(path):
+    """
+    Converts a `candump -L` log into `can.send` events.
+
+    Lines look like `(1436509052.249713) vcan0 0C9#1F40`; sim time 0 is the first frame.
+
+    Args:
+        path (str): Path to the log file.
+
+    Yields:
+        dict: Time-sorted events.
+    """
+    base = None
+    with open(path, "r", errors="replace") as f:
+        for line in f:
+            fields = line.split()
+            if len(fields) < 3 or not fields[0].startswith("(") or "#" not in fields[2]:
+                continue
+            timestamp = float(fields[0][1:-1])
+            can_id, _, payload = fields[2].partition("#")
+            if payload.startswith(("R", "r")):
+                continue  # Remote frames carry no data
+            # 8 hex digits mark a 29-bit ID, as in plugins/can/replay.py
+            params = {"id": int(can_id, 16), "extended": len(can_id) > 3}
+            if payload.startswith("#"):
+                flags = int(payload[1:2], 16)  # CAN-FD: "##<flags><data>"
+                params["fd"] = True
+                params["bitrate_switch"] = bool(flags & 0x1)
+                payload = payload[2:]
+            params["data"] = bytes.fromhex(payload)
+            if base is None:
+                base = timestamp
+            yield {"time": timestamp - base, "target": "can", "action": "send", "params": params}
+
+
+def merge_sources(streams):
+    """
+    Merges time-sorted event streams lazily.
+
+    Args:
+        streams (list[iterable[dict]]): Event streams.
+
+    Returns:
+        iterator[dict]: Events in time order.
+    """
+    return heapq.merge(*streams, key=itemgetter("time"))
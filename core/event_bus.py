@@ -21,7 +21,14 @@
 # SOFTWARE.
 #
 
+import time
+import heapq
+import queue
+import itertools
+import threading
+import weakref
 from core.reporter import Reporter
+from utils.logger import Logger
 reporter = Reporter()
 
 class EventBus:
@@ -31,6 +38,14 @@ class EventBus:
 
     Events are routed based on a topic string in the form 'target.action'
     (e.g., 'can.send', 'gps.update').
+
+    Plugins can also hand the engine events to publish later (`schedule`,
+    `schedule_stream`), e.g. a replayed log; the ScenarioEngine merges them
+    with the scenario's own events in time order.
+
+    Each `on_event()` call is timed against the plugin's budget. Overruns are
+    counted and logged, and a plugin that keeps overrunning is quarantined: its
+    events are delivered on a background thread or skipped (see `configure`).
     """
 
     def __init__(self, logger):
@@ -41,45 +56,578 @@ class EventBus:
             logger (Logger): An instance of the project's logger to output debug/info messages.
         """
         self.logger = logger
-        self.subscriptions = {}  # Maps topic (str) to a list of plugin instances
+        self.subscriptions = {}  # Maps topic (str) to a list of plugin instances; replaced, never mutated
+        self._lock = threading.Lock()  # Serializes routing table updates
+        self.signals = {}  # Latest published values, read by scenario `condition:` expressions
+        self.resolver = None  # Called with a topic the first time it is published, to load its plugins
+        self._timing = {}  # Plugin -> PluginTiming
+        self._filters = {}  # Plugin -> {topic: filters declared in plugin.yaml}
+        self._retired = weakref.WeakSet()  # Plugins removed from the bus; late deliveries are dropped
+        self._clock_start = None  # perf_counter() at simulation time zero
+        self._scheduled = []  # Heap of (time, seq, item, stream, active) for the engine
+        self._schedule_seq = itertools.count()  # Keeps streams with equal times in FIFO order
+        self._schedule_changed = threading.Condition()
+        self._reserved = set()  # Tokens of streams still being prepared, see `reserve_stream`
+        self.configure({})
 
     def subscribe(self, topic, plugin):
         """
-        Subscribes a plugin to a specific event topic.
+        Subscribes a plugin to a specific event topic. Subscribing the same plugin
+        to a topic again has no effect.
 
         Args:
             topic (str): The event topic to listen for (e.g., "echo.say").
             plugin (BasePlugin): An instance of a plugin that implements on_event().
         """
-        if topic not in self.subscriptions:
-            self.subscriptions[topic] = []
-        self.subscriptions[topic].append(plugin)
-        self.logger.debug(f"{plugin.name} subscribed to {topic}")
+        def add(subscriptions):
+            listeners = subscriptions.setdefault(topic, [])
+            if plugin not in listeners:
+                listeners.append(plugin)
+
+        self._retired.discard(plugin)
+        self._update_subscriptions(add)
+        self.logger.debug("%s subscribed to %s", plugin.name, topic)
+
+    def unsubscribe(self, plugin):
+        """
+        Removes a plugin from every topic it is subscribed to.
+
+        Args:
+            plugin (BasePlugin): The plugin instance to remove.
+        """
+        def remove(subscriptions):
+            for listeners in subscriptions.values():
+                if plugin in listeners:
+                    listeners.remove(plugin)
+
+        self._update_subscriptions(remove)
+        self._release(plugin)
+
+    def replace_plugin(self, old_plugin, new_plugin, topics):
+        """
+        Swaps a plugin instance for another in one step, e.g. after a hot reload.
+
+        Events already being dispatched finish with the old instance, and this
+        returns only once they have, so the caller can shut it down safely; every
+        later publish sees only the new one. Where both subscribe to a topic, the
+        new instance takes the old one's place in the delivery order.
+
+        Args:
+            old_plugin (BasePlugin): The instance to remove.
+            new_plugin (BasePlugin): The instance to subscribe instead.
+            topics (list[str]): Topics the new instance subscribes to.
+        """
+        def swap(subscriptions):
+            for topic, listeners in subscriptions.items():
+                if old_plugin in listeners:
+                    index = listeners.index(old_plugin)
+                    if topic in topics:
+                        listeners[index] = new_plugin
+                    else:
+                        del listeners[index]
+            for topic in topics:
+                listeners = subscriptions.setdefault(topic, [])
+                if new_plugin not in listeners:
+                    listeners.append(new_plugin)
+
+        self._update_subscriptions(swap)
+        self._release(old_plugin)
+        self.logger.debug("%s replaced in the routing table", new_plugin.name)
+
+    def _update_subscriptions(self, change):
+        """
+        Applies a change to a copy of the routing table and installs the copy.
+
+        `publish` reads `subscriptions` without locking, so the table and its lists
+        are never modified in place (copy-on-write).
+
+        Args:
+            change (callable): Receives the copied table and modifies it.
+        """
+        with self._lock:
+            subscriptions = {topic: list(listeners) for topic, listeners in self.subscriptions.items()}
+            change(subscriptions)
+            self.subscriptions = subscriptions
+
+    def set_filters(self, plugin, filters):
+        """
+        Records which part of a topic's traffic a plugin is interested in, as
+        declared under `filters` in its plugin.yaml subscriptions. Publishers of
+        high-rate topics read it through `interest()`; delivery is not filtered.
+
+        Set them before subscribing the plugin, so publishers never see the
+        subscription without its filters.
+
+        Args:
+            plugin (BasePlugin): Subscriber.
+            filters (dict): Topic -> list of filter specs; empty or None to clear.
+        """
+        if filters:
+            self._filters[plugin] = filters
+        else:
+            self._filters.pop(plugin, None)
+
+    def interest(self, topic):
+        """
+        Combines the filters of every plugin subscribed to a topic (wildcard
+        subscribers are not counted).
+
+        Args:
+            topic (str): Event topic, e.g. 'can.rx'.
+
+        Returns:
+            list or None: Filter specs wanted by the subscribers (empty when nobody
+                          subscribes), or None if a subscriber wants everything.
+        """
+        wanted = []
+        for plugin in self.subscriptions.get(topic, ()):
+            filters = self._filters.get(plugin, {}).get(topic)
+            if not filters:
+                return None
+            wanted.extend(filters)
+        return wanted
+
+    def start_clock(self):
+        """
+        Marks simulation time zero. Called by the ScenarioEngine when a run starts.
+        """
+        self._clock_start = time.perf_counter()
+
+    def sim_time(self):
+        """
+        Returns the current simulation time, so plugins that stream on their own
+        threads (e.g. log replay) can pace against the engine rather than their
+        own start time.
+
+        Returns:
+            float: Seconds since the start of the run, or None between runs.
+        """
+        start = self._clock_start
+        return None if start is None else time.perf_counter() - start
+
+    def stop_clock(self):
+        """
+        Marks the end of a run; `sim_time()` returns None until the next one.
+        """
+        self._clock_start = None
+
+    def schedule(self, topic, data, at):
+        """
+        Queues one event for the engine to publish at simulation time `at`.
+
+        Args:
+            topic (str): Event topic.
+            data (dict): Event payload.
+            at (float): Simulation time in seconds.
+        """
+        self.schedule_stream(((at, topic, data),))
+
+    def schedule_stream(self, stream, active=None):
+        """
+        Hands the engine a time-ordered stream of events, published at their
+        simulation times alongside the scenario events.
+
+        Items are pulled one at a time as the previous one is published, so a
+        stream can be a generator over a large file. The engine waits for the
+        next item on a condition variable; nothing sleeps per item.
+
+        Args:
+            stream (iterable): (sim_time, topic, data) tuples in time order.
+            active (callable): Checked before each item is published; once it
+                               returns False the rest of the stream is dropped.
+        """
+        self._push_stream(iter(stream), active)
+
+    def _push_stream(self, stream, active):
+        """
+        Queues the next item of a stream, if any.
+        """
+        try:
+            item = next(stream, None)
+        except Exception as e:
+            self.logger.error("Scheduled event stream failed: %s", e)
+            return
+        if item is None:
+            return
+        with self._schedule_changed:
+            heapq.heappush(self._scheduled, (item[0], next(self._schedule_seq), item, stream, active))
+            self._schedule_changed.notify_all()
+
+    def reserve_stream(self):
+        """
+        Announces a stream that is still being prepared, e.g. a log being parsed
+        on a worker thread, so the engine does not end the run before it arrives.
+
+        Call `release_stream` with the returned token once the stream has been
+        handed over with `schedule_stream`, or was abandoned. Reservations are
+        dropped at the end of a run.
+
+        Returns:
+            object: Reservation token.
+        """
+        token = object()
+        with self._schedule_changed:
+            self._reserved.add(token)
+        return token
+
+    def release_stream(self, token):
+        """
+        Ends a reservation made with `reserve_stream`.
+
+        Args:
+            token (object): Reservation token.
+        """
+        with self._schedule_changed:
+            self._reserved.discard(token)
+            self._schedule_changed.notify_all()
+
+    def streams_reserved(self):
+        """
+        Returns:
+            bool: True while a reserved stream has been neither scheduled nor released.
+        """
+        return bool(self._reserved)
+
+    def next_scheduled(self):
+        """
+        Returns:
+            float: Simulation time of the earliest scheduled event, or None.
+        """
+        scheduled = self._scheduled
+        return scheduled[0][0] if scheduled else None
+
+    def publish_scheduled(self):
+        """
+        Publishes the earliest scheduled event and queues the next item of its stream.
+
+        Called by the ScenarioEngine when the event is due.
+        """
+        with self._schedule_changed:
+            if not self._scheduled:
+                return
+            _, _, item, stream, active = heapq.heappop(self._scheduled)
+        if active is not None and not active():
+            return  # Cancelled; the rest of the stream is dropped with it
+        at, topic, data = item
+        Logger.set_sim_time(at)
+        self.publish(topic, data, at)
+        self._push_stream(stream, active)
+
+    def wait_scheduled(self, timeout, expected=None):
+        """
+        Sleeps up to `timeout` seconds, waking early when an event is scheduled
+        or `wake()` is called.
+
+        Args:
+            timeout (float): Seconds to wait at most.
+            expected (float): The `next_scheduled()` time the caller saw; if it
+                              changed meanwhile, returns at once.
+        """
+        with self._schedule_changed:
+            if self.next_scheduled() == expected:
+                self._schedule_changed.wait(timeout)
+
+    def wait_reserved(self):
+        """
+        Sleeps while nothing is scheduled but a reserved stream is outstanding,
+        until it is scheduled or released, or `wake()` is called.
+        """
+        with self._schedule_changed:
+            if self._reserved and not self._scheduled:
+                self._schedule_changed.wait()
+
+    def wake(self):
+        """
+        Wakes an engine waiting in `wait_scheduled`, e.g. to stop a run.
+        """
+        with self._schedule_changed:
+            self._schedule_changed.notify_all()
+
+    def clear_scheduled(self):
+        """
+        Drops every scheduled event and stream reservation, e.g. at the end of a run.
+        """
+        with self._schedule_changed:
+            self._scheduled = []
+            self._reserved = set()
+
+    def set_signal(self, name, value):
+        """
+        Publishes a named value into the signal state used by scenario conditions.
+
+        Args:
+            name (str): Signal name (e.g., "vehicle.speed").
+            value (object): Latest value.
+        """
+        self.signals[name] = value
 
     def publish(self, topic, data, timestamp):
+        """
+        Records the event, updates the signal state and delivers it to subscribers.
+
+        Every published event updates the signals `<topic>` (the whole payload) and
+        `<target>.<key>` for each payload key, e.g. `gps.lat` after `gps.set_location`.
+        The first time a topic is published, `resolver` (if set) may load the
+        plugins subscribed to it.
+
+        Args:
+            topic (str): Event topic ('target.action').
+            data (dict): Event payload.
+            timestamp (float): Simulation time in seconds.
+        """
         reporter.log_event(topic, data, timestamp) 
-        listeners = self.subscriptions.get(topic, [])
-        wildcard_listeners = self.subscriptions.get("*", [])
+
+        if isinstance(data, dict):
+            signals = self.signals
+            signals[topic] = data
+            target = topic.split(".", 1)[0]
+            for key, value in data.items():
+                signals[f"{target}.{key}"] = value
+
+        subscriptions = self.subscriptions  # One consistent snapshot per dispatch
+        listeners = subscriptions.get(topic)
+        if listeners is None:
+            if self.resolver is not None:
+                self.resolver(topic)
+            # Remember the topic, so the resolver only runs once for it
+            self._update_subscriptions(lambda table: table.setdefault(topic, []))
+            subscriptions = self.subscriptions
+            listeners = subscriptions[topic]
+        wildcard_listeners = subscriptions.get("*", [])
 
         if not listeners and not wildcard_listeners:
-            self.logger.warn(f"No subscribers for topic: {topic}")
+            self.logger.warn("No subscribers for topic: %s", topic)
             return
 
-        # Regular topic listeners
+        # Regular topic listeners, then wildcard listeners (e.g., EchoPlugin)
         for plugin in listeners:
-            try:
-                plugin.on_event(topic, data, timestamp)
-                reporter.log_plugin_response(plugin.name, topic, "ok", timestamp) 
-            except Exception as e:
-                self.logger.error(f"Plugin '{plugin.name}' failed on {topic}: {e}")
-                reporter.log_error(plugin.name, topic, e) 
-
-        # Wildcard listeners (e.g., EchoPlugin)
+            self._deliver(plugin, topic, data, timestamp)
         for plugin in wildcard_listeners:
+            self._deliver(plugin, topic, data, timestamp)
+
+    def _deliver(self, plugin, topic, data, timestamp):
+        """
+        Calls a plugin's `on_event()`, measuring it against the plugin's time budget.
+
+        Quarantined plugins get the event on their background thread, or not at all.
+
+        Args:
+            plugin (BasePlugin): Subscriber.
+            topic (str): Event topic.
+            data (dict): Event payload.
+            timestamp (float): Simulation time in seconds.
+        """
+        timing = self._timing.get(plugin)
+        if timing is None:
+            if plugin in self._retired:
+                return  # Removed after this publish took its routing snapshot
+            timing = self._timing[plugin] = PluginTiming(self.default_budget)
+        if timing.quarantined:
+            if timing.worker is not None:
+                timing.worker.put((topic, data, timestamp))
+            return
+
+        # Held for the call, so `_release` waits for it before the plugin is shut down
+        with timing.dispatching:
+            if timing.retired:
+                return
+            started = time.perf_counter()
             try:
                 plugin.on_event(topic, data, timestamp)
-                reporter.log_plugin_response(plugin.name, topic, "ok", timestamp)
+                error = None
             except Exception as e:
-                self.logger.error(f"Plugin '{plugin.name}' failed on wildcard topic '{topic}': {e}")
-                reporter.log_error(plugin.name, topic, e)
+                error = e
+            elapsed = time.perf_counter() - started
+
+        timing.events += 1
+        timing.total += elapsed
+        timing.lag += elapsed  # The engine waited for it
+        if elapsed > timing.worst:
+            timing.worst = elapsed
+
+        if error is None:
+            reporter.log_plugin_response(plugin.name, topic, "ok", timestamp)
+        else:
+            self.logger.error("Plugin '%s' failed on %s: %s", plugin.name, topic, error)
+            reporter.log_error(plugin.name, topic, error)
+
+        if timing.budget and elapsed > timing.budget:
+            self._overrun(plugin, timing, topic, data, elapsed)
+
+    def _overrun(self, plugin, timing, topic, data, elapsed):
+        """
+        Accounts for an `on_event()` call that exceeded the plugin's budget, and
+        quarantines the plugin once it reached `quarantine_after` overruns.
+        """
+        timing.overruns += 1
+        timing.excess += elapsed - timing.budget
+        if timing.overruns <= 5 or timing.overruns % 100 == 0:
+            self.logger.warn(
+                "Plugin '%s' took %.1f ms on %s (budget %.1f ms, overrun #%d), payload: %s",
+                plugin.name, elapsed * 1000, topic, timing.budget * 1000, timing.overruns,
+                Logger.lazy(lambda: repr(data)[:200]),
+            )
+
+        if self.quarantine_after and timing.overruns >= self.quarantine_after:
+            timing.quarantined = self.quarantine_mode
+            if self.quarantine_mode == "async":
+                timing.worker = _AsyncDelivery(plugin, timing, self.logger)
+                self.logger.error(
+                    "Plugin '%s' quarantined after %d overruns; its events are now delivered asynchronously",
+                    plugin.name, timing.overruns,
+                )
+            else:
+                self.logger.error(
+                    "Plugin '%s' quarantined after %d overruns; its events are now skipped",
+                    plugin.name, timing.overruns,
+                )
+
+    def configure(self, settings):
+        """
+        Applies the time budget settings of the `plugins` configuration section.
+
+        Args:
+            settings (dict): `event_budget_ms` (default per-event budget, 0 disables it),
+                             `quarantine_after` (overruns before quarantine, 0 disables it)
+                             and `quarantine_mode` ('async' or 'skip').
+        """
+        settings = settings or {}
+        budget_ms = settings.get("event_budget_ms", 20)
+        self.default_budget = budget_ms / 1000 if budget_ms else None
+        self.quarantine_after = int(settings.get("quarantine_after", 10) or 0)
+        mode = settings.get("quarantine_mode", "async")
+        if mode not in ("async", "skip"):
+            self.logger.warn("Unknown quarantine_mode '%s', using 'async'", mode)
+            mode = "async"
+        self.quarantine_mode = mode
+
+    def set_budget(self, plugin, budget_ms):
+        """
+        Sets the per-event time budget of a plugin.
+
+        Args:
+            plugin (BasePlugin): Subscriber.
+            budget_ms (float): Budget in milliseconds; None uses the default, 0 disables it.
+        """
+        budget = self.default_budget if budget_ms is None else (budget_ms / 1000 if budget_ms else None)
+        timing = self._timing.get(plugin)
+        if timing is None:
+            self._timing[plugin] = PluginTiming(budget)
+        else:
+            timing.budget = budget
+
+    def reset_timing(self):
+        """
+        Clears the timing counters, e.g. at the start of a run. Budgets and
+        quarantines are kept.
+        """
+        for timing in self._timing.values():
+            timing.clear()
+
+    def timing_report(self):
+        """
+        Summarizes how long each plugin spent in `on_event()`.
+
+        Returns:
+            dict: Plugin name -> events, total/max time, budget, overruns, time over
+                  budget, engine lag (time the engine waited for the plugin) and
+                  quarantine mode (False when not quarantined).
+        """
+        report = {}
+        for plugin, timing in list(self._timing.items()):
+            report[plugin.name] = {
+                "events": timing.events,
+                "total_ms": round(timing.total * 1000, 3),
+                "max_ms": round(timing.worst * 1000, 3),
+                "budget_ms": round(timing.budget * 1000, 3) if timing.budget else None,
+                "overruns": timing.overruns,
+                "overrun_ms": round(timing.excess * 1000, 3),
+                "engine_lag_ms": round(timing.lag * 1000, 3),
+                "quarantined": timing.quarantined,
+            }
+        return report
+
+    def _release(self, plugin):
+        """
+        Drops the timing state and filters of a plugin leaving the bus and stops
+        its worker.
+
+        Waits for an `on_event()` call already running on the plugin, and drops
+        deliveries that were routed to it before it left, so the caller may shut
+        the plugin down as soon as this returns.
+        """
+        self._retired.add(plugin)
+        self._filters.pop(plugin, None)
+        timing = self._timing.pop(plugin, None)
+        if timing is None:
+            return
+        with timing.dispatching:
+            timing.retired = True
+        if timing.worker is not None:
+            timing.worker.stop()
+
+
+class PluginTiming:
+    """
+    Accumulated `on_event()` timing of one plugin, kept by the EventBus.
+    """
+
+    def __init__(self, budget):
+        self.budget = budget  # Seconds per event, or None
+        self.quarantined = False  # False, 'async' or 'skip'
+        self.worker = None
+        self.dispatching = threading.RLock()  # Held while on_event() runs
+        self.retired = False  # Set once the plugin left the bus
+        self.clear()
+
+    def clear(self):
+        self.events = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.overruns = 0
+        self.excess = 0.0
+        self.lag = 0.0
+
+
+class _AsyncDelivery:
+    """
+    Background thread delivering events to a quarantined plugin, so it no longer
+    delays the engine.
+    """
+
+    _STOP = object()
+
+    def __init__(self, plugin, timing, logger):
+        self.plugin = plugin
+        self.timing = timing
+        self.logger = logger
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name=f"{plugin.name}-async", daemon=True)
+        self.thread.start()
+
+    def put(self, event):
+        self.queue.put(event)
+
+    def stop(self):
+        self.queue.put(self._STOP)
 
+    def _run(self):
+        while True:
+            event = self.queue.get()
+            if event is self._STOP:
+                return
+            topic, data, timestamp = event
+            with self.timing.dispatching:
+                if self.timing.retired:
+                    return
+                started = time.perf_counter()
+                try:
+                    self.plugin.on_event(topic, data, timestamp)
+                    reporter.log_plugin_response(self.plugin.name, topic, "ok", timestamp)
+                except Exception as e:
+                    self.logger.error("Plugin '%s' failed on %s: %s", self.plugin.name, topic, e)
+                    reporter.log_error(self.plugin.name, topic, e)
+                elapsed = time.perf_counter() - started
+            self.timing.events += 1
+            self.timing.total += elapsed
+            self.timing.worst = max(self.timing.worst, elapsed)
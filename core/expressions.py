@@ -0,0 +1,260 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import re
+import ast
+import functools
+
+_VAR_PATTERN = re.compile(r"\$\{([^}]+)\}")
+
+# Functions callable from scenario expressions
+_FUNCTIONS = {
+    "abs": abs,
+    "min": min,
+    "max": max,
+    "round": round,
+    "int": int,
+    "float": float,
+    "len": len,
+}
+
+MAX_INT_BITS = 4096  # Largest integer `**` and `<<` may produce, so `9**9**9` fails instead of hanging
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.Constant, ast.Name, ast.Load, ast.Attribute, ast.Subscript, ast.Slice,
+    ast.Tuple, ast.List, ast.Call, ast.IfExp,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.BitAnd, ast.BitOr, ast.BitXor, ast.LShift, ast.RShift,
+    ast.UnaryOp, ast.UAdd, ast.USub, ast.Not, ast.Invert,
+    ast.BoolOp, ast.And, ast.Or,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+)
+
+
+class ExpressionError(ValueError):
+    """
+    Raised when a scenario expression is malformed, uses a forbidden construct,
+    or references an undefined name.
+    """
+
+
+def _int_bits(value):
+    """
+    Returns the bit length of an int (or bool) operand, or None for other types.
+    """
+    return abs(value).bit_length() if isinstance(value, int) else None
+
+
+def _pow(base, exponent):
+    """
+    `base ** exponent`, refusing integer results of more than about MAX_INT_BITS bits.
+    """
+    bits = _int_bits(base)
+    if bits is not None and bits > 1 and isinstance(exponent, int) and exponent * (bits - 1) > MAX_INT_BITS:
+        raise ExpressionError(f"Result of {base} ** {exponent} is too large")
+    return base ** exponent
+
+
+def _lshift(value, count):
+    """
+    `value << count`, refusing results longer than MAX_INT_BITS.
+    """
+    bits = _int_bits(value)
+    if bits and isinstance(count, int) and bits + count > MAX_INT_BITS:
+        raise ExpressionError(f"Result of {value} << {count} is too large")
+    return value << count
+
+
+# Operators evaluated through a size-checking function
+_GUARDED_OPERATORS = {ast.Pow: "__pow", ast.LShift: "__lshift"}
+
+
+class _NameResolver(ast.NodeTransformer):
+    """
+    Rewrites free names into lookups so the compiled code never touches globals.
+
+    - `speed` and dotted names such as `gps.lat` become `__lookup("gps.lat")`
+    - names found in `constants` are folded into literal values
+    - `signal("can.rx.0x3E9")` is the explicit form for names that are not identifiers
+    - `**` and `<<` become calls that refuse results above MAX_INT_BITS
+    """
+
+    def __init__(self, constants):
+        self.constants = constants
+
+    def _resolve(self, name, node):
+        if self.constants is not None and name in self.constants:
+            return ast.copy_location(ast.Constant(self.constants[name]), node)
+        call = ast.Call(func=ast.Name("__lookup", ast.Load()), args=[ast.Constant(name)], keywords=[])
+        return ast.copy_location(call, node)
+
+    def visit_Name(self, node):
+        if node.id.startswith("_"):
+            raise ExpressionError(f"Name '{node.id}' is not allowed")
+        if node.id in _FUNCTIONS:
+            return node
+        return self._resolve(node.id, node)
+
+    def visit_Attribute(self, node):
+        parts = []
+        current = node
+        while isinstance(current, ast.Attribute):
+            parts.append(current.attr)
+            current = current.value
+        if not isinstance(current, ast.Name) or any(p.startswith("_") for p in parts + [current.id]):
+            raise ExpressionError("Attribute access is only allowed on dotted signal names")
+        parts.append(current.id)
+        return self._resolve(".".join(reversed(parts)), node)
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        guard = _GUARDED_OPERATORS.get(type(node.op))
+        if guard is None:
+            return node
+        call = ast.Call(func=ast.Name(guard, ast.Load()), args=[node.left, node.right], keywords=[])
+        return ast.copy_location(call, node)
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name) and node.func.id == "signal":
+            if len(node.args) != 1 or not isinstance(node.args[0], ast.Constant) or node.keywords:
+                raise ExpressionError("signal() takes exactly one literal name")
+            return self._resolve(str(node.args[0].value), node)
+        if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS:
+            raise ExpressionError("Only abs, min, max, round, int, float, len and signal can be called")
+        node.args = [self.visit(arg) for arg in node.args]
+        if node.keywords:
+            raise ExpressionError("Keyword arguments are not supported")
+        return node
+
+
+@functools.lru_cache(maxsize=4096)
+def _compile_cached(source):
+    """
+    Compiles an expression without constant folding; shared by all callers.
+    """
+    return _compile(source, None)
+
+
+def _compile(source, constants):
+    """
+    Validates an expression and compiles it into a Python function.
+
+    Args:
+        source (str): Expression text.
+        constants (dict or None): Names to fold into the code as literal values.
+
+    Returns:
+        callable: Function taking a lookup callable (name -> value).
+    """
+    try:
+        tree = ast.parse(str(source).strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression '{source}': {e.msg}") from None
+
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ExpressionError(f"Unsupported syntax in '{source}': {type(node).__name__}")
+
+    tree = ast.fix_missing_locations(_NameResolver(constants).visit(tree))
+    code = compile(f"lambda __lookup: {ast.unparse(tree.body)}", "<scenario-expression>", "eval")
+    return eval(code, {"__builtins__": {}, "__pow": _pow, "__lshift": _lshift, **_FUNCTIONS})
+
+
+def compile_expression(source, constants=None):
+    """
+    Compiles a restricted arithmetic/boolean expression once for repeated evaluation.
+
+    Supported are literals, arithmetic, bitwise and boolean operators, comparisons,
+    `x if c else y`, indexing, and calls to abs, min, max, round, int, float and len.
+    Integer results of `**` and `<<` are limited to about MAX_INT_BITS bits.
+    Free names (plain or dotted, e.g. `gps.lat`) are resolved at call time through
+    the lookup passed to the returned function.
+
+    Args:
+        source (str): Expression text, e.g. "vehicle.speed > 80 and gps.active".
+        constants (dict): Optional names folded into the compiled code (e.g. scenario variables).
+
+    Returns:
+        callable: `fn(lookup)` where `lookup(name)` returns the value of a name or raises KeyError.
+
+    Raises:
+        ExpressionError: If the expression is malformed or uses a forbidden construct.
+    """
+    if constants:
+        return _compile(source, constants)
+    return _compile_cached(str(source))
+
+
+def evaluate(source, variables):
+    """
+    Evaluates an expression against a dictionary of variables.
+
+    Args:
+        source (str): Expression text.
+        variables (dict): Available names.
+
+    Returns:
+        object: The expression result.
+
+    Raises:
+        ExpressionError: If the expression is invalid or references an undefined name.
+    """
+    try:
+        return compile_expression(source)(variables.__getitem__)
+    except KeyError as e:
+        raise ExpressionError(f"Undefined variable {e} in '{source}'") from None
+    except ExpressionError:
+        raise
+    except Exception as e:
+        raise ExpressionError(f"Failed to evaluate '{source}': {e}") from None
+
+
+def substitute(value, variables):
+    """
+    Recursively replaces `${expr}` references in strings, lists and dicts.
+
+    A string consisting of a single `${expr}` takes the expression's value and type
+    (e.g. "${initial_speed * 2}" -> 16000); otherwise results are interpolated as text.
+
+    Args:
+        value (object): A params value from a scenario step.
+        variables (dict): Scenario variables.
+
+    Returns:
+        object: The value with all references resolved.
+
+    Raises:
+        ExpressionError: If an expression is invalid or references an undefined name.
+    """
+    if isinstance(value, str):
+        if "${" not in value:
+            return value
+        match = _VAR_PATTERN.fullmatch(value.strip())
+        if match:
+            return evaluate(match.group(1), variables)
+        return _VAR_PATTERN.sub(lambda m: str(evaluate(m.group(1), variables)), value)
+    if isinstance(value, dict):
+        return {key: substitute(item, variables) for key, item in value.items()}
+    if isinstance(value, list):
+        return [substitute(item, variables) for item in value]
+    return value
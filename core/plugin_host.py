@@ -0,0 +1,382 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import collections
+import importlib.util
+import multiprocessing
+import threading
+from core.base_plugin import BasePlugin
+from core.config_loader import ConfigLoader
+from core.reporter import Reporter
+from utils.logger import Logger
+reporter = Reporter()
+
+
+class ProcessPluginProxy(BasePlugin):
+    """
+    ProcessPluginProxy runs a plugin declared with `isolation: process` in a child
+    process and stands in for it on the EventBus.
+
+    Events are queued and shipped to the child in batches by a sender thread, so
+    `on_event` returns immediately and the plugin runs in parallel with the engine
+    and with in-process plugins. The child sends back what the plugin publishes on
+    its event bus, its log records and its `on_event` errors. If the child dies
+    (e.g. a crashing C extension), it is restarted with exponential backoff; the
+    sender holds events back until the new process reports ready, then resends
+    the batch whose write failed and delivers the events queued meanwhile.
+
+    Protocol, over two one-way pipes:
+    - parent -> child: lists of ("init", config), ("event", topic, data, timestamp),
+      ("reset",) and ("shutdown",) messages
+    - child -> parent: ("ready",), ("failed", error), ("publish", topic, data, timestamp),
+      ("signal", name, value), ("log", level, name, message) and ("error", topic, error)
+    """
+
+    def __init__(self, plugin_dir, plugin_name, metadata, event_bus, settings=None):
+        """
+        Prepares the proxy; the child process is started by `on_init`.
+
+        Args:
+            plugin_dir (str): Folder containing the plugins.
+            plugin_name (str): Plugin folder name.
+            metadata (dict): Parsed plugin.yaml.
+            event_bus (EventBus): Bus receiving what the plugin publishes.
+            settings (dict): The `plugins.process` configuration section
+                             (`batch_size`, `max_pending`, `init_timeout`,
+                             `restart_limit`, `restart_backoff`, `max_backoff`,
+                             `shutdown_timeout`).
+        """
+        settings = settings or {}
+        self.name = metadata.get("name", plugin_name)
+        self.logger = Logger(self.name)
+        self.event_bus = event_bus
+        self.batch_size = max(1, int(settings.get("batch_size", 256)))
+        self.max_pending = max(1, int(settings.get("max_pending", 10000)))
+        self.init_timeout = float(settings.get("init_timeout", 10.0))
+        self.restart_limit = int(settings.get("restart_limit", 5))
+        self.restart_backoff = float(settings.get("restart_backoff", 0.5))
+        self.max_backoff = float(settings.get("max_backoff", 30.0))
+        self.shutdown_timeout = float(settings.get("shutdown_timeout", 5.0))
+        self.restarts = 0
+        self.dropped = 0  # Events lost because the queue overflowed or the child was gone
+
+        self._target = (
+            f"{plugin_dir}/{plugin_name}/main.py", f"{plugin_name}.main",
+            metadata.get("entry_class", "Plugin"), self.name,
+        )
+        self._config = {}
+        self._queue = collections.deque()
+        self._wakeup = threading.Condition()
+        self._conn_lock = threading.Lock()  # Guards the pipe to the current child
+        self._closed = threading.Event()
+        self._ready = threading.Event()
+        self._connected = False  # A child reported ready and its pipe is usable; guarded by _wakeup
+        self._init_error = None
+        self._process = None
+        self._to_child = None
+        self._sender = None
+        self._loggers = {}
+
+    def on_init(self, config):
+        """
+        Starts the child process and waits until the plugin's own `on_init` returned.
+
+        Args:
+            config (dict): Passed to the plugin's `on_init`.
+
+        Raises:
+            RuntimeError: If the plugin could not be imported or initialized, or
+                          did not report ready within `init_timeout` seconds.
+        """
+        self._config = config
+        self._spawn()
+        self._sender = threading.Thread(target=self._send_loop, name=f"{self.name}-sender", daemon=True)
+        self._sender.start()
+        if not self._ready.wait(self.init_timeout):
+            self._init_error = f"not ready after {self.init_timeout:.1f}s"
+            self._closed.set()
+            self._process.terminate()
+        if self._init_error is not None:
+            self._closed.set()
+            self._wakeup_sender()
+            raise RuntimeError(f"Plugin process failed to start: {self._init_error}")
+
+    def on_event(self, topic, data, timestamp):
+        """
+        Queues an event for the child process and returns immediately.
+        """
+        self._post(("event", topic, data, timestamp))
+
+    def on_reset(self):
+        """
+        Forwards the reset to the plugin in the child process.
+        """
+        self._post(("reset",))
+
+    def on_shutdown(self):
+        """
+        Delivers the queued events, shuts the plugin down and waits for the child to
+        exit, terminating it after `shutdown_timeout` seconds.
+        """
+        self._post(("shutdown",))
+        self._closed.set()  # No restarts from now on
+        self._wakeup_sender()
+        if self._sender is not None:
+            self._sender.join(self.shutdown_timeout)
+        process = self._process
+        if process is not None:
+            process.join(self.shutdown_timeout)
+            if process.is_alive():
+                self.logger.warn("Plugin process did not exit, terminating it")
+                process.terminate()
+                process.join()
+        if self.dropped:
+            self.logger.warn("%d event(s) were not delivered to the plugin process", self.dropped)
+
+    def _post(self, message):
+        """
+        Appends a message to the delivery queue, dropping the oldest one when full.
+
+        Args:
+            message (tuple): Message for the child process.
+        """
+        with self._wakeup:
+            if len(self._queue) >= self.max_pending:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(message)
+            self._wakeup.notify()
+
+    def _wakeup_sender(self):
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def _set_connected(self, connected):
+        with self._wakeup:
+            self._connected = connected
+            self._wakeup.notify()
+
+    def _send_loop(self):
+        """
+        Sender thread: ships queued messages to the child in batches until closed
+        and drained.
+
+        Nothing is taken off the queue while no child is connected. A batch whose
+        write fails is kept and sent again once the restarted child is ready; what
+        is still queued when the proxy closes without a child is counted as dropped.
+        """
+        batch = []
+        while True:
+            with self._wakeup:
+                while not self._closed.is_set() and not (self._connected and (batch or self._queue)):
+                    self._wakeup.wait()
+                if not self._connected:
+                    self.dropped += len(batch) + len(self._queue)  # Closed during an outage
+                    self._queue.clear()
+                    return
+                if not batch:
+                    if not self._queue:
+                        return
+                    while self._queue and len(batch) < self.batch_size:
+                        batch.append(self._queue.popleft())
+
+            with self._conn_lock:
+                try:
+                    self._to_child.send(batch)
+                    batch = []
+                except (OSError, ValueError):
+                    self._set_connected(False)  # Resent to the restarted child
+
+    def _spawn(self):
+        """
+        Starts a child process and sends it the init message ahead of any queued event.
+        """
+        context = multiprocessing.get_context("spawn")
+        from_child, child_out = context.Pipe(duplex=False)
+        child_in, to_child = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_host_main, args=(*self._target, child_in, child_out),
+            name=f"plugin-{self.name}", daemon=True,
+        )
+        process.start()
+        child_in.close()
+        child_out.close()
+
+        with self._conn_lock:
+            self._process, self._to_child = process, to_child
+            to_child.send([("init", self._config)])
+
+        threading.Thread(
+            target=self._receive_loop, args=(process, from_child), name=f"{self.name}-receiver", daemon=True
+        ).start()
+
+    def _receive_loop(self, process, connection):
+        """
+        Receiver thread for one child process: handles its messages and, when the
+        process dies unexpectedly, restarts it.
+
+        Args:
+            process (multiprocessing.Process): The child process.
+            connection (Connection): Pipe end receiving the child's messages.
+        """
+        while True:
+            try:
+                message = connection.recv()
+            except (EOFError, OSError):
+                break
+            self._handle(message)
+
+        self._set_connected(False)
+        connection.close()
+        process.join(self.shutdown_timeout)
+        if self._closed.is_set():
+            return
+        if not self._ready.is_set():
+            self._init_error = self._init_error or f"exited with code {process.exitcode}"
+            self._ready.set()
+            return
+
+        self.logger.error("Plugin process exited unexpectedly (exit code %s)", process.exitcode)
+        reporter.log_error(self.name, "process", f"exit code {process.exitcode}")
+        if self.restarts >= self.restart_limit:
+            self.logger.error("Giving up after %d restart(s); events are no longer delivered", self.restarts)
+            self._closed.set()
+            self._wakeup_sender()
+            return
+
+        delay = min(self.max_backoff, self.restart_backoff * 2 ** self.restarts)
+        if self._closed.wait(delay):
+            return
+        self.restarts += 1
+        self.logger.warn("Restarting plugin process (attempt %d)", self.restarts)
+        self._spawn()
+
+    def _handle(self, message):
+        """
+        Dispatches one message received from the child process.
+
+        Args:
+            message (tuple): Message from the child.
+        """
+        kind = message[0]
+        if kind == "publish":
+            self.event_bus.publish(*message[1:])
+        elif kind == "signal":
+            self.event_bus.set_signal(*message[1:])
+        elif kind == "log":
+            _, level, name, text = message
+            logger = self._loggers.get(name)
+            if logger is None:
+                logger = self._loggers[name] = Logger(name)
+            getattr(logger, level.lower(), logger.info)(text)
+        elif kind == "error":
+            _, topic, error = message
+            self.logger.error("Plugin '%s' failed on %s: %s", self.name, topic, error)
+            reporter.log_error(self.name, topic, error)
+        elif kind == "ready":
+            self._ready.set()
+            self._set_connected(True)
+        elif kind == "failed":
+            self._init_error = message[1]
+
+
+class _ChildEventBus:
+    """
+    Event bus handed to a plugin running in a child process; forwards to the parent's bus.
+    """
+
+    def __init__(self, send):
+        self._send = send
+
+    def publish(self, topic, data, timestamp):
+        self._send(("publish", topic, data, timestamp))
+
+    def set_signal(self, name, value):
+        self._send(("signal", name, value))
+
+
+def _host_main(code_path, module_name, entry_class, name, inbox, outbox):
+    """
+    Entry point of a plugin child process.
+
+    Imports the plugin, then executes the message batches sent by the parent
+    until it receives ("shutdown",) or the parent goes away.
+
+    Args:
+        code_path (str): Path to the plugin's main.py.
+        module_name (str): Module name to import it as.
+        entry_class (str): Plugin class name.
+        name (str): Plugin display name.
+        inbox (Connection): Pipe end receiving message batches from the parent.
+        outbox (Connection): Pipe end sending messages to the parent.
+    """
+    send_lock = threading.Lock()  # Plugins may publish from their own threads
+
+    def send(message):
+        with send_lock:
+            outbox.send(message)
+
+    Logger.add_global_listener(lambda level, logger_name, message, timestamp: send(("log", level, logger_name, message)))
+    try:
+        settings = ConfigLoader.get("logging")
+        Logger.configure({"level": settings.get("level", "INFO"), "levels": settings.get("levels")})
+    except Exception:
+        pass  # Keep the default thresholds
+
+    try:
+        spec = importlib.util.spec_from_file_location(module_name, code_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        plugin = getattr(module, entry_class)()
+        plugin.name = name
+        if hasattr(plugin, "event_bus"):
+            plugin.event_bus = _ChildEventBus(send)
+    except Exception as e:
+        send(("failed", f"{type(e).__name__}: {e}"))
+        return
+
+    while True:
+        try:
+            batch = inbox.recv()
+        except (EOFError, OSError):
+            return  # Parent went away
+
+        for message in batch:
+            kind = message[0]
+            try:
+                if kind == "event":
+                    plugin.on_event(*message[1:])
+                elif kind == "init":
+                    plugin.on_init(message[1])
+                    send(("ready",))
+                elif kind == "reset":
+                    if hasattr(plugin, "on_reset"):
+                        plugin.on_reset()
+                elif kind == "shutdown":
+                    plugin.on_shutdown()
+                    return
+            except Exception as e:
+                if kind == "init":
+                    send(("failed", f"{type(e).__name__}: {e}"))
+                    return
+                send(("error", message[1] if kind == "event" else kind, f"{type(e).__name__}: {e}"))
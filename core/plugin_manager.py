@@ -23,9 +23,15 @@
 
 
 import os
+import time
+import threading
 import importlib.util
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import yaml
 from core.reporter import Reporter
+from core.plugin_host import ProcessPluginProxy
+from core.base_plugin import BasePlugin
+from core.schema import SchemaError, compile_schema
 reporter = Reporter()
 
 class PluginManager:
@@ -33,14 +39,19 @@ class PluginManager:
     PluginManager is responsible for dynamically loading and managing simulation plugins.
 
     It:
-    - Loads plugin metadata from each plugin's `plugin.yaml`
-    - Dynamically imports the plugin's main module (`main.py`)
+    - Loads plugin metadata from each plugin's `plugin.yaml` and indexes it by topic
+    - Dynamically imports the plugin's main module (`main.py`), only for plugins the
+      scenario uses, or on demand when one of their topics is first published
     - Instantiates the plugin class
     - Registers subscriptions with the EventBus
-    - Manages lifecycle hooks (init and shutdown)
+    - Manages lifecycle hooks (init and shutdown), running independent plugins
+      concurrently in the dependency order declared with `depends_on`
+    - Runs plugins declared with `isolation: process` in a child process (see ProcessPluginProxy)
+    - Validates and coerces scenario events against the param schemas plugins
+      declare in `plugin.yaml`, before anything is dispatched
     """
 
-    def __init__(self, logger, event_bus, plugin_dir="plugins"):
+    def __init__(self, logger, event_bus, plugin_dir="plugins", settings=None):
         """
         Initializes the PluginManager.
 
@@ -48,78 +59,670 @@ class PluginManager:
             logger (Logger): The logging utility instance.
             event_bus (EventBus): The event dispatcher used to route plugin events.
             plugin_dir (str): The directory path where plugins are located.
+            settings (dict): The `plugins` section of the configuration
+                             (`max_workers`, `init_timeout`, `shutdown_timeout`,
+                             `process` for plugins with `isolation: process`).
         """
+        settings = settings or {}
         self.logger = logger
         self.event_bus = event_bus
         self.plugin_dir = plugin_dir
+        self.max_workers = max(1, int(settings.get("max_workers", 8)))
+        self.init_timeout = float(settings.get("init_timeout", 10.0))
+        self.shutdown_timeout = float(settings.get("shutdown_timeout", 5.0))
+        self.process_settings = settings.get("process") or {}
         self.plugins = []
+        self.manifests = {}  # Plugin folder name -> parsed plugin.yaml
+        self.topic_index = {}  # Topic -> plugin folder names subscribed to it
+        self._folders = {}  # Plugin display name -> folder name, for `depends_on`
+        self._loaded = {}  # Plugin folder name -> instance
+        self._failed = set()  # Plugin folder names that could not be loaded
+        self._load_lock = threading.RLock()  # On-demand loads can come from plugin threads
 
-    def load_plugins(self):
+    def load_plugins(self, topics=None):
         """
-        Discovers, loads, and registers all plugins from the plugin directory.
+        Discovers, loads, and registers plugins from the plugin directory.
 
-        - Validates that each plugin folder contains `plugin.yaml` and `main.py`.
-        - Dynamically imports the plugin class defined in metadata (`entry_class`, defaults to `Plugin`).
-        - Calls each plugin's `on_init()` method.
-        - Subscribes the plugin to topics defined in `plugin.yaml` (under `subscriptions`).
+        Plugins that are already loaded are kept as they are, so repeated runs
+        reuse the same instances, subscriptions and resources.
+
+        Only the `plugin.yaml` manifests are read up front. When `topics` is given,
+        just the plugins subscribed to at least one of them are imported and
+        initialized; the others are loaded on demand the first time a topic routed
+        to them is published (see `load_plugins_for_topic`).
+
+        Args:
+            topics (iterable[str]): Topics used by the scenario, or None to load every plugin.
+        """
+        self.logger.info("Loading plugins from '%s'", self.plugin_dir)
+        self.load_manifests()
+        self.event_bus.resolver = self.load_plugins_for_topic
+
+        if topics is None:
+            names = list(self.manifests)
+        else:
+            names = []
+            for topic in topics:
+                names.extend(name for name in self.plugins_for_topic(topic) if name not in names)
+            skipped = len(self.manifests) - len(names)
+            if skipped:
+                self.logger.info("Deferring %d plugin(s) not used by the scenario", skipped)
+
+        self._start_plugins(names)
+
+    def load_plugin(self, plugin_name):
+        """
+        Loads a single plugin, together with the plugins it depends on.
+
+        Args:
+            plugin_name (str): Plugin folder name.
+
+        Returns:
+            BasePlugin or None: The plugin instance, or None if it could not be loaded.
+        """
+        with self._load_lock:
+            if plugin_name not in self._loaded and plugin_name not in self._failed:
+                self._start_plugins([plugin_name])
+            return self._loaded.get(plugin_name)
+
+    def _start_plugins(self, names):
+        """
+        Imports and initializes plugins level by level, in dependency order.
+
+        Plugins within a level do not depend on each other and are started
+        concurrently on a thread pool. A plugin is subscribed to its topics only
+        after its `on_init()` returned within its `init_timeout`; plugins whose
+        dependencies failed are skipped. Per-plugin timings are added to the report
+        metadata under `plugin_startup`.
+
+        Args:
+            names (list[str]): Plugin folder names to start.
+        """
+        with self._load_lock:
+            names = [
+                name for name in self._with_dependencies(names)
+                if name not in self._loaded and name not in self._failed
+            ]
+            if not names:
+                return
+
+            timings = reporter.metadata.setdefault("plugin_startup", {})
+            pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="plugin-start")
+            try:
+                for level in self._dependency_levels(names):
+                    self._start_level(pool, level, timings)
+            finally:
+                pool.shutdown(wait=False)  # Do not block on plugins that timed out
+
+    def _start_level(self, pool, level, timings):
         """
-        self.logger.info(f"Loading plugins from '{self.plugin_dir}'")
+        Starts one dependency level of plugins concurrently and registers those that succeed.
 
-        for plugin_name in os.listdir(self.plugin_dir):
-            plugin_path = os.path.join(self.plugin_dir, plugin_name)
-            if not os.path.isdir(plugin_path):
+        Args:
+            pool (ThreadPoolExecutor): Pool running `_start_plugin`.
+            level (list[str]): Plugin folder names without dependencies on each other.
+            timings (dict): Report entry receiving per-plugin startup timings.
+        """
+        started = time.perf_counter()
+        futures = {}
+        for plugin_name in level:
+            missing = [dep for dep in self._dependencies(plugin_name) if dep not in self._loaded]
+            if missing:
+                self.logger.error(
+                    "Skipping plugin '%s' (dependency not loaded: %s)", plugin_name, ", ".join(missing)
+                )
+                self._failed.add(plugin_name)
+                timings[self._display_name(plugin_name)] = {"status": "skipped"}
+            elif not os.path.exists(os.path.join(self.plugin_dir, plugin_name, "main.py")):
+                self.logger.warn("Skipping plugin '%s' (missing plugin.yaml or main.py)", plugin_name)
+                self._failed.add(plugin_name)
+            else:
+                futures[plugin_name] = pool.submit(self._start_plugin, plugin_name)
+
+        for plugin_name, future in futures.items():
+            timeout = float(self.manifests[plugin_name].get("init_timeout", self.init_timeout))
+            try:
+                plugin, import_time, init_time = future.result(
+                    timeout=max(0.0, started + timeout - time.perf_counter())
+                )
+            except FutureTimeoutError:
+                self.logger.error("Plugin '%s' did not initialize within %.1fs", plugin_name, timeout)
+                self._failed.add(plugin_name)
+                timings[self._display_name(plugin_name)] = {"status": "timeout", "timeout_s": timeout}
+                # Never registered, so shut it down if on_init() still completes
+                future.add_done_callback(lambda late, name=plugin_name: self._stop_late_plugin(name, late))
+                continue
+            except Exception as e:
+                self.logger.error("Failed to load plugin '%s': %s", plugin_name, e)
+                self._failed.add(plugin_name)
+                timings[self._display_name(plugin_name)] = {"status": "error", "error": str(e)}
                 continue
 
-            meta_path = os.path.join(plugin_path, "plugin.yaml")
-            code_path = os.path.join(plugin_path, "main.py")
+            # Register plugin subscriptions to EventBus
+            self.event_bus.set_filters(plugin, self._manifest_filters(self.manifests[plugin_name]))
+            for topic in self._manifest_topics(self.manifests[plugin_name]):
+                self.event_bus.subscribe(topic, plugin)
+            self.event_bus.set_budget(plugin, self.manifests[plugin_name].get("event_budget_ms"))
+
+            self.plugins.append(plugin)
+            self._loaded[plugin_name] = plugin
+            reporter.metadata["plugins"].append(plugin.name)
+            timings[plugin.name] = {
+                "status": "ok",
+                "import_ms": round(import_time * 1000, 3),
+                "init_ms": round(init_time * 1000, 3),
+            }
+            self.logger.info("Loaded plugin '%s' in %.1f ms", plugin.name, (import_time + init_time) * 1000)
+
+    def _stop_late_plugin(self, plugin_name, future):
+        """
+        Shuts down a plugin whose `on_init()` finished after its startup timeout.
+        Runs on the pool thread that started it.
+
+        Args:
+            plugin_name (str): Plugin folder name.
+            future (Future): The timed-out `_start_plugin` call.
+        """
+        if future.cancelled() or future.exception() is not None:
+            return
+        plugin = future.result()[0]
+        try:
+            plugin.on_shutdown()
+        except Exception as e:
+            self.logger.warn("Late instance of '%s' failed to shut down cleanly: %s", plugin_name, e)
+        self.logger.info("Shut down plugin '%s', which finished initializing after its timeout", plugin_name)
+
+    def _start_plugin(self, plugin_name):
+        """
+        Imports, instantiates and initializes a plugin. Runs on a pool thread.
+
+        Args:
+            plugin_name (str): Plugin folder name.
+
+        Returns:
+            tuple: (plugin instance, import seconds, on_init seconds).
+        """
+        metadata = self.manifests[plugin_name]
+        started = time.perf_counter()
+
+        if metadata.get("isolation") == "process":
+            # Imported and initialized in a child process; the proxy is subscribed instead
+            proxy = ProcessPluginProxy(
+                self.plugin_dir, plugin_name, metadata, self.event_bus, self.process_settings
+            )
+            proxy.on_init({})
+            return proxy, 0.0, time.perf_counter() - started
+
+        # Dynamic import of the plugin's main class
+        code_path = os.path.join(self.plugin_dir, plugin_name, "main.py")
+        spec = importlib.util.spec_from_file_location(f"{plugin_name}.main", code_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
 
-            if not os.path.exists(meta_path) or not os.path.exists(code_path):
-                self.logger.warn(f"Skipping plugin '{plugin_name}' (missing plugin.yaml or main.py)")
+        plugin_class = getattr(module, metadata.get("entry_class", "Plugin"))
+        plugin_instance = plugin_class()
+        plugin_instance.name = metadata.get("name", plugin_name)
+
+        #Provide Event Bus to the plugin if it needs to use it
+        if hasattr(plugin_instance, "event_bus"):
+            plugin_instance.event_bus = self.event_bus
+
+        imported = time.perf_counter()
+        plugin_instance.on_init({})
+        return plugin_instance, imported - started, time.perf_counter() - imported
+
+    def _dependencies(self, plugin_name):
+        """
+        Returns the folder names of the plugins listed under `depends_on` in a manifest.
+
+        Entries may name a plugin by folder or by its display `name`.
+
+        Args:
+            plugin_name (str): Plugin folder name.
+
+        Returns:
+            list[str]: Folder names (unknown entries are returned unchanged).
+        """
+        depends_on = self.manifests.get(plugin_name, {}).get("depends_on") or []
+        if isinstance(depends_on, str):
+            depends_on = [depends_on]
+        return [dep if dep in self.manifests else self._folders.get(dep, dep) for dep in depends_on]
+
+    def _with_dependencies(self, names):
+        """
+        Extends a list of plugins with everything they depend on, transitively.
+
+        Args:
+            names (list[str]): Plugin folder names.
+
+        Returns:
+            list[str]: The plugins and their known dependencies.
+        """
+        result = []
+        stack = list(reversed(names))
+        while stack:
+            plugin_name = stack.pop()
+            if plugin_name in result or plugin_name not in self.manifests:
                 continue
+            result.append(plugin_name)
+            stack.extend(self._dependencies(plugin_name))
+        return result
+
+    def _dependency_levels(self, names):
+        """
+        Groups plugins into levels that can be started concurrently.
+
+        Each level only depends on earlier levels (or on plugins outside `names`).
+        Plugins involved in a dependency cycle are reported and left out.
+
+        Args:
+            names (list[str]): Plugin folder names.
+
+        Returns:
+            list[list[str]]: Levels in start order.
+        """
+        pending = {name: set(self._dependencies(name)) & set(names) for name in names}
+        levels = []
+        while pending:
+            level = sorted(name for name, deps in pending.items() if not deps)
+            if not level:
+                self.logger.error("Plugin dependency cycle, skipping: %s", ", ".join(sorted(pending)))
+                self._failed.update(pending)
+                break
+            levels.append(level)
+            for name in level:
+                del pending[name]
+            for deps in pending.values():
+                deps.difference_update(level)
+        return levels
+
+    def _display_name(self, plugin_name):
+        """
+        Returns the `name` a manifest gives a plugin folder.
+        """
+        return self.manifests.get(plugin_name, {}).get("name", plugin_name)
+
+    def reload_plugin(self, plugin_name):
+        """
+        Re-imports a plugin from disk and swaps the new instance in for the old one.
+
+        The manifest is re-read and the new instance initialized first; only then are
+        the subscriptions swapped in the EventBus (atomically, between dispatches)
+        and the old instance shut down. If the new code fails to load, the old
+        instance keeps running. Plugins that are not loaded only get their manifest
+        refreshed, and a plugin whose files were removed is unloaded.
+
+        Args:
+            plugin_name (str): Plugin folder name.
+
+        Returns:
+            bool: True if a new instance is now active.
+        """
+        with self._load_lock:
+            self.load_manifests()
+            self._failed.discard(plugin_name)
+            old_plugin = self._loaded.get(plugin_name)
+            if old_plugin is None:
+                return False
+            if plugin_name not in self.manifests:
+                self.unload_plugin(plugin_name)
+                return False
 
             try:
-                with open(meta_path, 'r') as f:
-                    metadata = yaml.safe_load(f)
+                plugin, import_time, init_time = self._start_plugin(plugin_name)
+            except Exception as e:
+                self.logger.error("Failed to reload plugin '%s', keeping the running instance: %s", plugin_name, e)
+                return False
+
+            self.event_bus.set_budget(plugin, self.manifests[plugin_name].get("event_budget_ms"))
+            self.event_bus.set_filters(plugin, self._manifest_filters(self.manifests[plugin_name]))
+            # Returns once an on_event() still running on the old instance is done
+            self.event_bus.replace_plugin(old_plugin, plugin, self._manifest_topics(self.manifests[plugin_name]))
+            self.plugins[self.plugins.index(old_plugin)] = plugin
+            self._loaded[plugin_name] = plugin
+            try:
+                old_plugin.on_shutdown()
+            except Exception as e:
+                self.logger.warn("Previous instance of '%s' failed to shut down cleanly: %s", plugin_name, e)
+
+            self.logger.info("Reloaded plugin '%s' in %.1f ms", plugin.name, (import_time + init_time) * 1000)
+            return True
+
+    def reload_plugins(self):
+        """
+        Reloads every loaded plugin from disk.
+        """
+        with self._load_lock:
+            for plugin_name in list(self._loaded):
+                self.reload_plugin(plugin_name)
 
-                # Dynamic import of the plugin's main class
-                spec = importlib.util.spec_from_file_location(f"{plugin_name}.main", code_path)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
+    def unload_plugin(self, plugin_name):
+        """
+        Unsubscribes and shuts down a single loaded plugin.
 
-                plugin_class = getattr(module, metadata.get("entry_class", "Plugin"))
-                plugin_instance = plugin_class()
-                plugin_instance.name = metadata.get("name", plugin_name)
+        Args:
+            plugin_name (str): Plugin folder name.
+        """
+        with self._load_lock:
+            plugin = self._loaded.pop(plugin_name, None)
+            if plugin is None:
+                return
+            self.event_bus.unsubscribe(plugin)
+            self.plugins.remove(plugin)
+            if plugin.name in reporter.metadata["plugins"]:
+                reporter.metadata["plugins"].remove(plugin.name)
+            try:
+                plugin.on_shutdown()
+            except Exception as e:
+                self.logger.warn("Plugin '%s' failed to shut down cleanly: %s", plugin.name, e)
+            self.logger.info("Unloaded plugin '%s'", plugin.name)
 
-                #Provide Event Bus to the plugin if it needs to use it
-                if hasattr(plugin_instance, "event_bus"):
-                    plugin_instance.event_bus = self.event_bus
+    def load_plugins_for_topic(self, topic):
+        """
+        Loads the not-yet-loaded plugins subscribed to a topic.
 
+        Installed as the EventBus resolver, so topics that first appear while the
+        scenario runs (e.g. published by another plugin) still reach their plugins.
 
-                # Register plugin subscriptions to EventBus
-                for sub in metadata.get("subscriptions", []):
-                    target = sub.get("target")
-                    actions = sub.get("actions", [])
-                    for action in actions:
-                        topic = f"{target}.{action}"
-                        if target == "*" and action == "*":
-                            topic = "*"  # Special case: full wildcard
-                        self.event_bus.subscribe(topic, plugin_instance)
+        Args:
+            topic (str): Event topic ('target.action').
 
-                self.plugins.append(plugin_instance)
-                plugin_instance.on_init({})
-                reporter.metadata["plugins"].append(plugin_instance.name) 
-                self.logger.info(f"Loaded plugin '{plugin_instance.name}'")
+        Returns:
+            bool: True if at least one plugin was loaded.
+        """
+        loaded = False
+        for plugin_name in self.plugins_for_topic(topic):
+            if plugin_name not in self._loaded and plugin_name not in self._failed:
+                self.logger.info("Loading plugin '%s' on demand for %s", plugin_name, topic)
+                loaded = self.load_plugin(plugin_name) is not None or loaded
+        return loaded
 
+    def plugins_for_topic(self, topic):
+        """
+        Returns the plugins whose manifests subscribe to a topic, directly or via '*'.
+
+        Args:
+            topic (str): Event topic ('target.action').
+
+        Returns:
+            list[str]: Plugin folder names.
+        """
+        return self.topic_index.get(topic, []) + self.topic_index.get("*", [])
+
+    @staticmethod
+    def _manifest_topics(metadata):
+        """
+        Returns the EventBus topics declared under `subscriptions` in a manifest.
+
+        Args:
+            metadata (dict): Parsed plugin.yaml.
+
+        Returns:
+            list[str]: Topics such as 'can.send', or '*' for the full wildcard.
+        """
+        topics = []
+        for sub in metadata.get("subscriptions", []):
+            target = sub.get("target")
+            actions = sub.get("actions", [])
+            for action in actions:
+                topic = f"{target}.{action}"
+                if target == "*" and action == "*":
+                    topic = "*"  # Special case: full wildcard
+                topics.append(topic)
+        return topics
+
+    @staticmethod
+    def _manifest_filters(metadata):
+        """
+        Returns the `filters` declared on subscriptions in a manifest, e.g.
+        CAN IDs a `can.rx` subscriber wants (see `EventBus.interest`).
+
+        Args:
+            metadata (dict): Parsed plugin.yaml.
+
+        Returns:
+            dict: Topic -> list of filter specs.
+        """
+        filters = {}
+        for sub in metadata.get("subscriptions", []):
+            if sub.get("filters"):
+                for action in sub.get("actions", []):
+                    filters[f"{sub.get('target')}.{action}"] = list(sub["filters"])
+        return filters
+
+    def load_manifests(self):
+        """
+        Reads every plugin's `plugin.yaml` without importing its code, and indexes
+        the plugins by subscribed topic.
+
+        Returns:
+            dict: Plugin folder name mapped to its metadata.
+        """
+        self.manifests = {}
+        self.topic_index = {}
+        self._folders = {}
+        for plugin_name in sorted(os.listdir(self.plugin_dir)):
+            meta_path = os.path.join(self.plugin_dir, plugin_name, "plugin.yaml")
+            if not os.path.isfile(meta_path):
+                continue
+            try:
+                with open(meta_path, 'r') as f:
+                    self.manifests[plugin_name] = yaml.safe_load(f) or {}
             except Exception as e:
-                self.logger.error(f"Failed to load plugin '{plugin_name}': {e}")
+                self.logger.error("Failed to read manifest of plugin '%s': %s", plugin_name, e)
+                continue
+            self._folders[self.manifests[plugin_name].get("name", plugin_name)] = plugin_name
+            for topic in self._manifest_topics(self.manifests[plugin_name]):
+                self.topic_index.setdefault(topic, []).append(plugin_name)
+        return self.manifests
+
+    def compile_schemas(self):
+        """
+        Compiles the `schemas` section of every manifest, keyed by event topic.
+
+        A schema listed under an action name applies to '<target>.<action>' for
+        every subscription of that plugin that includes the action.
+
+        Returns:
+            dict: Topic mapped to a list of validator functions.
+
+        Raises:
+            SchemaError: If a manifest declares an invalid schema.
+        """
+        if not self.manifests:
+            self.load_manifests()
+
+        validators = {}
+        for plugin_name, metadata in self.manifests.items():
+            schemas = metadata.get("schemas") or {}
+            for sub in metadata.get("subscriptions", []):
+                target = sub.get("target")
+                for action in sub.get("actions", []):
+                    if target == "*" or action not in schemas:
+                        continue
+                    try:
+                        validator = compile_schema(schemas[action])
+                    except SchemaError as e:
+                        raise SchemaError(f"Invalid schema for '{action}' in plugin '{plugin_name}': {e}") from None
+                    validators.setdefault(f"{target}.{action}", []).append(validator)
+        return validators
+
+    def validate_events(self, events):
+        """
+        Validates and coerces the params of scenario events in place, once, at load time.
+
+        Plugins can then rely on their declared types at dispatch time (e.g. an
+        int CAN ID and `bytes` payload). Loop iterations sharing the same params
+        are validated only once.
+
+        Args:
+            events (list[dict]): Parsed scenario events.
+
+        Raises:
+            SchemaError: Listing every invalid event with its source location.
+        """
+        validators = self.compile_schemas()
+        if not validators:
+            return
+
+        coerced = {}  # id(original params) -> validated params
+        errors = []
+        for event in events:
+            topic = f"{event['target']}.{event['action']}"
+            checks = validators.get(topic)
+            if not checks:
+                continue
+            params = event.get("params") or {}
+            key = id(params)
+            if key not in coerced:
+                try:
+                    result = params
+                    for validate in checks:
+                        result = validate(result)
+                except SchemaError as e:
+                    result = None  # Reported once, not once per loop iteration
+                    errors.append(f"{event.get('source', '<scenario>')} {topic} @ {event['time']:.3f}s: {e}")
+                coerced[key] = (params, result)
+            if coerced[key][1] is not None:
+                event["params"] = coerced[key][1]
+
+        if errors:
+            shown = "\n  ".join(errors[:20])
+            more = f"\n  ... and {len(errors) - 20} more" if len(errors) > 20 else ""
+            raise SchemaError(f"{len(errors)} invalid event(s):\n  {shown}{more}")
+
+    def prepare_events(self, events):
+        """
+        Lets loaded plugins precompile the payloads of the events they will receive.
+
+        Calls `prepare(topic, params)` once per distinct (topic, params) value on
+        every subscribed plugin that overrides it, so loop iterations and repeated
+        frames are prepared once. Only plain event lists are scanned: a compiled
+        scenario (or any other iterable) is left alone so startup does not grow
+        with its length, and plugins prepare those payloads on first use.
+
+        Args:
+            events (list[dict]): Scenario events.
+        """
+        if not isinstance(events, list):
+            return
+        if not any(self._overrides_prepare(plugin) for plugin in self.plugins):
+            return
+        preparers = {}  # Topic -> prepare methods of its subscribers
+        subscriptions = self.event_bus.subscriptions
+
+        seen = set()
+        for event in events:
+            params = event.get("params") or {}
+            topic = f"{event['target']}.{event['action']}"
+            try:
+                key = (topic, tuple(params.items()))
+                hash(key)
+            except TypeError:
+                key = (topic, self._payload_key(params))  # Lists or nested dicts in the params
+            try:
+                if key in seen:
+                    continue
+                seen.add(key)
+            except TypeError:
+                pass  # Still unhashable (e.g. a set); prepare it again
+            methods = preparers.get(topic)
+            if methods is None:
+                methods = preparers[topic] = [
+                    plugin.prepare for plugin in subscriptions.get(topic, []) + subscriptions.get("*", [])
+                    if self._overrides_prepare(plugin)
+                ]
+            for prepare in methods:
+                try:
+                    prepare(topic, params)
+                except Exception as e:
+                    self.logger.warn("Plugin '%s' failed to prepare %s: %s", prepare.__self__.name, topic, e)
+
+    @staticmethod
+    def _payload_key(value):
+        """
+        Returns a hashable stand-in for event params, equal for equal payloads.
+        """
+        if isinstance(value, dict):
+            return tuple(sorted((key, PluginManager._payload_key(item)) for key, item in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(PluginManager._payload_key(item) for item in value)
+        return value
+
+    @staticmethod
+    def _overrides_prepare(plugin):
+        """
+        Checks whether a plugin implements its own `prepare()`.
+        """
+        prepare = getattr(type(plugin), "prepare", None)
+        return prepare is not None and prepare is not BasePlugin.prepare
 
     def shutdown_plugins(self):
         """
         Gracefully shuts down all loaded plugins by calling their `on_shutdown()` methods.
-        Logs any failures during shutdown.
+
+        Plugins are shut down in reverse dependency order, each level concurrently.
+        Failures and plugins exceeding `shutdown_timeout` are logged; timings are
+        added to the report metadata under `plugin_shutdown`.
         """
-        for plugin in self.plugins:
+        with self._load_lock:
+            timings = reporter.metadata.setdefault("plugin_shutdown", {})
+            pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="plugin-stop")
             try:
-                plugin.on_shutdown()
-            except Exception as e:
-                self.logger.warn(f"Plugin '{plugin.name}' failed to shut down cleanly: {e}")
+                for level in reversed(self._dependency_levels(list(self._loaded))):
+                    started = time.perf_counter()
+                    futures = {
+                        self._loaded[name]: pool.submit(self._stop_plugin, self._loaded[name]) for name in level
+                    }
+                    for plugin, future in futures.items():
+                        try:
+                            elapsed = future.result(
+                                timeout=max(0.0, started + self.shutdown_timeout - time.perf_counter())
+                            )
+                            timings[plugin.name] = {"status": "ok", "shutdown_ms": round(elapsed * 1000, 3)}
+                        except FutureTimeoutError:
+                            self.logger.warn(
+                                "Plugin '%s' did not shut down within %.1fs", plugin.name, self.shutdown_timeout
+                            )
+                            timings[plugin.name] = {"status": "timeout", "timeout_s": self.shutdown_timeout}
+                        except Exception as e:
+                            self.logger.warn("Plugin '%s' failed to shut down cleanly: %s", plugin.name, e)
+                            timings[plugin.name] = {"status": "error", "error": str(e)}
+            finally:
+                pool.shutdown(wait=False)
+
+            for plugin in self.plugins:
+                self.event_bus.unsubscribe(plugin)
+            self.plugins = []
+            self._loaded = {}
+            self._failed = set()
+            reporter.metadata["plugins"] = []
+
+    def reset_plugins(self):
+        """
+        Calls `on_reset()` on every loaded plugin so the warm pool can serve the next run.
+
+        Plugins that failed to load are given another chance on the next `load_plugins`.
+        """
+        with self._load_lock:
+            for plugin in self.plugins:
+                try:
+                    plugin.on_reset()
+                except Exception as e:
+                    self.logger.warn("Plugin '%s' failed to reset: %s", plugin.name, e)
+            self._failed = set()
+
+    @staticmethod
+    def _stop_plugin(plugin):
+        """
+        Calls a plugin's `on_shutdown()`. Runs on a pool thread.
+
+        Args:
+            plugin (BasePlugin): Plugin to shut down.
+
+        Returns:
+            float: Seconds spent in `on_shutdown()`.
+        """
+        started = time.perf_counter()
+        plugin.on_shutdown()
+        return time.perf_counter() - started
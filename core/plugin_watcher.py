@@ -0,0 +1,140 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import os
+import threading
+
+
+class PluginWatcher:
+    """
+    PluginWatcher polls the plugin folders for changes to `main.py` and `plugin.yaml`
+    and hot-reloads the affected plugins through the PluginManager.
+
+    A change is acted on once the files have stayed unchanged for one more polling
+    interval, so an editor saving in several steps triggers a single reload.
+    Plugins that are not loaded are not imported; their manifest is refreshed so
+    the next scenario sees the new subscriptions.
+    """
+
+    WATCHED_FILES = ("main.py", "plugin.yaml")
+
+    def __init__(self, plugin_manager, logger, interval=1.0):
+        """
+        Initializes the watcher.
+
+        Args:
+            plugin_manager (PluginManager): Manager used to reload plugins.
+            logger (Logger): Logger used for output.
+            interval (float): Seconds between two scans of the plugin folder.
+        """
+        self.plugin_manager = plugin_manager
+        self.logger = logger
+        self.interval = interval
+        self._snapshot = {}
+        self._pending = {}  # Plugin folder name -> file state seen on the previous scan
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Records the current state of the plugin files and starts polling in the background.
+        """
+        if self._thread is not None:
+            return
+        self._snapshot = self._scan()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="PluginWatcher", daemon=True)
+        self._thread.start()
+        self.logger.info("Watching '%s' for plugin changes", self.plugin_manager.plugin_dir)
+
+    def stop(self):
+        """
+        Stops polling and waits for the background thread to exit.
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def poll(self):
+        """
+        Scans the plugin folder once and reloads plugins whose files changed and
+        have since settled.
+
+        Returns:
+            list[str]: Plugin folder names that were reloaded or refreshed.
+        """
+        current = self._scan()
+        changed = {
+            name for name in current.keys() | self._snapshot.keys()
+            if current.get(name) != self._snapshot.get(name)
+        }
+
+        settled = []
+        for name in changed:
+            if self._pending.get(name, object()) == current.get(name):
+                settled.append(name)
+            else:
+                self._pending[name] = current.get(name)
+
+        for name in sorted(settled):
+            del self._pending[name]
+            if name in current:
+                self._snapshot[name] = current[name]
+            else:
+                self._snapshot.pop(name, None)
+            self.logger.info("Plugin '%s' changed on disk", name)
+            self.plugin_manager.reload_plugin(name)
+        return sorted(settled)
+
+    def _run(self):
+        """
+        Background thread loop: polls until `stop()` is called.
+        """
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:
+                self.logger.error("Plugin watcher failed: %s", e)
+
+    def _scan(self):
+        """
+        Collects the size and modification time of every watched plugin file.
+
+        Returns:
+            dict: Plugin folder name -> tuple of (file, size, mtime_ns) entries.
+        """
+        state = {}
+        plugin_dir = self.plugin_manager.plugin_dir
+        for name in os.listdir(plugin_dir):
+            files = []
+            for filename in self.WATCHED_FILES:
+                try:
+                    stat = os.stat(os.path.join(plugin_dir, name, filename))
+                except OSError:
+                    continue
+                files.append((filename, stat.st_size, stat.st_mtime_ns))
+            if files:
+                state[name] = tuple(files)
+        return state
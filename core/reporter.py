@@ -39,6 +39,20 @@ class Reporter:
             self.plugin_responses = []
             self.errors = []
 
+    def reset(self):
+        """
+        Clears the logs of the previous run. The scenario file and the list of
+        loaded plugins are kept, since plugins stay loaded between runs.
+        """
+        self.metadata = {
+            "started_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "plugins": self.metadata["plugins"],
+            "scenario_file": self.metadata["scenario_file"],
+        }
+        self.event_log = []
+        self.plugin_responses = []
+        self.errors = []
+
     def _now(self):
         return {
             "real_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime()),
@@ -80,4 +94,11 @@ class Reporter:
                 "events": self.event_log,
                 "responses": self.plugin_responses,
                 "errors": self.errors
-            }, f, indent=2)
+            }, f, indent=2, default=self._json_default)
+
+    @staticmethod
+    def _json_default(value):
+        # Schema-coerced payloads carry bytes; report them as byte lists like the YAML source
+        if isinstance(value, (bytes, bytearray)):
+            return list(value)
+        return str(value)
@@ -22,7 +22,7 @@
 #
 
 
-import time
+from utils.logger import Logger
 
 class ScenarioEngine:
     """
@@ -50,35 +50,109 @@ class ScenarioEngine:
         Executes a scenario by processing each event at its designated simulation time.
 
         This function uses real wall-clock time to delay dispatch until the scheduled `event['time']`.
+        The clock is kept on the event bus (`event_bus.sim_time()`) so plugins can pace against it.
+        Events that plugins schedule on the bus (e.g. replayed GPS fixes) are merged in, and the
+        run lasts until both the scenario and the scheduled streams are exhausted.
 
         Args:
             events (list[dict]): List of events loaded from a scenario file.
                                  Each event must include 'time', 'target', 'action', and optional 'params'.
         """
-        self.logger.info(f"Starting scenario with {len(events)} event(s).")
+        self.logger.info("Starting scenario with %d event(s).", len(events))
         self.running = True
-        start_time = time.time()
+        self.event_bus.signals.clear()
+        self.event_bus.start_clock()
+        try:
+            self._dispatch(events)
+        finally:
+            self.event_bus.stop_clock()
+            self.event_bus.clear_scheduled()
+            # Records logged between runs carry no sim time
+            Logger.set_sim_time(None)
 
-        for event in events:
-            if not self.running:
-                self.logger.warn("Scenario stopped prematurely.")
-                break
+        self.logger.info("Scenario completed.")
+
+    def _dispatch(self, events):
+        """
+        Publishes the events at their scheduled times on the event bus clock,
+        merged with the events scheduled on the bus. On equal times, scenario
+        events go first. The run ends when both are exhausted and no stream is
+        reserved on the bus.
 
-            event_time = float(event["time"])
-            now = time.time()
-            elapsed = now - start_time
-            wait_time = max(0, event_time - elapsed)
+        The engine waits on the bus's condition variable rather than sleeping, so
+        an event scheduled earlier than the one it waits for, or `stop()`, wakes
+        it up.
 
+        Args:
+            events (list[dict]): Events in time order.
+        """
+        bus = self.event_bus
+        pending = iter(events)
+        event = next(pending, None)
+        while self.running:
+            scheduled_time = bus.next_scheduled()
+            if event is None and scheduled_time is None:
+                if not bus.streams_reserved():
+                    return
+                bus.wait_reserved()  # A plugin is still preparing a stream
+                continue
+
+            event_time = float(event["time"]) if event is not None else None
+            from_scenario = event_time is not None and (scheduled_time is None or event_time <= scheduled_time)
+            wait_time = (event_time if from_scenario else scheduled_time) - bus.sim_time()
             if wait_time > 0:
-                time.sleep(wait_time)
+                bus.wait_scheduled(wait_time, scheduled_time)
+                continue
 
-            topic = f"{event['target']}.{event['action']}"
-            params = event.get("params", {})
+            if from_scenario:
+                self._publish(event, event_time)
+                event = next(pending, None)
+            else:
+                bus.publish_scheduled()
 
-            self.logger.debug(f"Dispatching event @ {event_time:.3f}s → {topic}")
-            self.event_bus.publish(topic, params, event_time)
+        self.logger.warn("Scenario stopped prematurely.")
 
-        self.logger.info("Scenario completed.")
+    def _publish(self, event, event_time):
+        """
+        Publishes a scenario event, unless its condition is false.
+
+        Args:
+            event (dict): Parsed scenario event.
+            event_time (float): Its time in seconds.
+        """
+        topic = f"{event['target']}.{event['action']}"
+        params = event.get("params", {})
+
+        condition = event.get("condition_fn")
+        if condition is not None and not self._condition_holds(condition, event, topic):
+            return
+
+        Logger.set_sim_time(event_time)
+        self.logger.debug("Dispatching event @ %.3fs → %s", event_time, topic)
+        self.event_bus.publish(topic, params, event_time)
+
+    def _condition_holds(self, condition, event, topic):
+        """
+        Evaluates a compiled event condition against the current signal state.
+
+        Args:
+            condition (callable): Compiled condition from the ScenarioParser.
+            event (dict): The event being dispatched (for log messages).
+            topic (str): Event topic (for log messages).
+
+        Returns:
+            bool: True if the event should be dispatched. Unknown signals or
+                  evaluation errors count as False.
+        """
+        try:
+            if condition(self.event_bus.signals.__getitem__):
+                return True
+            self.logger.debug("Skipping %s @ %.3fs: condition '%s' is false", topic, event["time"], event["condition"])
+        except KeyError as e:
+            self.logger.debug("Skipping %s @ %.3fs: unknown signal %s", topic, event["time"], e)
+        except Exception as e:
+            self.logger.warn("Skipping %s @ %.3fs: condition '%s' failed: %s", topic, event["time"], event["condition"], e)
+        return False
 
     def stop(self):
         """
@@ -86,3 +160,4 @@ class ScenarioEngine:
         """
         self.logger.warn("Stopping scenario execution.")
         self.running = False
+        self.event_bus.wake()
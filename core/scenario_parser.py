@@ -22,8 +22,17 @@
 #
 
 
-import yaml
 import os
+import yaml
+import heapq
+import struct
+import marshal
+import hashlib
+from operator import itemgetter
+from core.expressions import ExpressionError, compile_expression, substitute
+
+# libyaml-backed loader when available; several times faster than the pure-Python one
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 class ScenarioParser:
     """
@@ -32,147 +41,554 @@ class ScenarioParser:
 
     It supports:
     - Basic event steps with time, target, and action
-    - Looping blocks to repeat steps with offsets
-    - Variable injection (for future use)
-    - Modular scenario imports
+    - Looping blocks to repeat steps with offsets, nestable and expanded lazily in time order
+    - Variables with `${expr}` substitution in params, resolved at parse time
+    - `condition:` expressions, compiled once and evaluated against live signals
+    - Modular scenario imports: several fragments per file, each with a time offset,
+      parsed once per load, checked for cycles and k-way merged by time
+    - A compiled cache of parsed scenarios, keyed by the content of the file and its imports
     """
 
-    def __init__(self, logger):
+    CACHE_VERSION = 6  # Bump whenever the normalized event format or dependency list changes
+
+    def __init__(self, logger, cache_dir=".cache/scenarios"):
         """
         Initializes the parser with a logger.
 
         Args:
             logger (Logger): The logger instance used for output.
+            cache_dir (str): Folder for compiled scenarios; None disables caching.
         """
         self.logger = logger
         self.variables = {}
+        self.cache_dir = cache_dir
+        self._dependencies = []
+        self._fragments = {}  # Absolute path -> sorted events, valid for one load()
+        self._import_stack = []  # Absolute paths currently being parsed, for cycle detection
+        self._source_names = {}  # Absolute path -> display name used in event 'source'
 
     def load(self, path: str) -> list[dict]:
         """
         Loads and parses a scenario YAML file from disk.
 
+        A compiled copy of the result is reused as long as the file and every file
+        it imports are unchanged. Variables from earlier loads are discarded.
+
         Args:
             path (str): Path to the scenario file.
 
         Returns:
             list[dict]: A sorted list of events (each with 'time', 'target', 'action', etc.)
         """
+        events = self._load_cache(path)
+        if events is None:
+            self.variables = {}
+            self._dependencies = []
+            self._fragments = {}
+            self._import_stack = []
+            events = self._load_file(path)
+            self._fragments = {}
+            if events:
+                self._store_cache(path, events)
+        return self._compile_conditions(events)
+
+    def loads(self, text: str, path: str = None) -> list[dict]:
+        """
+        Parses scenario YAML from a string, e.g. the contents of an editor buffer.
+
+        The result is never cached and variables from earlier calls are discarded.
+        Imports are resolved relative to `path`, which is also used as the event
+        'source' name.
+
+        Args:
+            text (str): Scenario YAML.
+            path (str): File the text belongs to, if any.
+
+        Returns:
+            list[dict]: A sorted list of events.
+
+        Raises:
+            yaml.YAMLError: If the text is not valid YAML.
+        """
+        raw_data = yaml.load(text, Loader=_YAML_LOADER)
+        self.variables = {}
+        self._dependencies = []
+        self._fragments = {}
+        self._import_stack = [os.path.abspath(path)] if path else []
+        try:
+            events = self._parse_document(raw_data, os.path.dirname(path) if path else ".")
+        finally:
+            self._fragments = {}
+            self._import_stack = []
+        return self._compile_conditions(events)
+
+    def _load_file(self, path):
+        """
+        Parses a single scenario file (and, recursively, its imports).
+
+        Each file is parsed at most once per load; importing it again reuses the
+        parsed events. Import cycles are reported and the offending import is skipped.
+
+        Args:
+            path (str): Path to the scenario file.
+
+        Returns:
+            list[dict]: A sorted list of events.
+        """
+        key = os.path.abspath(path)
+        if key in self._fragments:
+            return self._fragments[key]
+        if key in self._import_stack:
+            cycle = " -> ".join(self._import_stack[self._import_stack.index(key):] + [key])
+            self.logger.error("Import cycle detected, skipping: %s", cycle)
+            return []
+
         try:
-            with open(path, 'r') as f:
-                raw_data = yaml.safe_load(f)
+            raw_data = self._read_yaml(path)
         except Exception as e:
-            self.logger.error(f"Failed to load scenario file: {e}")
+            self.logger.error("Failed to load scenario file: %s", e)
             return []
 
-        if isinstance(raw_data, dict) and 'import' in raw_data:
-            return self._handle_imports(raw_data, os.path.dirname(path))
+        self._import_stack.append(key)
+        try:
+            events = self._parse_document(raw_data, os.path.dirname(path))
+        finally:
+            self._import_stack.pop()
+
+        self._fragments[key] = events
+        return events
+
+    def _parse_document(self, raw_data, base_dir):
+        """
+        Parses a loaded YAML document: either a list of steps or a mapping with
+        optional 'variables', 'import' and 'events' keys.
+
+        Args:
+            raw_data (list or dict): The parsed YAML document.
+            base_dir (str): Folder used to resolve relative imports.
 
-        # New: handle top-level keys like 'variables' and 'events'
+        Returns:
+            list[dict]: A sorted list of events.
+        """
         if isinstance(raw_data, dict):
             if 'variables' in raw_data:
                 self._parse_variables(raw_data['variables'])
-            if 'events' in raw_data:
-                return self._parse_steps(raw_data['events'])
 
-            self.logger.warn("Scenario YAML missing 'events' key.")
-            return []
+            streams = [self._handle_imports(raw_data, base_dir)] if 'import' in raw_data else []
+            if 'events' in raw_data:
+                streams.append(self._parse_steps(raw_data['events'], base_dir))
+            elif not streams:
+                self.logger.warn("Scenario YAML missing 'events' key.")
+                return []
+            return self._merge(streams)
 
-        return self._parse_steps(raw_data)
+        return self._parse_steps(raw_data or [], base_dir)
 
-    def _parse_steps(self, steps):
+    def _parse_steps(self, steps, base_dir="."):
         """
         Parses the scenario steps into a normalized list of events.
 
+        Steps of the form `{import: <file>, offset: <seconds>}` pull in a fragment
+        at that point of the timeline.
+
         Args:
             steps (list): List of raw YAML entries.
+            base_dir (str): Folder used to resolve relative imports.
 
         Returns:
             list[dict]: Parsed and time-sorted list of events.
         """
         parsed = []
+        streams = []
         for i, step in enumerate(steps):
             if 'loop' in step:
-                parsed.extend(self._parse_loop(step['loop']))
+                template = self._compile_loop(step['loop'], f"[{i}].loop")
+                if template:
+                    streams.append(self._iter_loop(template, 0.0))
             elif 'variables' in step:
                 self._parse_variables(step['variables'])
+            elif 'import' in step:
+                streams.append(self._handle_imports({'import': [step]}, base_dir))
             else:
-                event = self._normalize_step(step, i)
+                event = self._normalize_step(step, f"[{i}]")
                 if event:
                     parsed.append(event)
-        return sorted(parsed, key=lambda e: e["time"])
+        parsed.sort(key=itemgetter("time"))
+        return self._merge([parsed] + streams) if streams else parsed
+
+    @staticmethod
+    def _merge(streams):
+        """
+        Merges already time-sorted event lists without re-sorting the concatenation.
+
+        Loop iterators are consumed here, so the result is materialized: lazy loop
+        expansion avoids sorting and per-level intermediate lists, but a parsed
+        scenario is still held in memory as one list (it is cached, validated and
+        counted as such). Use a compiled scenario (.orsb) for streaming.
+
+        Args:
+            streams (list): Sorted event lists or iterators.
+
+        Returns:
+            list[dict]: A single sorted list. Ties keep the order of `streams`.
+        """
+        streams = [stream for stream in streams if not isinstance(stream, list) or stream]
+        if len(streams) == 1 and isinstance(streams[0], list):
+            return streams[0]
+        return list(heapq.merge(*streams, key=itemgetter("time")))
 
     def _normalize_step(self, step, index):
         """
         Ensures a step contains the required fields and formats it into a clean event.
 
+        The event records its origin as `source` (e.g. "scenarios/drive.yaml[2].loop.steps[0]"),
+        used to point at the offending step when later validation fails.
+
         Args:
             step (dict): A raw YAML event step.
-            index (int or str): Line or loop identifier for error reporting.
+            index (str): Position of the step within the current file, e.g. "[2]".
 
         Returns:
             dict or None: A valid event dict, or None if invalid.
         """
+        source = f"{self._current_source()}{index}"
         required_keys = ("time", "target", "action")
-        if not all(k in step for k in required_keys):
-            self.logger.warn(f"Skipping invalid step at index {index}: {step}")
+        if not isinstance(step, dict) or not all(k in step for k in required_keys):
+            self.logger.warn("Skipping invalid step at %s: %s", source, step)
+            return None
+
+        try:
+            time = float(substitute(step["time"], self.variables))
+            params = substitute(step.get("params", {}), self.variables)
+        except (ExpressionError, TypeError, ValueError) as e:
+            self.logger.error("Skipping step at %s: %s", source, e)
             return None
 
         return {
-            "time": float(step["time"]),
+            "time": time,
             "target": step["target"],
             "action": step["action"],
-            "params": step.get("params", {}),
-            "condition": step.get("condition", None)
+            "params": params,
+            "condition": step.get("condition", None),
+            "source": source
         }
 
-    def _parse_loop(self, loop):
+    def _current_source(self):
         """
-        Handles looped steps and unrolls them into repeated time-offset events.
+        Returns the display name of the file currently being parsed.
+
+        Returns:
+            str: Path relative to the working directory when possible.
+        """
+        if not self._import_stack:
+            return "<scenario>"
+        path = self._import_stack[-1]
+        name = self._source_names.get(path)
+        if name is None:
+            try:
+                name = os.path.relpath(path)
+            except ValueError:  # Different drive on Windows
+                name = path
+            self._source_names[path] = name
+        return name
+
+    def _compile_conditions(self, events):
+        """
+        Compiles each distinct `condition` expression once and attaches it to its
+        events as `condition_fn`, with scenario variables folded in as constants.
+
+        Events with an invalid condition are dropped with an error.
+
+        Args:
+            events (list[dict]): Normalized events.
+
+        Returns:
+            list[dict]: The events that remain valid.
+        """
+        compiled = {}
+        valid = []
+        for event in events:
+            condition = event.get("condition")
+            if condition is not None:
+                source = str(condition)
+                if source not in compiled:
+                    try:
+                        compiled[source] = compile_expression(source, self.variables)
+                    except ExpressionError as e:
+                        compiled[source] = e
+                if isinstance(compiled[source], ExpressionError):
+                    self.logger.error("Skipping event at %s: %s", event.get("source"), compiled[source])
+                    continue
+                event["condition_fn"] = compiled[source]
+            valid.append(event)
+        return valid
+
+    def _compile_loop(self, loop, index):
+        """
+        Validates a loop block once and turns it into a reusable template.
+
+        A loop block has `count`, `interval` and `steps`, plus an optional `time`
+        at which the first iteration starts (relative to the enclosing iteration).
+        Steps may themselves be loop blocks:
+
+            - loop:
+                count: 10          # laps
+                interval: 120
+                steps:
+                  - loop:
+                      count: 200   # waypoints per lap
+                      interval: 0.5
+                      steps: [...]
+
+        Step times are relative to the start of their iteration. Invalid steps are
+        reported here, once, instead of once per iteration.
 
         Args:
-            loop (dict): A loop block with count, interval, and steps.
+            loop (dict): A loop block.
+            index (str): Position of the block within the current file, e.g. "[3].loop".
 
         Returns:
-            list[dict]: Flattened list of events.
+            tuple or None: (start, count, interval, events, children, first, last), where
+                           first/last bound the event times of one iteration; None if invalid.
         """
-        count = loop.get("count", 1)
-        interval = loop.get("interval", 1)
-        steps = loop.get("steps", [])
+        try:
+            start = float(substitute(loop.get("time", 0), self.variables))
+            count = int(substitute(loop.get("count", 1), self.variables))
+            interval = float(substitute(loop.get("interval", 1), self.variables))
+        except (ExpressionError, TypeError, ValueError) as e:
+            self.logger.error("Skipping loop at %s%s: %s", self._current_source(), index, e)
+            return None
+
         events = []
+        children = []
+        for i, step in enumerate(loop.get("steps", [])):
+            if isinstance(step, dict) and 'loop' in step:
+                child = self._compile_loop(step['loop'], f"{index}.steps[{i}].loop")
+                if child:
+                    children.append(child)
+                continue
+            if isinstance(step, dict) and 'time' not in step:
+                step = dict(step, time=0)
+            event = self._normalize_step(step, f"{index}.steps[{i}]")
+            if event:
+                events.append(event)
+        events.sort(key=itemgetter("time"))
 
-        for i in range(count):
-            offset = i * interval
-            for step in steps:
-                new_step = step.copy()
-                new_step["time"] = float(step.get("time", 0)) + offset
-                events.append(self._normalize_step(new_step, f"loop-{i}"))
-        return events
+        bounds = [(events[0]["time"], events[-1]["time"])] if events else []
+        for c_start, c_count, c_interval, _, _, c_first, c_last in children:
+            if c_count > 0:
+                bounds.append((c_start + c_first, c_start + (c_count - 1) * c_interval + c_last))
+        if count <= 0 or not bounds:
+            return None
+
+        first = min(b[0] for b in bounds)
+        last = max(b[1] for b in bounds)
+        return (start, count, interval, events, children, first, last)
+
+    def _iter_loop(self, template, base):
+        """
+        Lazily yields the events of a compiled loop in time order.
+
+        Iterations that cannot overlap are simply chained; overlapping ones are
+        k-way merged. Nothing is materialized beyond one pending event per iteration.
+
+        Args:
+            template (tuple): Result of `_compile_loop`.
+            base (float): Absolute time of the enclosing iteration.
+
+        Yields:
+            dict: Events with absolute times.
+        """
+        start, count, interval, events, children, first, last = template
+        offsets = (base + start + i * interval for i in range(count))
+        iterations = (self._iter_iteration(events, children, offset) for offset in offsets)
+
+        if interval >= last - first:
+            for iteration in iterations:
+                yield from iteration
+        else:
+            yield from heapq.merge(*iterations, key=itemgetter("time"))
+
+    def _iter_iteration(self, events, children, offset):
+        """
+        Yields one loop iteration: its own events merged with its nested loops.
+
+        Args:
+            events (list[dict]): The loop's normalized events (relative times).
+            children (list[tuple]): Nested loop templates.
+            offset (float): Absolute start time of this iteration.
+
+        Yields:
+            dict: Events with absolute times.
+        """
+        own = (dict(event, time=event["time"] + offset) for event in events)  # params stay shared
+        if not children:
+            yield from own
+            return
+        nested = [self._iter_loop(child, offset) for child in children]
+        yield from heapq.merge(own, *nested, key=itemgetter("time"))
 
     def _parse_variables(self, var_block):
         """
-        Stores reusable variables for future parameter expansion.
+        Stores reusable variables for `${var}` expansion and conditions.
 
         Args:
             var_block (dict): A dictionary of reusable variable blocks.
         """
         self.variables.update(var_block)
-        self.logger.debug(f"Loaded variables: {self.variables}")
+        self.logger.debug("Loaded variables: %s", self.variables)
 
     def _handle_imports(self, data, base_dir):
         """
         Handles imported YAML fragments by path and loads them recursively.
 
+        The 'import' value may be a single path or a list whose entries are paths
+        or mappings `{file: <path>, offset: <seconds>}`:
+
+            import:
+              - common/setup
+              - file: highway_cruise
+                offset: 30
+
         Args:
             data (dict): YAML data that includes an 'import' directive.
             base_dir (str): Base path to resolve relative imports.
 
         Returns:
-            list[dict]: Events loaded from the imported scenario.
+            list[dict]: Events of all imported fragments, shifted and merged by time.
         """
-        import_path = data['import']
-        if not import_path.endswith(".yaml"):
-            import_path += ".yaml"
-        full_path = os.path.join(base_dir, import_path)
+        imports = data['import']
+        if not isinstance(imports, list):
+            imports = [imports]
+
+        streams = []
+        for entry in imports:
+            if isinstance(entry, dict):
+                import_path = entry.get('file', entry.get('import'))
+                offset = float(entry.get('offset', 0))
+            else:
+                import_path, offset = entry, 0.0
+            if not import_path:
+                self.logger.warn("Skipping import without a file: %s", entry)
+                continue
+
+            if not os.path.splitext(str(import_path))[1]:
+                import_path = f"{import_path}.yaml"
+            full_path = os.path.join(base_dir, import_path)
+
+            self.logger.info("Importing scenario: %s (offset %.3fs)", full_path, offset)
+            fragment = self._load_file(full_path)
+            # New event dicts give each import of a fragment its own times; params
+            # dicts stay shared, as across loop iterations, so they are validated once
+            streams.append([dict(event, time=event["time"] + offset) for event in fragment])
+        return self._merge(streams)
 
-        self.logger.info(f"Importing scenario: {full_path}")
-        return self.load(full_path)
+    def _read_yaml(self, path):
+        """
+        Reads and parses a YAML file, recording it as a dependency of the current load.
+
+        A missing file is recorded too, so creating it later invalidates the cache.
+
+        Args:
+            path (str): Path to the YAML file.
+
+        Returns:
+            object: The parsed YAML document.
+        """
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except FileNotFoundError:
+            self._dependencies.append((os.path.abspath(path), -1, -1, None))
+            raise
+        stat = os.stat(path)
+        self._dependencies.append(
+            (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, hashlib.sha256(content).hexdigest())
+        )
+        return yaml.load(content, Loader=_YAML_LOADER)
+
+    def _cache_path(self, path):
+        """
+        Returns the compiled cache file used for a scenario path.
+
+        Args:
+            path (str): Path to the scenario file.
+
+        Returns:
+            str: Cache file path.
+        """
+        key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.bin")
+
+    def _load_cache(self, path):
+        """
+        Returns the cached events for a scenario if the file and all its imports
+        are unchanged.
+
+        Files whose size and mtime match the recorded values are trusted as-is;
+        otherwise their content hash is compared.
+
+        Args:
+            path (str): Path to the scenario file.
+
+        Returns:
+            list[dict] or None: Cached events, or None on a cache miss.
+        """
+        if not self.cache_dir:
+            return None
+        cache_path = self._cache_path(path)
+        if not os.path.exists(cache_path):
+            return None
+
+        try:
+            with open(cache_path, 'rb') as f:
+                header_size, = struct.unpack("<I", f.read(4))
+                version, dependencies, variables = marshal.loads(f.read(header_size))
+                if version != self.CACHE_VERSION:
+                    return None
+
+                for dep_path, size, mtime_ns, digest in dependencies:
+                    if digest is None:
+                        if os.path.exists(dep_path):
+                            return None  # A missing import has been created since
+                        continue
+                    stat = os.stat(dep_path)
+                    if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+                        continue
+                    with open(dep_path, 'rb') as dep:
+                        if hashlib.sha256(dep.read()).hexdigest() != digest:
+                            return None
+
+                events = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError, struct.error) as e:
+            self.logger.debug("Ignoring scenario cache %s: %s", cache_path, e)
+            return None
+
+        self.variables = dict(variables)
+        self.logger.debug("Loaded %d event(s) from scenario cache %s", len(events), cache_path)
+        return events
+
+    def _store_cache(self, path, events):
+        """
+        Writes the parsed events and the dependency list of the last load to the cache.
+
+        Args:
+            path (str): Path to the scenario file.
+            events (list[dict]): Normalized, sorted events.
+        """
+        if not self.cache_dir:
+            return
+        cache_path = self._cache_path(path)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            header = marshal.dumps((self.CACHE_VERSION, self._dependencies, self.variables))
+            with open(tmp_path, 'wb') as f:
+                f.write(struct.pack("<I", len(header)))
+                f.write(header)
+                f.write(marshal.dumps(events))
+            os.replace(tmp_path, cache_path)
+        except (OSError, ValueError) as e:
+            self.logger.warn("Could not write scenario cache %s: %s", cache_path, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
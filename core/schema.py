@@ -0,0 +1,193 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+class SchemaError(ValueError):
+    """
+    Raised when event params do not match the schema declared by a plugin.
+    """
+
+
+def _to_int(value):
+    if isinstance(value, bool):
+        raise ValueError("expected an integer, got a boolean")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return int(value.strip(), 0)  # Accepts "201", "0x0C9", "0b1010"
+    raise ValueError(f"expected an integer, got {type(value).__name__}")
+
+
+def _to_float(value):
+    if isinstance(value, bool):
+        raise ValueError("expected a number, got a boolean")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        return float(value)
+    raise ValueError(f"expected a number, got {type(value).__name__}")
+
+
+def _to_str(value):
+    if isinstance(value, str):
+        return value
+    raise ValueError(f"expected a string, got {type(value).__name__}")
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ("true", "false", "yes", "no", "on", "off"):
+        return value.lower() in ("true", "yes", "on")
+    raise ValueError(f"expected a boolean, got {type(value).__name__}")
+
+
+def _to_bytes(value):
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    if isinstance(value, list):
+        return bytes(_to_int(item) for item in value)  # bytes() rejects values outside 0..255
+    if isinstance(value, str):
+        text = value.strip()
+        if text[:2].lower() == "0x":
+            text = text[2:]
+        return bytes.fromhex(text)
+    raise ValueError(f"expected a byte list or hex string, got {type(value).__name__}")
+
+
+def _of_type(expected, name):
+    def check(value):
+        if not isinstance(value, expected):
+            raise ValueError(f"expected {name}, got {type(value).__name__}")
+        return value
+    return check
+
+
+_COERCERS = {
+    "int": _to_int,
+    "float": _to_float,
+    "number": _to_float,
+    "str": _to_str,
+    "bool": _to_bool,
+    "bytes": _to_bytes,
+    "list": _of_type(list, "a list"),
+    "dict": _of_type(dict, "a mapping"),
+    "any": lambda value: value,
+}
+
+
+def _compile_field(name, spec):
+    """
+    Builds the coerce-and-check function for one field.
+
+    Args:
+        name (str): Field name.
+        spec (dict or str): Field spec, or just a type name.
+
+    Returns:
+        tuple: (name, convert, required, has_default, default)
+    """
+    if isinstance(spec, str):
+        spec = {"type": spec}
+    type_name = spec.get("type", "any")
+    if type_name not in _COERCERS:
+        raise SchemaError(f"Unknown type '{type_name}' for field '{name}'")
+
+    coerce = _COERCERS[type_name]
+    checks = []
+    if "min" in spec:
+        minimum = spec["min"]
+        checks.append(lambda v: v >= minimum or f"must be >= {minimum}")
+    if "max" in spec:
+        maximum = spec["max"]
+        checks.append(lambda v: v <= maximum or f"must be <= {maximum}")
+    if "min_length" in spec:
+        min_length = spec["min_length"]
+        checks.append(lambda v: len(v) >= min_length or f"must have at least {min_length} item(s)")
+    if "max_length" in spec:
+        max_length = spec["max_length"]
+        checks.append(lambda v: len(v) <= max_length or f"must have at most {max_length} item(s)")
+    if "choices" in spec:
+        choices = list(spec["choices"])
+        checks.append(lambda v: v in choices or f"must be one of {choices}")
+
+    def convert(value):
+        value = coerce(value)
+        for check in checks:
+            result = check(value)
+            if result is not True:
+                raise ValueError(result)
+        return value
+
+    has_default = "default" in spec
+    default = convert(spec["default"]) if has_default else None
+    return (name, convert, bool(spec.get("required", False)), has_default, default)
+
+
+def compile_schema(spec):
+    """
+    Compiles a params schema from `plugin.yaml` into a validator function.
+
+    A schema maps field names to a type name or a spec with `type`
+    (int, float, number, str, bool, bytes, list, dict, any) and optional
+    `required`, `default`, `min`, `max`, `min_length`, `max_length` and `choices`:
+
+        schemas:
+          send:
+            id: {type: int, required: true, max: 0x1FFFFFFF}
+            data: {type: bytes, max_length: 8, default: []}
+
+    Values are coerced to their declared type (e.g. "0x0C9" -> 201 for int,
+    [0x1F, 0x40] -> b'\\x1f@' for bytes). Fields not in the schema are kept as-is.
+
+    Args:
+        spec (dict): Field name to field spec.
+
+    Returns:
+        callable: `validate(params)` returning a new, coerced params dict.
+
+    Raises:
+        SchemaError: If the schema itself is invalid (at compile time), or if
+                     params do not match it (when the validator is called).
+    """
+    fields = [_compile_field(name, field_spec) for name, field_spec in (spec or {}).items()]
+
+    def validate(params):
+        if not isinstance(params, dict):
+            raise SchemaError(f"params must be a mapping, got {type(params).__name__}")
+        result = dict(params)
+        for name, convert, required, has_default, default in fields:
+            if name not in result or result[name] is None:
+                if has_default:
+                    result[name] = default
+                elif required:
+                    raise SchemaError(f"'{name}' is required")
+                continue
+            try:
+                result[name] = convert(result[name])
+            except (ValueError, TypeError) as e:
+                raise SchemaError(f"'{name}' {e}") from None
+        return result
+
+    return validate
@@ -22,7 +22,9 @@
 #
 from utils.logger import Logger
 from core.api_interface import APIInterface
+from core.config_loader import ConfigLoader
 import argparse
+import sys
 import time
 
 # Add colored listener
@@ -38,13 +40,42 @@ def color_console_listener(level, tag, message, timestamp):
     reset = COLORS['RESET']
     print(f"{color}[{timestamp}] [{tag}] [{level}] {message}{reset}")
 
+def compile_main(argv):
+    parser = argparse.ArgumentParser(
+        prog="main.py compile",
+        description="Compile YAML/NMEA/candump sources into a binary .orsb scenario",
+    )
+    parser.add_argument("sources", nargs="+", help="Scenario sources (.yaml, .nmea, .log/.candump)")
+    parser.add_argument("-o", "--output", required=True, help="Output .orsb file")
+    parser.add_argument("--debug", action="store_true")
+    args = parser.parse_args(argv)
+
+    Logger.add_global_listener(color_console_listener)
+    Logger.configure(ConfigLoader.get("logging"))
+    logger = Logger(enable_debug=args.debug)
+    runner = APIInterface.get_instance(logger)
+
+    status = 0
+    try:
+        runner.compile_scenario(args.sources, args.output)
+    except Exception as e:
+        logger.error(f"Error: {e}")
+        status = 1
+
+    Logger.shutdown()
+    return status
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "compile":
+        sys.exit(compile_main(sys.argv[2:]))
+
     parser = argparse.ArgumentParser(description="OpenRoadSim Console Runner")
-    parser.add_argument("scenario", help="Path to YAML scenario file")
+    parser.add_argument("scenario", help="Path to YAML or compiled .orsb scenario file")
     parser.add_argument("--debug", action="store_true")
     args = parser.parse_args()
 
     Logger.add_global_listener(color_console_listener)
+    Logger.configure(ConfigLoader.get("logging"))
     logger = Logger(enable_debug=args.debug)
 
     runner = APIInterface.get_instance(logger)
@@ -64,7 +95,9 @@ def main():
     except Exception as e:
         logger.error(f"Error: {e}")
 
+    runner.shutdown()
     logger.info("Simulation done.")
+    Logger.shutdown()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,199 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import queue
+import threading
+
+import can
+from plugins.can.loopback import LoopbackBus
+
+BACKENDS = ("socketcan", "virtual", "loopback")
+FD_LENGTHS = (0, 1, 2, 3, 4, 5, 6, 7, 8, 12, 16, 20, 24, 32, 48, 64)  # Valid CAN FD payload sizes
+
+
+def fd_length(length):
+    """
+    Returns the smallest valid CAN FD payload size that holds `length` bytes.
+
+    Raises:
+        ValueError: If the payload is longer than 64 bytes.
+    """
+    for size in FD_LENGTHS:
+        if size >= length:
+            return size
+    raise ValueError(f"CAN FD payload of {length} bytes exceeds 64 bytes")
+
+
+class CanChannel:
+    """
+    One named CAN or CAN FD bus with its own send worker.
+
+    `send` only queues the frame; a worker thread writes it to the bus. A
+    saturated channel (full TX queue, slow bus) therefore backs up its own queue
+    and never blocks the engine or the other channels. When the queue is full,
+    frames are dropped and counted rather than blocking.
+
+    Attributes:
+        name (str): Channel name used by events (`channel:` param).
+        interface (str): OS interface, e.g. 'vcan0' or 'can1' (a channel name for
+                         the virtual and loopback backends).
+        backend (str): 'socketcan', 'virtual' (python-can's in-process bus, shared
+                       by every bus opened on the same interface name) or
+                       'loopback' (a `LoopbackBus` recording what is sent).
+        fd (bool): CAN FD channel (payloads up to 64 bytes).
+        bitrate_switch (bool): Send FD frames with the bit rate switch (BRS) set.
+        padding (int): Byte used to pad FD payloads to a valid length.
+        bus (can.BusABC): Open bus, or None if the interface could not be opened.
+        sent (int): Frames written by the worker.
+        dropped (int): Frames dropped because the queue was full.
+        errors (int): Frames the bus refused.
+    """
+
+    def __init__(self, name, interface, logger, fd=False, bitrate_switch=False, padding=0,
+                 queue_size=4096, send_timeout=0.1, backend="socketcan", clock=None, record_size=100000):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown CAN backend '{backend}' (expected one of {', '.join(BACKENDS)})")
+        self.name = name
+        self.interface = interface
+        self.backend = backend
+        self.clock = clock
+        self.record_size = record_size
+        self.logger = logger
+        self.fd = fd
+        self.bitrate_switch = bitrate_switch
+        self.padding = padding
+        self.send_timeout = send_timeout
+        self.bus = None
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._worker = None
+
+    def open(self):
+        """
+        Opens the bus on the configured backend and starts the send worker.
+
+        Raises:
+            Exception: If python-can cannot open the interface.
+        """
+        if self.backend == "loopback":
+            self.bus = LoopbackBus(self.interface, clock=self.clock, record_size=self.record_size)
+        elif self.backend == "virtual":
+            self.bus = can.interface.Bus(channel=self.interface, interface="virtual")
+        else:
+            self.bus = can.interface.Bus(channel=self.interface, interface="socketcan", fd=self.fd)
+        self._worker = threading.Thread(target=self._run, name=f"can-{self.name}-tx", daemon=True)
+        self._worker.start()
+
+    def message(self, arbitration_id, data, extended, fd=None, bitrate_switch=None):
+        """
+        Builds a frame for this channel: CAN FD flags and padding on FD channels,
+        classic frames otherwise.
+
+        Args:
+            arbitration_id (int): CAN ID.
+            data (bytes): Payload.
+            extended (bool): 29-bit ID.
+            fd (bool): CAN FD frame; None follows the channel.
+            bitrate_switch (bool): FD bit rate switch; None follows the channel.
+
+        Returns:
+            can.Message: The frame.
+
+        Raises:
+            ValueError: If the payload or frame type does not fit the channel.
+        """
+        if fd and not self.fd:
+            raise ValueError(f"CAN FD frame on classic CAN channel '{self.name}'")
+        if not (self.fd if fd is None else fd):
+            if len(data) > 8:
+                raise ValueError(f"{len(data)}-byte payload on classic CAN channel '{self.name}'")
+            return can.Message(arbitration_id=arbitration_id, data=data, is_extended_id=extended)
+        size = fd_length(len(data))
+        if size > len(data):
+            data = data + bytes([self.padding]) * (size - len(data))
+        return can.Message(
+            arbitration_id=arbitration_id, data=data, is_extended_id=extended, is_fd=True,
+            bitrate_switch=self.bitrate_switch if bitrate_switch is None else bitrate_switch,
+        )
+
+    def send(self, frame):
+        """
+        Queues a frame for the send worker. Does nothing if the bus is not open.
+
+        Args:
+            frame (can.Message): Frame to send.
+        """
+        if self.bus is None:
+            return
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            if not self.dropped:
+                self.logger.warn("CAN channel '%s' is saturated; dropping frames", self.name)
+            self.dropped += 1
+
+    def pending(self):
+        """
+        Returns:
+            int: Frames queued but not yet sent.
+        """
+        return self._queue.qsize()
+
+    def flush(self):
+        """
+        Blocks until every queued frame has been handed to the bus.
+        """
+        if self._worker is not None:
+            self._queue.join()
+
+    def _run(self):
+        """
+        Send worker: writes queued frames to the bus in order.
+        """
+        while True:
+            frame = self._queue.get()
+            try:
+                if frame is None:
+                    return
+                self.bus.send(frame, timeout=self.send_timeout)
+                self.sent += 1
+            except can.CanError as e:
+                if not self.errors:
+                    self.logger.error("Failed to send on CAN channel '%s': %s", self.name, e)
+                self.errors += 1
+            finally:
+                self._queue.task_done()
+
+    def close(self):
+        """
+        Sends what is still queued, stops the worker and closes the bus.
+        """
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join(timeout=2.0)
+            self._worker = None
+        if self.bus is not None:
+            self.bus.shutdown()
+            self.bus = None
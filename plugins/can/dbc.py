@@ -0,0 +1,326 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import re
+
+try:
+    import numpy as np
+except ImportError:  # Only needed for batch packing
+    np = None
+
+_MESSAGE = re.compile(r"^BO_\s+(\d+)\s+(\w+)\s*:\s*(\d+)")
+_SIGNAL = re.compile(
+    r"^SG_\s+(\w+)\s*(?:\w+\s*)?:\s*(\d+)\|(\d+)@([01])([+-])\s*"
+    r"\(\s*([^,]+),\s*([^)]+)\)\s*\[\s*([^|]*)\|\s*([^\]]*)\]\s*\"([^\"]*)\""
+)
+
+
+class DbcSignal:
+    """
+    A signal of a DBC message: bit layout and physical scaling.
+
+    Attributes:
+        name (str): Signal name.
+        start (int): DBC start bit (LSB for Intel, MSB for Motorola byte order).
+        length (int): Length in bits.
+        big_endian (bool): True for Motorola (@0), False for Intel (@1).
+        signed (bool): True for two's complement raw values.
+        factor (float): Physical = raw * factor + offset.
+        offset (float): See factor.
+        minimum (float): Lowest physical value (0 with maximum 0 means unbounded).
+        maximum (float): Highest physical value.
+        unit (str): Unit text.
+    """
+
+    def __init__(self, name, start, length, big_endian, signed, factor, offset, minimum, maximum, unit):
+        self.name = name
+        self.start = start
+        self.length = length
+        self.big_endian = big_endian
+        self.signed = signed
+        self.factor = factor
+        self.offset = offset
+        self.minimum = minimum
+        self.maximum = maximum
+        self.unit = unit
+
+    @property
+    def initial(self):
+        """
+        float: Physical value used before the signal is first set (0, or the
+        nearest in-range value).
+        """
+        if self.maximum > self.minimum:
+            return min(max(0.0, self.minimum), self.maximum)
+        return 0.0
+
+    def raw_bounds(self):
+        """
+        Returns the allowed raw range, from the bit width and the physical limits.
+
+        Returns:
+            tuple: (lowest raw value, highest raw value).
+        """
+        if self.signed:
+            low, high = -(1 << (self.length - 1)), (1 << (self.length - 1)) - 1
+        else:
+            low, high = 0, (1 << self.length) - 1
+        if self.maximum > self.minimum:
+            limits = sorted(((self.minimum - self.offset) / self.factor, (self.maximum - self.offset) / self.factor))
+            low = max(low, int(round(limits[0])))
+            high = min(high, int(round(limits[1])))
+        return low, high
+
+
+class DbcMessage:
+    """
+    A DBC message with a precompiled packer for its signals.
+
+    The layout of every signal (scale, raw range, mask, shift, byte order) is
+    computed once, so packing a frame is a handful of integer operations per signal.
+    """
+
+    def __init__(self, frame_id, name, length, extended=False):
+        self.frame_id = frame_id
+        self.name = name
+        self.length = length
+        self.extended = extended
+        self.signals = {}
+        self._layout = None
+
+    def add_signal(self, signal):
+        self.signals[signal.name] = signal
+        self._layout = None
+
+    def initial_values(self):
+        """
+        Returns:
+            dict: Signal name -> initial physical value.
+        """
+        return {name: signal.initial for name, signal in self.signals.items()}
+
+    def _compile(self):
+        """
+        Precomputes (name, factor, offset, raw low, raw high, mask, shift, big endian,
+        signed) per signal. Intel signals are shifted into the little-endian integer of the
+        payload, Motorola signals into the big-endian one.
+        """
+        layout = []
+        bits = self.length * 8
+        for signal in self.signals.values():
+            if signal.big_endian:
+                msb = (signal.start // 8) * 8 + (7 - signal.start % 8)  # Bit index from the left
+                shift = bits - msb - signal.length
+            else:
+                shift = signal.start
+            if shift < 0 or shift + signal.length > bits:
+                raise ValueError(f"Signal {signal.name} does not fit in {self.name} ({self.length} bytes)")
+            low, high = signal.raw_bounds()
+            layout.append((
+                signal.name, signal.factor, signal.offset, low, high,
+                (1 << signal.length) - 1, shift, signal.big_endian, signal.signed,
+            ))
+        self._layout = layout
+        return layout
+
+    def pack(self, values):
+        """
+        Encodes physical signal values into a payload.
+
+        Args:
+            values (dict): Signal name -> physical value, for every signal of the message.
+
+        Returns:
+            bytes: Payload of `length` bytes.
+
+        Raises:
+            ValueError: If a value is outside the signal's range.
+        """
+        layout = self._layout or self._compile()
+        little = big = 0
+        for name, factor, offset, low, high, mask, shift, big_endian, _ in layout:
+            raw = round((values[name] - offset) / factor)
+            if raw < low or raw > high:
+                raise ValueError(f"{self.name}.{name} = {values[name]} is out of range")
+            if big_endian:
+                big |= (raw & mask) << shift
+            else:
+                little |= (raw & mask) << shift
+        if big:
+            little |= int.from_bytes(big.to_bytes(self.length, "big"), "little")
+        return little.to_bytes(self.length, "little")
+
+    def unpack(self, data):
+        """
+        Decodes a payload into physical signal values.
+
+        Args:
+            data (bytes): Payload; shorter payloads are zero-padded.
+
+        Returns:
+            dict: Signal name -> physical value.
+        """
+        layout = self._layout or self._compile()
+        data = bytes(data[:self.length]).ljust(self.length, b"\0")
+        little = int.from_bytes(data, "little")
+        big = int.from_bytes(data, "big")
+        values = {}
+        for name, factor, offset, _, _, mask, shift, big_endian, signed in layout:
+            raw = ((big if big_endian else little) >> shift) & mask
+            if signed and raw > mask >> 1:
+                raw -= mask + 1
+            values[name] = raw * factor + offset
+        return values
+
+    def pack_batch(self, samples):
+        """
+        Encodes arrays of physical values into many payloads in one vectorized pass.
+
+        Args:
+            samples (dict): Signal name -> 1-D array-like of physical values; all of
+                            the same length, for every signal of the message.
+
+        Returns:
+            numpy.ndarray: uint8 array of shape (samples, length).
+
+        Raises:
+            RuntimeError: If NumPy is not installed.
+            ValueError: If a value is outside its signal's range.
+        """
+        if np is None:
+            raise RuntimeError("NumPy is required for batch packing")
+        layout = self._layout or self._compile()
+        count = len(next(iter(samples.values()))) if samples else 0
+        words = (self.length + 7) // 8  # CAN FD payloads span several 64-bit words
+        little = np.zeros((count, words), dtype=np.uint64)
+        big = np.zeros((count, words), dtype=np.uint64)
+        for name, factor, offset, low, high, mask, shift, big_endian, _ in layout:
+            raw = np.rint((np.asarray(samples[name], dtype=np.float64) - offset) / factor).astype(np.int64)
+            if raw.size and (raw.min() < low or raw.max() > high):
+                raise ValueError(f"{self.name}.{name} has samples out of range")
+            bits = (raw & mask).astype(np.uint64)
+            target = big if big_endian else little
+            word, bit = divmod(shift, 64)
+            target[:, word] |= bits << np.uint64(bit)
+            if bit and bit + mask.bit_length() > 64:
+                target[:, word + 1] |= bits >> np.uint64(64 - bit)
+
+        # Both accumulators hold their integer as little-endian words; the Motorola
+        # one is the payload read big-endian, so its bytes are reversed
+        frames = little.astype("<u8").view(np.uint8).reshape(count, words * 8)[:, :self.length]
+        frames |= big.astype("<u8").view(np.uint8).reshape(count, words * 8)[:, self.length - 1::-1] if self.length else 0
+        return frames
+
+
+class Database:
+    """
+    Messages and signals loaded from one or more DBC files.
+
+    Only what is needed for encoding and decoding is read: messages (BO_) and
+    their signals (SG_). Multiplexed signals are treated as plain signals.
+    """
+
+    def __init__(self):
+        self.messages = {}  # Message name -> DbcMessage
+        self.by_id = {}  # CAN ID -> DbcMessage
+        self._by_signal = {}  # Signal name -> messages containing it
+
+    def load(self, path):
+        """
+        Adds the messages of a DBC file.
+
+        Args:
+            path (str): Path to the .dbc file.
+
+        Raises:
+            ValueError: If a signal definition cannot be parsed.
+        """
+        message = None
+        with open(path, "r", encoding="latin-1") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if line.startswith("BO_ "):
+                    match = _MESSAGE.match(line)
+                    frame_id = int(match.group(1))
+                    message = DbcMessage(
+                        frame_id & 0x1FFFFFFF, match.group(2), int(match.group(3)),
+                        extended=bool(frame_id & 0x80000000),
+                    )
+                    self.messages[message.name] = message
+                    self.by_id[message.frame_id] = message
+                elif line.startswith("SG_ ") and message is not None:
+                    match = _SIGNAL.match(line)
+                    if match is None:
+                        raise ValueError(f"{path}:{line_number}: cannot parse signal: {line}")
+                    name, start, length, order, sign, factor, offset, minimum, maximum, unit = match.groups()
+                    message.add_signal(DbcSignal(
+                        name, int(start), int(length), order == "0", sign == "-",
+                        float(factor), float(offset), float(minimum or 0), float(maximum or 0), unit,
+                    ))
+                    self._by_signal.setdefault(name, []).append(message)
+                elif not line.startswith("SG_ "):
+                    message = None
+
+    def lookup(self, signal_name, message_name=None):
+        """
+        Finds the message carrying a signal.
+
+        Args:
+            signal_name (str): Signal name, or 'Message.Signal'.
+            message_name (str): Message name, needed when the signal name is ambiguous.
+
+        Returns:
+            tuple: (DbcMessage, signal name).
+
+        Raises:
+            KeyError: If the signal is unknown or ambiguous.
+        """
+        if message_name is None and "." in signal_name:
+            message_name, signal_name = signal_name.split(".", 1)
+        if message_name is not None:
+            message = self.messages.get(message_name)
+            if message is None or signal_name not in message.signals:
+                raise KeyError(f"Unknown signal {message_name}.{signal_name}")
+            return message, signal_name
+
+        candidates = self._by_signal.get(signal_name, [])
+        if len(candidates) != 1:
+            problem = "Unknown" if not candidates else "Ambiguous (give 'message')"
+            raise KeyError(f"{problem} signal {signal_name}")
+        return candidates[0], signal_name
+
+
+def load_dbc(paths):
+    """
+    Loads DBC files into one database.
+
+    Args:
+        paths (str or list[str]): DBC file path(s).
+
+    Returns:
+        Database: The loaded messages and signals.
+    """
+    database = Database()
+    for path in [paths] if isinstance(paths, str) else paths:
+        database.load(path)
+    return database
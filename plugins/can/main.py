@@ -21,55 +21,305 @@
 # SOFTWARE.
 #
 
-import can
+import os
+import time
+import threading
 from core.base_plugin import BasePlugin
 from utils.logger import Logger
 from core.config_loader import ConfigLoader
+from plugins.can.channel import CanChannel
+from plugins.can.dbc import load_dbc, np
+from plugins.can.loopback import LoopbackBus
+from plugins.can.replay import LogReplay
 
 class CanPlugin(BasePlugin):
     """
     CanPlugin handles CAN signal injection using the SocketCAN interface.
 
-    It listens for `can.send` events, validates and formats the data,
-    and transmits CAN frames through a configured Linux CAN interface.
+    It listens for `can.send` events and transmits CAN frames through the configured
+    Linux CAN interfaces. Several named channels (e.g. body, chassis, infotainment)
+    can be configured under `can.channels`, classic or CAN FD with 64-byte payloads;
+    every event may pick one with a `channel` param (default: the first). Each
+    channel sends from its own worker thread (see `CanChannel`). Periodic frames are handed to the kernel with
+    `can.start_cyclic` (id, data, period, optional duration), changed in place with
+    `can.update_cyclic` (id, data) and ended with `can.stop_cyclic` (id, or none for all).
+
+    With DBC files configured under `can.dbc`, `can.set_signal` encodes signals by
+    name and physical value, and `can.signal_profile` sends a ramp or sample list
+    of one signal as a frame sequence, packed in one vectorized call.
+
+    `can.replay` streams a recorded log (candump, ASC, BLF, ...) onto the bus with
+    its original timing, paced against the engine clock; `can.stop_replay` ends it.
+
+    Received frames are published as `can.rx` events by a reader thread (see
+    `_receive`), so scenarios and plugins can react to ECU responses.
+
+    On the loopback backend every sent frame is recorded, and `can.expect`
+    asserts on what was transmitted, so scenarios double as tests without CAN
+    hardware.
+
+    Params are validated and coerced at scenario load time against the schema in
+    `plugin.yaml` (int `id`, `bytes` payload), and frames are encoded once before
+    the run (see `prepare`) and reused, so dispatching an event is a cache lookup
+    and a `bus.send`.
     """
 
     def __init__(self):
         """
         Initializes the CanPlugin instance.
 
-        Sets up the plugin name, logger, and internal SocketCAN bus handle.
+        Sets up the plugin name, logger, and the (not yet opened) channel table.
         """
         self.name = "CanPlugin"
         self.logger = Logger(self.name)
-        self.bus = None
+        self.channels = {}  # Name -> CanChannel; the first one is the default
+        self.default_channel = None
+        self.extended_id = False
+        self.log_frames = True
+        self.frame_cache_size = 65536
+        self._frames = {}  # (channel, id, payload, extended) -> can.Message
+        self._cyclic = {}  # (channel, CAN ID) -> periodic send task
+        self.dbc = None
+        self._signal_values = {}  # DBC message name -> current physical values
+        self.replay_read_ahead = 8192
+        self._replays = {}  # Log file -> LogReplay
+        self.event_bus = None  # Set by the PluginManager; provides the engine clock
+        self.rx_filters = []  # Extra receive filters from the config, for scenario conditions
+        self._rx_threads = []
+        self._rx_stop = threading.Event()
 
     def on_init(self, config):
         """
-        Initializes the CAN interface using settings from the central config.
+        Opens the CAN channels using settings from the central config.
+
+        `can.channels` lists named channels (name, interface, optional backend, fd,
+        bitrate_switch, padding); without it, `can.interface` is opened as the
+        single channel 'default'. `can.backend` selects the default backend:
+        socketcan, virtual or loopback (hardware-free; see `CanChannel`).
 
         Args:
             config (dict): Optional runtime configuration (unused here).
         
-        Logs errors if `can.interface` is missing or if SocketCAN initialization fails.
+        Logs errors if no interface is configured or if SocketCAN initialization fails;
+        events for a channel that failed to open are only logged.
         """
         plugin_config = ConfigLoader.get("can")
         interface = plugin_config.get("interface")
+        self.extended_id = bool(plugin_config.get("extended_id", False))
+        self.log_frames = bool(plugin_config.get("logging", True))
+        self.frame_cache_size = int(plugin_config.get("frame_cache_size", 65536))
+        self.replay_read_ahead = int(plugin_config.get("replay_read_ahead", 8192))
+        self.rx_filters = list(plugin_config.get("rx_filters") or [])
 
-        if not interface:
+        if plugin_config.get("dbc"):
+            try:
+                self.dbc = load_dbc(plugin_config["dbc"])
+                self.logger.info("Loaded %d DBC message(s)", len(self.dbc.messages))
+            except Exception as e:
+                self.logger.error("Failed to load DBC %s: %s", plugin_config["dbc"], e)
+
+        channels = plugin_config.get("channels") or ([{"name": "default", "interface": interface}] if interface else [])
+        if not channels:
             self.logger.error(
                 "Missing 'interface' in CAN plugin configuration. "
-                "Please set can.interface in config.yaml."
+                "Please set can.interface or can.channels in config.yaml."
             )
-            self.bus = None
             return
 
+        backend = plugin_config.get("backend", "socketcan")
+        for spec in channels:
+            fd = bool(spec.get("fd", False))
+            try:
+                channel = CanChannel(
+                    spec.get("name", spec["interface"]), spec["interface"], self.logger, fd=fd,
+                    bitrate_switch=bool(spec.get("bitrate_switch", fd)), padding=int(spec.get("padding", 0)),
+                    queue_size=int(plugin_config.get("send_queue", 4096)), backend=spec.get("backend", backend),
+                    clock=self._now, record_size=int(plugin_config.get("record_size", 100000)),
+                )
+            except ValueError as e:
+                self.logger.error("Invalid CAN channel %s: %s", spec, e)
+                continue
+            self.channels[channel.name] = channel
+            try:
+                channel.open()
+                self.logger.info("CAN%s channel '%s' initialized on %s interface: %s",
+                                 " FD" if fd else "", channel.name, channel.backend, channel.interface)
+            except Exception as e:
+                self.logger.error("Failed to initialize %s on '%s': %s", channel.backend, channel.interface, e)
+        if not self.channels:
+            return
+        self.default_channel = next(iter(self.channels))
+
+        if plugin_config.get("receive", True):
+            self.start_receiving()
+
+    def _now(self):
+        """
+        Returns the engine clock (None between runs), or `time.perf_counter()`
+        without an in-process event bus. Used to stamp recorded frames.
+        """
+        sim_time = getattr(self.event_bus, "sim_time", None)
+        return sim_time() if sim_time is not None else time.perf_counter()
+
+    def _channel(self, data):
+        """
+        Returns the channel named by an event's 'channel' param, or the default one.
+
+        Raises:
+            KeyError: If the channel is not configured.
+        """
+        name = data.get("channel") or self.default_channel
         try:
-            self.bus = can.interface.Bus(channel=interface, bustype="socketcan")
-            self.logger.info(f"CanPlugin initialized on interface: {interface}")
-        except Exception as e:
-            self.logger.error(f"Failed to initialize SocketCAN on '{interface}': {e}")
-            self.bus = None
+            return self.channels[name]
+        except KeyError:
+            raise KeyError(f"Unknown CAN channel '{name}'") from None
+
+    def start_receiving(self):
+        """
+        Starts one reader thread per open channel, publishing received frames as `can.rx`.
+
+        Receiving needs the in-process event bus (for the engine clock and the
+        subscriber filters), so it is not available with `isolation: process`.
+        """
+        if self._rx_threads or not hasattr(self.event_bus, "interest"):
+            return
+        self._rx_stop.clear()
+        for channel in self.channels.values():
+            if channel.bus is not None:
+                thread = threading.Thread(target=self._receive, args=(channel,), name=f"can-{channel.name}-rx", daemon=True)
+                thread.start()
+                self._rx_threads.append(thread)
+
+    def stop_receiving(self):
+        """
+        Stops the reader threads, if running.
+        """
+        self._rx_stop.set()
+        for thread in self._rx_threads:
+            thread.join(timeout=1.0)
+        self._rx_threads = []
+
+    def _receive(self, channel):
+        """
+        Reader thread: publishes the frames received on a channel as `can.rx` events.
+
+        Kernel filters are derived from what the `can.rx` subscribers declare in
+        their plugin.yaml (`filters`) plus `can.rx_filters` from the config, and
+        re-derived whenever the routing table changes, so frames nobody asked for
+        are dropped by SocketCAN and never reach Python. With no interest at all,
+        the thread does not read. Frames are only published while a run is in
+        progress, stamped with the engine clock; `timestamp` in the payload is
+        the kernel/hardware receive time.
+        """
+        table = None
+        wanted = []
+        while not self._rx_stop.is_set():
+            if self.event_bus.subscriptions is not table:
+                table = self.event_bus.subscriptions
+                idle = wanted == []
+                wanted = self._apply_rx_filters(channel.bus)
+                subscribed = bool(table.get("can.rx"))
+                if idle and wanted != []:
+                    self._drain(channel.bus, time.time())
+            if wanted == []:
+                self._rx_stop.wait(0.1)
+                continue
+
+            try:
+                message = channel.bus.recv(0.1)
+            except Exception as e:
+                self.logger.error("Failed to receive CAN frame: %s", e)
+                self._rx_stop.wait(1.0)
+                continue
+            if message is None or message.is_error_frame:
+                continue
+            now = self.event_bus.sim_time()
+            if now is not None:
+                self._publish_rx(channel, message, now, subscribed)
+
+    def _apply_rx_filters(self, bus):
+        """
+        Installs the kernel filters for the current `can.rx` interest on a bus.
+
+        Args:
+            bus (can.BusABC): The channel's bus.
+
+        Returns:
+            list or None: Kernel filters in use, None to receive everything, or an
+                          empty list when nobody is interested.
+        """
+        wanted = self.event_bus.interest("can.rx")
+        try:
+            if wanted is None:
+                bus.set_filters(None)
+                return None
+            filters = [_kernel_filter(spec) for spec in wanted + self.rx_filters]
+            if filters:
+                bus.set_filters(filters)
+        except (KeyError, TypeError, ValueError) as e:
+            self.logger.error("Invalid CAN receive filter, receiving every frame: %s", e)
+            bus.set_filters(None)
+            return None
+        self.logger.debug("CAN receive filters: %s", filters)
+        return filters
+
+    def _drain(self, bus, before):
+        """
+        Discards frames queued in a bus socket before `before` (epoch seconds),
+        e.g. while nobody was listening.
+        """
+        while True:
+            message = bus.recv(0)
+            if message is None or message.timestamp >= before:
+                return
+
+    def _publish_rx(self, channel, message, now, subscribed):
+        """
+        Updates the signal state for a received frame and publishes it.
+
+        Sets the signal `can.rx.0x<ID>` to the payload and, for messages in the
+        DBC, `can.<Message>.<Signal>` to the decoded physical values, before
+        `can.rx` is published (only if someone subscribes to it).
+
+        Args:
+            channel (CanChannel): Channel the frame arrived on.
+            message (can.Message): Received frame.
+            now (float): Simulation time in seconds.
+            subscribed (bool): Whether `can.rx` has subscribers.
+        """
+        bus = self.event_bus
+        data = bytes(message.data)
+        bus.set_signal(f"can.rx.0x{message.arbitration_id:X}", data)
+        decoded = self.dbc.by_id.get(message.arbitration_id) if self.dbc is not None else None
+        if decoded is not None:
+            for name, value in decoded.unpack(data).items():
+                bus.set_signal(f"can.{decoded.name}.{name}", value)
+        if subscribed:
+            bus.publish("can.rx", {
+                "id": message.arbitration_id,
+                "data": data,
+                "dlc": message.dlc,
+                "extended": message.is_extended_id,
+                "timestamp": message.timestamp,
+                "channel": channel.name,
+            }, now)
+
+    def prepare(self, topic, data):
+        """
+        Encodes the frame of a `can.send` or cyclic event ahead of the run, and
+        checks channel and signal names of the other events.
+
+        Args:
+            topic (str): The event topic.
+            data (dict): The event data, with int 'id' and bytes 'data'.
+        """
+        channel = self._channel(data)
+        if topic in ("can.send", "can.start_cyclic", "can.update_cyclic"):
+            self._frame(channel, data["id"], data["data"], *self._frame_flags(topic, data))
+        elif topic in ("can.set_signal", "can.signal_profile"):
+            self._resolve_signals(data)  # Unknown signal names fail before the run
+        elif topic == "can.replay" and not os.path.isfile(data["file"]):
+            raise FileNotFoundError(f"CAN log not found: {data['file']}")
 
     def on_event(self, topic, data, timestamp):
         """
@@ -77,46 +327,424 @@ class CanPlugin(BasePlugin):
 
         Args:
             topic (str): The event topic (e.g., 'can.send').
-            data (dict): The event data, including 'id' (CAN ID) and 'data' (payload bytes).
+            data (dict): The event data, including 'id' (int CAN ID) and 'data' (payload bytes),
+                         already coerced by the plugin schema.
             timestamp (float): Simulation timestamp in seconds.
 
-        Validates and converts the ID, logs the transmission, and sends a CAN frame if a bus is active.
+        Queues the cached frame on the event's channel if its bus is open; frames are
+        only logged when `can.logging` is enabled. Cyclic actions are handed to
+        `_handle_cyclic`.
         """
-        id = data.get("id")
-
-        if id is None:
-            self.logger.warn(f"[{timestamp:.3f}s] Missing CAN 'id' in event: {data}")
+        action = topic.split(".", 1)[1]
+        if action == "set_signal":
+            self._set_signals(data, timestamp)
+            return
+        if action == "signal_profile":
+            self._play_profile(data, timestamp)
+            return
+        if action in ("replay", "stop_replay"):
+            self._handle_replay(action, data, timestamp)
+            return
+        if action == "expect":
+            self._expect(data, timestamp)
+            return
+        if action != "send":
+            self._handle_cyclic(action, data, timestamp)
             return
 
-        if isinstance(id, str) and id.startswith("0x"):
-            try:
-                id = int(id, 16)
-            except ValueError:
-                self.logger.warn(f"[{timestamp:.3f}s] Invalid hex ID: {id}")
+        channel = self._channel(data)
+        frame = self._frame(channel, data["id"], data["data"], *self._frame_flags(topic, data))
+        if self.log_frames:
+            self.logger.info(
+                "[%.3fs] Injected CAN ID=0x%X on %s, Data=%s", timestamp, frame.arbitration_id, channel.name,
+                Logger.lazy(lambda: [f"0x{byte:02X}" for byte in frame.data]),
+            )
+        channel.send(frame)
+
+    def _handle_cyclic(self, action, data, timestamp):
+        """
+        Starts, updates or stops periodic transmission of a frame.
+
+        Transmission runs on python-can's `send_periodic`, which SocketCAN backs with
+        the kernel broadcast manager: the kernel keeps the period, and updates
+        replace the payload in place without restarting the cycle.
+
+        Args:
+            action (str): 'start_cyclic', 'update_cyclic' or 'stop_cyclic'.
+            data (dict): 'id', plus 'data' and 'period' / 'duration' (seconds) to start,
+                         'data' to update; stop without 'id' stops every cyclic frame
+                         (of the given 'channel', or of all channels).
+            timestamp (float): Simulation timestamp in seconds.
+        """
+        arbitration_id = data.get("id")
+        channel = self._channel(data)
+        key = (channel.name, arbitration_id)
+
+        if action == "start_cyclic":
+            self._stop_cyclic(key)  # Restarting replaces the previous cycle
+            frame = self._frame(channel, arbitration_id, data["data"])
+            self.logger.info(
+                "[%.3fs] Cyclic CAN ID=0x%X on %s every %.1f ms started", timestamp, arbitration_id, channel.name,
+                data["period"] * 1000,
+            )
+            if channel.bus:
+                try:
+                    self._cyclic[key] = channel.bus.send_periodic(
+                        frame, data["period"], duration=data.get("duration")
+                    )
+                except Exception as e:
+                    self.logger.error("Failed to start cyclic CAN frame: %s", e)
+
+        elif action == "update_cyclic":
+            task = self._cyclic.get(key)
+            if task is None:
+                if channel.bus:
+                    self.logger.warn("[%.3fs] No cyclic CAN frame 0x%X to update", timestamp, arbitration_id)
                 return
+            try:
+                task.modify_data(self._frame(channel, arbitration_id, data["data"]))
+            except Exception as e:
+                self.logger.error("Failed to update cyclic CAN frame: %s", e)
+            if self.log_frames:
+                self.logger.info(
+                    "[%.3fs] Cyclic CAN ID=0x%X, Data=%s", timestamp, arbitration_id,
+                    Logger.lazy(lambda: [f"0x{byte:02X}" for byte in data["data"]]),
+                )
 
-        if not isinstance(id, int):
-            self.logger.warn(f"[{timestamp:.3f}s] CAN ID must be an int, got {type(id).__name__}: {id}")
-            return
+        elif action == "stop_cyclic":
+            if arbitration_id is None:
+                for running in list(self._cyclic):
+                    if not data.get("channel") or running[0] == channel.name:
+                        self._stop_cyclic(running)
+            else:
+                self._stop_cyclic(key)
+            self.logger.info("[%.3fs] Cyclic CAN stopped: %s", timestamp,
+                             f"0x{arbitration_id:X} on {channel.name}" if arbitration_id is not None
+                             else f"all on {channel.name}" if data.get("channel") else "all")
 
-        value = data.get("data", [])
-        hex_data = [f"0x{byte:02X}" for byte in value] if isinstance(value, list) else value
-        self.logger.info(f"[{timestamp:.3f}s] Injected CAN ID=0x{id:X}, Data={hex_data}")
+    def _stop_cyclic(self, key):
+        """
+        Stops the periodic transmission of a frame, if running.
 
-        if self.bus and isinstance(value, list):
+        Args:
+            key (tuple): (channel name, CAN ID) of the cyclic frame.
+        """
+        task = self._cyclic.pop(key, None)
+        if task is not None:
             try:
-                msg = can.Message(arbitration_id=id, data=bytearray(value), is_extended_id=False)
-                self.bus.send(msg)
-                self.logger.debug(f"Sent to SocketCAN: {msg}")
+                task.stop()
             except Exception as e:
-                self.logger.error(f"Failed to send CAN frame: {e}")
+                self.logger.warn("Failed to stop cyclic CAN frame 0x%X on %s: %s", key[1], key[0], e)
+
+    def _resolve_signals(self, data):
+        """
+        Maps the signal names of a DBC event to their message.
+
+        Args:
+            data (dict): 'signal' and 'value', or 'signals' (name -> value); optional
+                         'message' for signal names used by several messages.
+
+        Returns:
+            tuple: (DbcMessage, dict of signal name -> physical value).
+
+        Raises:
+            KeyError: If no DBC is loaded, a signal is unknown or ambiguous, or the
+                      signals belong to different messages.
+        """
+        if self.dbc is None:
+            raise KeyError("No DBC loaded; set can.dbc in config.yaml")
+        requested = data.get("signals") or {data["signal"]: data.get("value")}
+        message = None
+        values = {}
+        for name, value in requested.items():
+            found, signal = self.dbc.lookup(name, data.get("message"))
+            if message is not None and found is not message:
+                raise KeyError(f"Signals of one event must belong to one message ({message.name}, {found.name})")
+            message = found
+            values[signal] = value
+        return message, values
+
+    def _set_signals(self, data, timestamp):
+        """
+        Encodes signal values with the DBC and sends the message.
+
+        Signals not named in the event keep their last value. If the message is
+        being sent cyclically, its payload is updated in place instead.
+
+        Args:
+            data (dict): See `_resolve_signals`.
+            timestamp (float): Simulation timestamp in seconds.
+        """
+        try:
+            channel = self._channel(data)
+            message, values = self._resolve_signals(data)
+            current = dict(self._signal_values.get(message.name) or message.initial_values())
+            current.update(values)
+            frame = self._frame(channel, message.frame_id, message.pack(current), message.extended)
+        except (KeyError, ValueError) as e:
+            self.logger.error("[%.3fs] Cannot set signal: %s", timestamp, e.args[0])
+            return
+        self._signal_values[message.name] = current
+
+        if self.log_frames:
+            self.logger.info(
+                "[%.3fs] %s %s -> ID=0x%X, Data=%s", timestamp, message.name, values, frame.arbitration_id,
+                Logger.lazy(lambda: [f"0x{byte:02X}" for byte in frame.data]),
+            )
+        try:
+            task = self._cyclic.get((channel.name, message.frame_id))
+            if task is not None:
+                task.modify_data(frame)
+            else:
+                channel.send(frame)
+        except Exception as e:
+            self.logger.error("Failed to send CAN frame: %s", e)
+
+    def _play_profile(self, data, timestamp):
+        """
+        Sends a signal profile (explicit samples, or a linear ramp) as a sequence of
+        frames, one per period, through `send_periodic`.
+
+        All samples are packed in one vectorized call when NumPy is available. The
+        other signals of the message keep their current values. The SocketCAN
+        broadcast manager accepts at most 256 frames per sequence.
+
+        Args:
+            data (dict): 'signal' (and optional 'message'), 'period', and either
+                         'values' or 'from' / 'to' / 'duration'.
+            timestamp (float): Simulation timestamp in seconds.
+        """
+        try:
+            channel = self._channel(data)
+            message, values = self._resolve_signals({"signal": data["signal"], "message": data.get("message")})
+        except KeyError as e:
+            self.logger.error("[%.3fs] Cannot play signal profile: %s", timestamp, e.args[0])
+            return
+        signal = next(iter(values))
+        period = data["period"]
+
+        if data.get("values"):
+            samples = list(data["values"])
+        else:
+            count = max(2, int(round(data["duration"] / period)) + 1)
+            start, end = data["from"], data["to"]
+            samples = [start + (end - start) * i / (count - 1) for i in range(count)]
+
+        current = dict(self._signal_values.get(message.name) or message.initial_values())
+        try:
+            if np is not None:
+                columns = {name: np.full(len(samples), value, dtype=np.float64) for name, value in current.items()}
+                columns[signal] = np.asarray(samples, dtype=np.float64)
+                payloads = [row.tobytes() for row in message.pack_batch(columns)]
+            else:
+                payloads = [message.pack({**current, signal: sample}) for sample in samples]
+        except ValueError as e:
+            self.logger.error("[%.3fs] Cannot play signal profile: %s", timestamp, e.args[0])
+            return
+
+        current[signal] = samples[-1]
+        self._signal_values[message.name] = current
+        self.logger.info(
+            "[%.3fs] %s.%s profile: %d frame(s) every %.1f ms", timestamp, message.name, signal,
+            len(payloads), period * 1000,
+        )
+        if not channel.bus:
+            return
+
+        extended = self._is_extended(message.frame_id, message.extended)
+        frames = [channel.message(message.frame_id, payload, extended) for payload in payloads]
+        key = (channel.name, message.frame_id)
+        self._stop_cyclic(key)
+        try:
+            self._cyclic[key] = channel.bus.send_periodic(frames, period, duration=len(frames) * period)
+        except Exception as e:
+            self.logger.error("Failed to send signal profile: %s", e)
+
+    def _handle_replay(self, action, data, timestamp):
+        """
+        Starts or stops streaming a CAN log onto a channel.
+
+        The first frame of the log is due at the event's timestamp. Pacing uses
+        the engine clock from the event bus, so a replay stays aligned with the
+        scenario; without one (e.g. in an isolated process) it paces against its
+        own start.
+
+        Args:
+            action (str): 'replay' or 'stop_replay'.
+            data (dict): 'file', plus 'speed', 'ids', 'loop' and 'channel' to start;
+                         stop without 'file' stops every replay.
+            timestamp (float): Simulation timestamp in seconds.
+        """
+        path = data.get("file")
+        if action == "stop_replay":
+            for key in ([path] if path else list(self._replays)):
+                replay = self._replays.pop(key, None)
+                if replay is not None:
+                    replay.stop()
+                    self.logger.info("[%.3fs] Replay of %s stopped after %d frame(s)", timestamp, key, replay.sent)
+            return
+
+        channel = self._channel(data)
+        if not channel.bus:
+            self.logger.warn("[%.3fs] No CAN bus on %s; replay of %s skipped", timestamp, channel.name, path)
+            return
+        previous = self._replays.pop(path, None)
+        if previous is not None:
+            previous.stop()  # Restarting replaces the running replay of the same log
+
+        clock = getattr(self.event_bus, "sim_time", None)
+        start = timestamp
+        if clock is None or clock() is None:
+            clock, start = None, None
+        replay = LogReplay(
+            path, channel.bus, self.logger, clock=clock, start=start, speed=data["speed"],
+            ids=data.get("ids"), loop=data["loop"], read_ahead=self.replay_read_ahead,
+        )
+        self._replays[path] = replay
+        replay.begin()
+        self.logger.info("[%.3fs] Replaying %s at %.2fx%s", timestamp, path, data["speed"], " (loop)" if data["loop"] else "")
+
+    def _expect(self, data, timestamp):
+        """
+        Asserts that a frame was (or, with 'absent', was not) transmitted on a
+        loopback channel.
+
+        Matching frames have the event's ID and a payload starting with 'data'
+        (when given), and were sent within the last 'within' seconds (default:
+        during this run). A failed expectation raises, so the event bus reports
+        it as an error of the event.
+
+        Args:
+            data (dict): 'id', optional 'data', 'within', 'count', 'absent' and 'channel'.
+            timestamp (float): Simulation timestamp in seconds.
+
+        Raises:
+            AssertionError: If the expectation does not hold.
+        """
+        channel = self._channel(data)
+        if not isinstance(channel.bus, LoopbackBus):
+            self.logger.warn("[%.3fs] can.expect needs the loopback backend; channel '%s' uses %s",
+                             timestamp, channel.name, channel.backend)
+            return
+
+        channel.flush()  # Frames queued before this event count as sent
+        since = None
+        if data.get("within") is not None:
+            now = self._now()
+            since = (timestamp if now is None else now) - data["within"]
+        prefix = data.get("data")
+        matches = [
+            stamp for stamp, message in channel.bus.sent_frames(data["id"], since)
+            if prefix is None or bytes(message.data[:len(prefix)]) == prefix
+        ]
+
+        frame = f"CAN frame 0x{data['id']:X}" + (f" [{prefix.hex(' ').upper()}]" if prefix is not None else "")
+        if data["absent"]:
+            if matches:
+                raise AssertionError(f"{frame} on {channel.name} was sent {len(matches)} time(s)")
+        elif len(matches) < data["count"]:
+            raise AssertionError(
+                f"Expected {frame} on {channel.name} at least {data['count']} time(s), found {len(matches)}"
+            )
+        self.logger.info("[%.3fs] Expectation met: %s %s on %s (%d match(es))", timestamp, frame,
+                         "absent" if data["absent"] else "sent", channel.name, len(matches))
+
+    def on_reset(self):
+        """
+        Stops the cyclic frames and log replays of the finished run and forgets
+        signal values and recorded frames; the bus stays open.
+        """
+        for key in list(self._cyclic):
+            self._stop_cyclic(key)
+        for replay in self._replays.values():
+            replay.stop()
+        self._replays = {}
+        self._signal_values = {}
+        for channel in self.channels.values():
+            if isinstance(channel.bus, LoopbackBus):
+                channel.bus.clear()
+
+    @staticmethod
+    def _frame_flags(topic, data):
+        """
+        Returns the (extended, fd, bitrate_switch) arguments of `_frame` for an event;
+        only `can.send` carries them (e.g. from a compiled candump log).
+        """
+        if topic != "can.send":
+            return False, None, None
+        return data.get("extended", False), data.get("fd"), data.get("bitrate_switch")
+
+    def _frame(self, channel, arbitration_id, data, extended=False, fd=None, bitrate_switch=None):
+        """
+        Returns the `can.Message` for an ID and payload on a channel, building it
+        on first use.
+
+        Identical frames share one message object.
+
+        Args:
+            channel (CanChannel): Channel the frame is for (CAN FD flags and padding).
+            arbitration_id (int): CAN ID.
+            data (bytes): Payload.
+            extended (bool): Force a 29-bit ID (e.g. for DBC extended messages).
+            fd (bool): CAN FD frame; None follows the channel.
+            bitrate_switch (bool): FD bit rate switch; None follows the channel.
+
+        Returns:
+            can.Message: Ready-to-send frame.
+
+        Raises:
+            ValueError: If the payload does not fit the channel.
+        """
+        key = (channel.name, arbitration_id, data, extended, fd, bitrate_switch)
+        frame = self._frames.get(key)
+        if frame is None:
+            if len(self._frames) >= self.frame_cache_size:
+                self._frames.clear()  # Unbounded payload variety, e.g. replayed logs
+            frame = self._frames[key] = channel.message(
+                arbitration_id, data, self._is_extended(arbitration_id, extended), fd, bitrate_switch
+            )
+        return frame
+
+    def _is_extended(self, arbitration_id, extended=False):
+        """
+        Extended (29-bit) IDs are used when requested, when `can.extended_id` is
+        set, or when the ID does not fit in 11 bits.
+        """
+        return extended or self.extended_id or arbitration_id > 0x7FF
 
     def on_shutdown(self):
         """
-        Cleanly shuts down the CAN plugin and closes the SocketCAN bus.
+        Cleanly shuts down the CAN plugin and closes its channels, after sending
+        what is still queued.
 
         Called when the simulation ends or the plugin is unloaded.
         """
         self.logger.info("CanPlugin shutting down.")
-        if self.bus:
-            self.bus.shutdown()
+        self.stop_receiving()
+        self.on_reset()
+        for channel in self.channels.values():
+            if channel.sent or channel.dropped or channel.errors:
+                self.logger.info("CAN channel '%s': %d frame(s) sent, %d dropped, %d error(s)",
+                                 channel.name, channel.sent, channel.dropped, channel.errors)
+            channel.close()
+
+
+def _kernel_filter(spec):
+    """
+    Converts a filter spec into python-can's filter format.
+
+    Args:
+        spec (int or dict): A CAN ID, or {'id', optional 'mask', optional 'extended'}.
+                            The mask defaults to an exact match.
+
+    Returns:
+        dict: {'can_id', 'can_mask', 'extended'}.
+    """
+    if not isinstance(spec, dict):
+        spec = {"id": spec}
+    can_id = int(spec["id"])
+    extended = spec.get("extended")
+    if extended is None:
+        extended = can_id > 0x7FF
+    mask = spec.get("mask", 0x1FFFFFFF if extended else 0x7FF)
+    return {"can_id": can_id, "can_mask": int(mask), "extended": bool(extended)}
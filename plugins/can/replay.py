@@ -0,0 +1,255 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import mmap
+import queue
+import threading
+import time
+
+import can
+
+CHUNK_SIZE = 256  # Frames handed from the reader to the sender at a time
+
+
+def _read_candump(path, ids=None):
+    """
+    Reads a `candump -l` log through a memory map.
+
+    Lines look like `(1436509052.249713) vcan0 123#DEADBEEF`; CAN FD frames use
+    `##<flags>` and remote frames `#R`. Filtered IDs are skipped before a message
+    object is built.
+
+    Args:
+        path (str): Log file.
+        ids (set[int]): CAN IDs to keep, or None for all.
+
+    Yields:
+        can.Message: Frames in file order, with the log timestamp.
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            return
+        with mm:
+            for line in iter(mm.readline, b""):
+                if line[:1] != b"(":
+                    continue
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                ident, _, payload = fields[2].partition(b"#")
+                arbitration_id = int(ident, 16)
+                if ids is not None and arbitration_id not in ids:
+                    continue
+
+                is_fd = payload[:1] == b"#"
+                flags = 0
+                if is_fd:
+                    flags = int(payload[1:2], 16)
+                    payload = payload[2:]
+                remote = payload[:1] in (b"R", b"r")
+                yield can.Message(
+                    timestamp=float(fields[0][1:-1]),
+                    arbitration_id=arbitration_id,
+                    is_extended_id=len(ident) > 3,
+                    is_remote_frame=remote,
+                    is_fd=is_fd,
+                    bitrate_switch=bool(flags & 0x1),
+                    error_state_indicator=bool(flags & 0x2),
+                    data=b"" if remote else bytes.fromhex(payload.decode("ascii")),
+                    channel=fields[1].decode("ascii"),
+                )
+
+
+def read_log(path, ids=None):
+    """
+    Streams the frames of a CAN log without loading the whole file.
+
+    candump `.log` files are parsed from a memory map; other formats (ASC, BLF,
+    TRC, CSV, ...) are read with python-can's `LogReader`.
+
+    Args:
+        path (str): Log file.
+        ids (set[int]): CAN IDs to keep, or None for all.
+
+    Returns:
+        iterator: can.Message objects in file order.
+    """
+    if path.lower().endswith(".log"):
+        return _read_candump(path, ids)
+    reader = can.LogReader(path)
+    if ids is None:
+        return iter(reader)
+    return (message for message in reader if message.arbitration_id in ids)
+
+
+class LogReplay:
+    """
+    Replays one CAN log onto a bus with the timing of the recording.
+
+    A reader thread streams the log into a bounded read-ahead queue, so memory
+    use does not depend on the file size, and a sender thread sends every frame
+    when it is due on the given clock. Frames that are late (the sender woke up
+    late or the bus pushed back) go out immediately and the replay catches up
+    instead of drifting.
+    """
+
+    def __init__(self, path, bus, logger, clock=None, start=None, speed=1.0, ids=None,
+                 loop=False, read_ahead=8192):
+        """
+        Args:
+            path (str): Log file (see `read_log`).
+            bus (can.BusABC): Bus to send on.
+            logger (Logger): Logger for progress and errors.
+            clock (callable): Returns the current time in seconds; defaults to a
+                              clock starting when the replay starts. Returning
+                              None (e.g. `EventBus.sim_time` after the run)
+                              stops the replay.
+            start (float): Clock time at which the first frame is due; defaults to now.
+            speed (float): Playback speed factor (2.0 plays twice as fast).
+            ids (list[int]): CAN IDs to replay, or None for all.
+            loop (bool): Start over at the end of the log until stopped.
+            read_ahead (int): Frames buffered ahead of the sender.
+        """
+        self.path = path
+        self.bus = bus
+        self.logger = logger
+        self.clock = clock or time.perf_counter
+        self.start = start
+        self.speed = speed
+        self.ids = set(ids) if ids else None
+        self.loop = loop
+        self.sent = 0
+        self.errors = 0
+        self.max_lag = 0.0
+        self._chunks = queue.Queue(maxsize=max(1, read_ahead // CHUNK_SIZE))
+        self._stop = threading.Event()
+        self._reader = threading.Thread(target=self._read, name="can-replay-reader", daemon=True)
+        self._sender = threading.Thread(target=self._send, name="can-replay-sender", daemon=True)
+
+    @property
+    def running(self):
+        """bool: True until the log is done or the replay is stopped."""
+        return self._sender.is_alive()
+
+    def begin(self):
+        """
+        Starts the reader and sender threads.
+        """
+        if self.start is None:
+            self.start = self.clock()
+        self._reader.start()
+        self._sender.start()
+
+    def stop(self, timeout=1.0):
+        """
+        Stops the replay and waits for its threads.
+
+        Args:
+            timeout (float): Seconds to wait for each thread.
+        """
+        self._stop.set()
+        for thread in (self._sender, self._reader):
+            if thread.is_alive() and thread is not threading.current_thread():
+                thread.join(timeout)
+
+    def _put(self, item):
+        """
+        Queues a chunk for the sender; returns False if the replay was stopped meanwhile.
+        """
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read(self):
+        """
+        Reader thread: streams the log in chunks, with timestamps rewritten to
+        seconds since the start of the replay. When looping, each pass continues
+        one average frame gap after the previous one.
+        """
+        offset = 0.0
+        try:
+            while not self._stop.is_set():
+                first = last = None
+                count = 0
+                chunk = []
+                for message in read_log(self.path, self.ids):
+                    if first is None:
+                        first = message.timestamp
+                    last = message.timestamp
+                    message.timestamp = offset + (last - first)
+                    chunk.append(message)
+                    count += 1
+                    if len(chunk) == CHUNK_SIZE:
+                        if not self._put(chunk):
+                            return
+                        chunk = []
+                if chunk and not self._put(chunk):
+                    return
+                if not self.loop or count == 0:
+                    break
+                offset += (last - first) + (last - first) / max(count - 1, 1)
+        except Exception as e:
+            self.logger.error("Failed to read CAN log %s: %s", self.path, e)
+        self._put(None)
+
+    def _send(self):
+        """
+        Sender thread: sends each frame when it is due, sleeping in between.
+        """
+        while not self._stop.is_set():
+            try:
+                chunk = self._chunks.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if chunk is None:
+                self.logger.info(
+                    "Replay of %s finished: %d frame(s), %d error(s), max lag %.1f ms",
+                    self.path, self.sent, self.errors, self.max_lag * 1000,
+                )
+                return
+
+            for message in chunk:
+                now = self.clock()
+                if now is None:  # Engine clock stopped: the run ended before on_reset stopped us
+                    self.logger.info("Replay of %s stopped with the run after %d frame(s)", self.path, self.sent)
+                    self._stop.set()  # Lets the reader exit too
+                    return
+                delay = self.start + message.timestamp / self.speed - now
+                if delay > 0:
+                    if self._stop.wait(delay):
+                        return
+                elif -delay > self.max_lag:
+                    self.max_lag = -delay
+                try:
+                    self.bus.send(message)
+                    self.sent += 1
+                except can.CanError as e:
+                    if not self.errors:
+                        self.logger.error("Failed to replay CAN frame from %s: %s", self.path, e)
+                    self.errors += 1
@@ -63,8 +63,8 @@ class EchoPlugin(BasePlugin):
         """
         message = data.get("message", None)
         if message is None:
-            message = str(data)  # Fallback to full data dict
-        self.logger.info(f"[{timestamp:.3f}s] Echoed: {message}")
+            message = data  # Fallback to full data dict, stringified only if logged
+        self.logger.info("[%.3fs] Echoed: %s", timestamp, message)
 
     def on_shutdown(self):
         """
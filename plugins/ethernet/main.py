@@ -78,7 +78,7 @@ class EthernetPlugin(BasePlugin):
             self.server_ip = params.get("ip")
             self.server_port = params.get("port", self.server_port)
             if not self.server_ip:
-                self.logger.error(f"[{timestamp:.3f}s] Missing 'ip' in {action} params.")
+                self.logger.error("[%.3fs] Missing 'ip' in %s params.", timestamp, action)
                 return
             self._connect(timestamp)
 
@@ -95,22 +95,22 @@ class EthernetPlugin(BasePlugin):
                     self.server_port = port
                     self._connect(timestamp)
                 else:
-                    self.logger.error(f"[{timestamp:.3f}s] Cannot reconnect — no IP specified.")
+                    self.logger.error("[%.3fs] Cannot reconnect — no IP specified.", timestamp)
                     return
 
             if self.connected:
                 self._send_message(action, params, timestamp)
             else:
-                self.logger.warn(f"[{timestamp:.3f}s] Reconnect failed. Cannot perform 'resume_transfer'.")
+                self.logger.warn("[%.3fs] Reconnect failed. Cannot perform 'resume_transfer'.", timestamp)
 
         elif action in ["start_transfer", "complete_transfer"]:
             if not self.connected:
-                self.logger.warn(f"[{timestamp:.3f}s] Not connected. Cannot perform '{action}'.")
+                self.logger.warn("[%.3fs] Not connected. Cannot perform '%s'.", timestamp, action)
                 return
             self._send_message(action, params, timestamp)
 
         else:
-            self.logger.warn(f"[{timestamp:.3f}s] Unknown action '{action}'")
+            self.logger.warn("[%.3fs] Unknown action '%s'", timestamp, action)
 
     def _connect(self, timestamp):
         """
@@ -124,15 +124,15 @@ class EthernetPlugin(BasePlugin):
         On failure, logs the exception.
         """
         if self.connected:
-            self.logger.warn(f"[{timestamp:.3f}s] Already connected to {self.server_ip}:{self.server_port}")
+            self.logger.warn("[%.3fs] Already connected to %s:%s", timestamp, self.server_ip, self.server_port)
             return
         try:
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.sock.connect((self.server_ip, self.server_port))
             self.connected = True
-            self.logger.info(f"[{timestamp:.3f}s] Connected to {self.server_ip}:{self.server_port}")
+            self.logger.info("[%.3fs] Connected to %s:%s", timestamp, self.server_ip, self.server_port)
         except Exception as e:
-            self.logger.error(f"[{timestamp:.3f}s] Failed to connect: {e}")
+            self.logger.error("[%.3fs] Failed to connect: %s", timestamp, e)
 
     def _disconnect(self, timestamp):
         """
@@ -150,7 +150,7 @@ class EthernetPlugin(BasePlugin):
                 pass
         self.sock = None
         self.connected = False
-        self.logger.info(f"[{timestamp:.3f}s] Ethernet disconnected.")
+        self.logger.info("[%.3fs] Ethernet disconnected.", timestamp)
 
     def _send_message(self, cmd, payload, timestamp):
         """
@@ -167,9 +167,9 @@ class EthernetPlugin(BasePlugin):
         message = {"cmd": cmd, "data": payload}
         try:
             self.sock.sendall((json.dumps(message) + "\n").encode())
-            self.logger.info(f"[{timestamp:.3f}s] Sent '{cmd}' with data: {payload}")
+            self.logger.info("[%.3fs] Sent '%s' with data: %s", timestamp, cmd, payload)
         except Exception as e:
-            self.logger.error(f"[{timestamp:.3f}s] Error sending message: {e}")
+            self.logger.error("[%.3fs] Error sending message: %s", timestamp, e)
             self._disconnect(timestamp)
 
     def on_shutdown(self):
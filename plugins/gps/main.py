@@ -42,18 +42,20 @@ class GPSPlugin(BasePlugin):
         action = topic.split(".")[1]
 
         if action == "set_location":
-            lat = data.get("lat")
-            lon = data.get("lon")
-            if lat is not None and lon is not None:
-                self.location = {"lat": lat, "lon": lon}
-                self.active = True
-                self.logger.info(f"[{timestamp:.3f}s] GPS location set to ({lat}, {lon})")
-            else:
-                self.logger.warn(f"Invalid location data: {data}")
+            # lat/lon presence and range are checked by the plugin schema at load time
+            lat = data["lat"]
+            lon = data["lon"]
+            self.location = {"lat": lat, "lon": lon}
+            self.active = True
+            self.logger.info("[%.3fs] GPS location set to (%s, %s)", timestamp, lat, lon)
 
         elif action == "simulate_loss":
             self.active = False
-            self.logger.info(f"[{timestamp:.3f}s] GPS signal lost.")
+            self.logger.info("[%.3fs] GPS signal lost.", timestamp)
+
+    def on_reset(self):
+        self.active = True
+        self.location = {"lat": 0.0, "lon": 0.0}
 
     def on_shutdown(self):
         self.logger.info("GPS plugin shutting down.")
@@ -34,7 +34,7 @@ class MediaPlugin(BasePlugin):
 
     def on_event(self, topic, data, timestamp):
         track = data.get("track", "(unknown)")
-        self.logger.info(f"[{timestamp:.3f}s] Now playing: {track}")
+        self.logger.info("[%.3fs] Now playing: %s", timestamp, track)
 
     def on_shutdown(self):
         self.logger.info("MediaPlugin shutting down.")
@@ -21,27 +21,43 @@
 # SOFTWARE.
 #
 
-import threading
-import time
+import os
+from concurrent.futures import ThreadPoolExecutor
 from core.base_plugin import BasePlugin
 from utils.logger import Logger
+from utils.nmea import np, load_track
 
 class ReplayGPSPlugin(BasePlugin):
     """
     Replays GPS coordinates from an NMEA log file and emits 'gps.set_location' events
     to simulate GPS movement in the OpenRoadSim environment.
+
+    The fixes are handed to the engine as a scheduled stream (see
+    `EventBus.schedule_stream`) and published at the times of the recording,
+    scaled by `speed`, while the rest of the scenario keeps running.
+    `gps.stop_replay`, a new `gps.start_replay` or the end of the run cancels it.
+
+    With NumPy installed the log is decoded into track arrays (see `utils.nmea`)
+    on a worker thread, started by `prepare` ahead of the run where possible,
+    and cached in `.cache/nmea`; fixes then also carry
+    `speed` (km/h) and `heading` (degrees) when the log has them. The stream is
+    handed to the engine once the track is ready, so a log that is still being
+    parsed at `start_replay` delivers its overdue fixes at once when it is.
+    Without NumPy the GGA lines are read one at a time.
     """
 
     def __init__(self):
         """
         Initializes the ReplayGPSPlugin instance.
         
-        Sets up logging, thread management variables, and placeholder for event bus.
+        Sets up logging, the replay state, and placeholder for event bus.
         """
         self.name = "ReplayGPSPlugin"
         self.logger = Logger(self.name)
-        self.thread = None
         self.running = False
+        self._replay = 0  # Incremented per start_replay; older streams see it and stop
+        self._tracks = {}  # (abspath, checksum) -> ((size, mtime_ns), Future of NmeaTrack)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nmea-parse")
         self.event_bus = None  # Will be injected externally
 
     def on_init(self, config):
@@ -59,47 +75,165 @@ class ReplayGPSPlugin(BasePlugin):
         """
         Handles events targeted to this plugin.
 
-        Specifically listens for 'start_replay' events to start replaying GPS data
-        from a specified NMEA file.
+        Listens for 'start_replay' events to start replaying GPS data from a
+        specified NMEA file, and 'stop_replay' to cancel it. Starting returns at
+        once; the engine publishes the fixes when they are due.
 
         Args:
             topic (str): The event topic (e.g., 'gps.start_replay').
-            data (dict): Event parameters; expects 'file' and optional 'speed'.
+            data (dict): Event parameters; expects 'file' and optional 'speed'
+                         and 'checksum' (drop sentences with bad checksums).
             scenario_timestamp (float): Simulation time when the event was triggered.
         """
+        if topic.endswith("stop_replay"):
+            self.running = False
+            return
+
         if topic.endswith("start_replay"):
             file = data.get("file")
             speed = float(data.get("speed", 1.0))
-            if file:
-                self.thread = threading.Thread(
-                    target=self._replay_file,
-                    args=(file, speed, scenario_timestamp),
-                    daemon=True
-                )
-                self.running = True
-                self.thread.start()
-                self.thread.join()
-            else:
+            checksum = bool(data.get("checksum", True))
+            if not file:
                 self.logger.error("Missing 'file' parameter for start_replay.")
+                return
+            if not hasattr(self.event_bus, "schedule_stream"):
+                self.logger.error("GPS replay needs the in-process event bus (no 'isolation: process').")
+                return
+
+            self._replay += 1
+            replay = self._replay
+            self.running = True
+            active = lambda: self.running and self._replay == replay
+            if np is None:
+                self.event_bus.schedule_stream(self._replay_lines(file, speed, scenario_timestamp), active=active)
+                return
+
+            self.logger.info("Replaying GPS from %s at %sx speed", file, speed)
+            # Keeps the run going while the log is still being parsed
+            reservation = self.event_bus.reserve_stream()
+            self._load(file, checksum).add_done_callback(
+                lambda future: self._start_track(future, file, speed, scenario_timestamp, active, reservation)
+            )
+
+    def prepare(self, topic, data):
+        """
+        Starts parsing the log of a `gps.start_replay` event ahead of the run.
+
+        Args:
+            topic (str): The event topic.
+            data (dict): The event data, with 'file' and 'checksum'.
+
+        Raises:
+            FileNotFoundError: If the NMEA file does not exist.
+        """
+        if topic != "gps.start_replay":
+            return
+        if not os.path.isfile(data["file"]):
+            raise FileNotFoundError(f"NMEA log not found: {data['file']}")
+        if np is not None:
+            self._load(data["file"], data.get("checksum", True))
+
+    def on_reset(self):
+        """
+        Stops a replay that is still running when the simulation ends.
+        """
+        self.running = False
+
+    def _load(self, filepath, checksum):
+        """
+        Returns the parse of an NMEA log, submitting it to the parser thread unless
+        the file is unchanged since an earlier parse that did not fail.
+
+        Args:
+            filepath (str): Path to the NMEA file.
+            checksum (bool): Skip sentences with a missing or wrong checksum.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the `NmeaTrack`.
+        """
+        key = (os.path.abspath(filepath), checksum)
+        try:
+            stat = os.stat(filepath)
+            stamp = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            stamp = None  # load_track reports it
+        loaded = self._tracks.get(key)
+        if loaded is None or loaded[0] != stamp or (loaded[1].done() and loaded[1].exception() is not None):
+            future = self._executor.submit(load_track, filepath, validate=checksum, logger=self.logger)
+            loaded = self._tracks[key] = (stamp, future)
+        return loaded[1]
 
-    def _replay_file(self, filepath, speed, scenario_start_time):
+    def _start_track(self, future, filepath, speed, scenario_start_time, active, reservation):
         """
-        Internal method to replay NMEA GPS data from the specified file.
+        Hands the fixes of a parsed track to the engine, unless the replay was
+        cancelled meanwhile, and releases the stream reservation. Runs on the
+        parser thread when the parse finishes.
 
-        Reads NMEA GGA sentences, parses latitude and longitude, and emits
-        gps.set_location events simulating real-time movement scaled by speed.
+        Args:
+            future (concurrent.futures.Future): The finished parse.
+            filepath (str): Path to the NMEA file (for log messages).
+            speed (float): Playback speed factor (1.0 = real time).
+            scenario_start_time (float): Simulation time offset to align replay.
+            active (callable): Whether the replay is still wanted.
+            reservation (object): Token from `event_bus.reserve_stream()`.
+        """
+        try:
+            if not active():
+                if self.event_bus.sim_time() is None:
+                    self.logger.warn("Run ended before %s was parsed; replay dropped", filepath)
+                return
+            try:
+                track = future.result()
+            except Exception as e:
+                self.logger.error("Replay failed: %s", e)
+                return
+            if track.invalid:
+                self.logger.warn("Skipped %d NMEA sentences with bad checksums in %s", track.invalid, filepath)
+            self.event_bus.schedule_stream(self._track_fixes(track, speed, scenario_start_time), active=active)
+        finally:
+            self.event_bus.release_stream(reservation)
+
+    def _track_fixes(self, track, speed, scenario_start_time):
+        """
+        Internal generator that yields the fixes of a parsed track as the engine
+        asks for them.
+
+        Each fix is due at its NMEA time relative to the first fix, divided by
+        speed.
+
+        Args:
+            track (NmeaTrack): The parsed log.
+            speed (float): Playback speed factor (1.0 = real time).
+            scenario_start_time (float): Simulation time offset to align replay.
+
+        Yields:
+            tuple: (sim_time, 'gps.set_location', {'lat', 'lon'[, 'speed', 'heading']}).
+        """
+        for offset, fix in track.fixes():
+            yield scenario_start_time + offset / speed, "gps.set_location", fix
+
+    def _replay_lines(self, filepath, speed, scenario_start_time):
+        """
+        Line-by-line fallback for `_track_fixes` when NumPy is not installed.
+
+        Reads NMEA GGA sentences and parses latitude and longitude; a time
+        of day that jumps back by more than 12 hours is a midnight rollover.
 
         Args:
             filepath (str): Path to the NMEA file.
             speed (float): Playback speed factor (1.0 = real time).
             scenario_start_time (float): Simulation time offset to align replay.
+
+        Yields:
+            tuple: (sim_time, 'gps.set_location', {'lat', 'lon'}).
         """
-        self.logger.info(f"Replaying GPS from {filepath} at {speed}x speed")
+        self.logger.info("Replaying GPS from %s at %sx speed", filepath, speed)
 
         try:
             with open(filepath, 'r') as f:
                 base_nmea_time = None
-                sim_time = scenario_start_time
+                previous = None
+                rollover = 0.0
 
                 for line in f:
                     if not self.running:
@@ -116,37 +250,21 @@ class ReplayGPSPlugin(BasePlugin):
                         mm = int(nmea_raw[2:4])
                         ss = float(nmea_raw[4:])
                         nmea_seconds = hh * 3600 + mm * 60 + ss
+                        if previous is not None and nmea_seconds < previous - 43200:
+                            rollover += 86400  # Past midnight
+                        previous = nmea_seconds
+                        nmea_seconds += rollover
 
                         if base_nmea_time is None:
                             base_nmea_time = nmea_seconds
-                            offset = 0.0
-                        else:
-                            offset = (nmea_seconds - base_nmea_time) / speed
-
-                        sim_time = scenario_start_time + offset
 
                         lat, lon = self._parse_nmea(parts)
                         if lat is not None and lon is not None:
-                            self._emit_gps(lat, lon, sim_time)
-                            time.sleep(0.05)  # small sleep to reduce CPU usage
+                            sim_time = scenario_start_time + (nmea_seconds - base_nmea_time) / speed
+                            yield sim_time, "gps.set_location", {"lat": lat, "lon": lon}
 
         except Exception as e:
-            self.logger.error(f"Replay failed: {e}")
-
-    def _emit_gps(self, lat, lon, sim_time):
-        """
-        Emits the simulated GPS location event on the event bus.
-
-        Args:
-            lat (float): Latitude in decimal degrees.
-            lon (float): Longitude in decimal degrees.
-            sim_time (float): Simulation timestamp for the event.
-        """
-        event = {
-            "lat": lat,
-            "lon": lon
-        }
-        self.event_bus.publish("gps.set_location", event, sim_time)
+            self.logger.error("Replay failed: %s", e)
 
     def _parse_nmea(self, parts):
         """
@@ -196,8 +314,10 @@ class ReplayGPSPlugin(BasePlugin):
         """
         Called when the plugin is shutting down.
 
-        Sets running flag to False to stop replay thread cleanly
-        and logs the shutdown event.
+        Sets running flag to False to cancel a running replay, drops pending
+        parses and logs the shutdown event.
         """
         self.logger.info("ReplayGPSPlugin shutting down.")
         self.running = False
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._tracks.clear()
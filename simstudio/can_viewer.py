@@ -24,6 +24,8 @@ from PyQt5.QtCore import QTimer
 import can
 import datetime
 
+MAX_FRAMES_PER_TICK = 2000
+
 class CANViewerWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -71,18 +73,33 @@ class CANViewerWidget(QWidget):
             print(f"[CANViewer] Failed to connect to {iface}: {e}")
 
     def _read_messages(self):
+        # Drain everything queued since the last tick (bounded, so a flooded bus
+        # cannot stall the GUI) and add the rows in one batch
+        messages = []
         try:
-            msg = self.bus.recv(timeout=0.01)
-            if msg:
-                row = self.table.rowCount()
-                self.table.insertRow(row)
-                self.table.setItem(row, 0, QTableWidgetItem(datetime.datetime.now().strftime('%H:%M:%S')))
-                self.table.setItem(row, 1, QTableWidgetItem(hex(msg.arbitration_id)))
-                self.table.setItem(row, 2, QTableWidgetItem(str(msg.dlc)))
-                self.table.setItem(row, 3, QTableWidgetItem(" ".join(f"{x:02X}" for x in msg.data)))
-                self.table.setItem(row, 4, QTableWidgetItem(self.interface_combo.currentText()))
-
-                if self.auto_scroll.isChecked():
-                    self.table.scrollToBottom()
+            while len(messages) < MAX_FRAMES_PER_TICK:
+                msg = self.bus.recv(timeout=0)
+                if msg is None:
+                    break
+                messages.append(msg)
         except Exception as e:
             print(f"[CANViewer] Error reading CAN: {e}")
+        if not messages:
+            return
+
+        iface = self.interface_combo.currentText()
+        self.table.setUpdatesEnabled(False)
+        row = self.table.rowCount()
+        self.table.setRowCount(row + len(messages))
+        for msg in messages:
+            stamp = datetime.datetime.fromtimestamp(msg.timestamp).strftime('%H:%M:%S.%f')[:-3]
+            self.table.setItem(row, 0, QTableWidgetItem(stamp))
+            self.table.setItem(row, 1, QTableWidgetItem(hex(msg.arbitration_id)))
+            self.table.setItem(row, 2, QTableWidgetItem(str(msg.dlc)))
+            self.table.setItem(row, 3, QTableWidgetItem(" ".join(f"{x:02X}" for x in msg.data)))
+            self.table.setItem(row, 4, QTableWidgetItem(iface))
+            row += 1
+        self.table.setUpdatesEnabled(True)
+
+        if self.auto_scroll.isChecked():
+            self.table.scrollToBottom()
@@ -19,6 +19,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import os
 import sys
 from PyQt5.QtWidgets import QMainWindow, QApplication, QMdiArea, QMdiSubWindow,QDockWidget
 from PyQt5.QtCore import Qt
@@ -28,6 +29,9 @@ from inspector_widget import InspectorWidget
 from scenario_timeline import ScenarioTimelineWidget
 from log_console_widget import LogConsoleWidget
 from PyQt5.QtWidgets import QFileDialog, QMdiSubWindow
+from constants import API_INTERFACE, GUI_LOGGER
+from core.config_loader import ConfigLoader
+from utils.logger import Logger
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -56,6 +60,15 @@ class MainWindow(QMainWindow):
         dock.setObjectName("LogDock")
         self.addDockWidget(Qt.BottomDockWidgetArea, dock)
 
+        if ConfigLoader.get("plugins").get("watch", True):
+            API_INTERFACE.watch_plugins()
+
+    def closeEvent(self, event):
+        # Plugins stay loaded between runs; release their buses and sockets on exit
+        API_INTERFACE.shutdown()
+        Logger.shutdown()
+        super().closeEvent(event)
+
     def handle_menu_action(self, action):
         if action == MenuAction.CAN_VIEWER:
             self.open_can_viewer()
@@ -65,6 +78,10 @@ class MainWindow(QMainWindow):
             self.open_scenario()
         elif action == MenuAction.TOGGLE_LOG:
             self.show_log_console()
+        elif action == MenuAction.LOAD_PLUGIN:
+            self.load_plugin()
+        elif action == MenuAction.RELOAD_PLUGINS:
+            API_INTERFACE.plugin_manager.reload_plugins()
         else:
             print("to be implemented")
 
@@ -83,6 +100,18 @@ class MainWindow(QMainWindow):
         self.addDockWidget(Qt.BottomDockWidgetArea, dock)
 
 
+    def load_plugin(self):
+        plugin_dir = os.path.abspath(API_INTERFACE.plugin_manager.plugin_dir)
+        path = QFileDialog.getExistingDirectory(self, "Load Plugin", plugin_dir)
+        if not path:
+            return
+        if os.path.dirname(os.path.abspath(path)) != plugin_dir:
+            GUI_LOGGER.error("Plugins must be placed in %s", plugin_dir)
+            return
+        manager = API_INTERFACE.plugin_manager
+        manager.load_manifests()
+        manager.load_plugin(os.path.basename(path))
+
     def open_can_viewer(self):
         can_widget = CANViewerWidget()
         subwindow = QMdiSubWindow()
@@ -115,6 +144,8 @@ class MainWindow(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    # Apply per-logger levels and async delivery as the CLI does
+    Logger.configure(ConfigLoader.get("logging"))
     window = MainWindow()
     window.show()
     sys.exit(app.exec_())
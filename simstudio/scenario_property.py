@@ -32,7 +32,7 @@ class ScenarioPropertyWidget(QWidget):
         self.action_label.setText(str(event.get("action", "")))
 
         params = event.get("params", {})
-        pretty = json.dumps(params, indent=2) if isinstance(params, dict) else str(params)
+        pretty = json.dumps(params, indent=2, default=str) if isinstance(params, dict) else str(params)
         self.params_text.setPlainText(pretty)
 
     def clear(self):
@@ -21,23 +21,89 @@
 # SOFTWARE.
 #
 
-import yaml
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QGraphicsView, QGraphicsScene,
     QGraphicsRectItem, QGraphicsSimpleTextItem, QFileDialog,
     QPushButton, QLabel, QHBoxLayout,QSplitter
 )
 from PyQt5.QtGui import QPen, QBrush, QPainter
-from PyQt5.QtCore import Qt, QRectF
+from PyQt5.QtCore import Qt, QRectF, QTimer, pyqtSignal
 from scenario_property import ScenarioPropertyWidget
 from clickable_scene import ClickableScene
 from PyQt5.QtWidgets import QPlainTextEdit
 from constants import API_INTERFACE,GUI_LOGGER
+from core.scenario_parser import ScenarioParser
+
+LEFT = 100
+ROW_HEIGHT = 40
+EVENT_SIZE = 20
+TIME_SCALE = 100  # px per sec
+REPARSE_DELAY_MS = 300  # Quiet period after the last keystroke before re-parsing
+
+
+def index_events(events):
+    """
+    Builds the timeline entries for a list of parsed events, keyed for diffing.
+
+    The key is the event content (time, target, action, params, condition) plus an
+    occurrence counter for identical events, so unchanged events keep their key
+    across edits even when lines above them are inserted or removed.
+
+    Args:
+        events (list[dict]): Parsed scenario events.
+
+    Returns:
+        dict: Key -> event copy with 'sim_time' and 'topic' added.
+    """
+    entries = {}
+    seen = {}
+    for e in events:
+        if not (isinstance(e, dict) and "time" in e and "target" in e):
+            continue
+        try:
+            sim_time = float(e["time"])
+            topic = str(e["target"])
+        except (ValueError, TypeError):
+            continue  # skip invalid rows
+
+        base = (sim_time, topic, e.get("action"), repr(e.get("params")), e.get("condition"))
+        occurrence = seen.get(base, 0)
+        seen[base] = occurrence + 1
+
+        e_copy = dict(e)  # make a shallow copy
+        e_copy["sim_time"] = sim_time
+        e_copy["topic"] = topic
+        entries[(base, occurrence)] = e_copy
+    return entries
+
 
 class ScenarioTimelineWidget(QWidget):
+    # generation, entries (dict or None), error (Exception or None)
+    parsed = pyqtSignal(int, object, object)
+
     def __init__(self, yaml_path=None, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Scenario Timeline")
+        self.current_path = None
+
+        # Timeline state, updated incrementally on every edit
+        self._markers = {}  # Entry key -> QGraphicsRectItem
+        self._layout_items = []  # Row lines/labels and time grid
+        self._layout = None  # (topics, max_time) the rows and grid were drawn for
+        self._topic_y = {}
+
+        # Editor buffers are parsed on a worker thread; only the newest result is applied
+        self._parser = ScenarioParser(GUI_LOGGER, cache_dir=None)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="timeline-parse")
+        self._generation = 0
+        self._loading = False
+        self.parsed.connect(self._apply_parse)
+
+        self._reparse_timer = QTimer(self)
+        self._reparse_timer.setSingleShot(True)
+        self._reparse_timer.setInterval(REPARSE_DELAY_MS)
+        self._reparse_timer.timeout.connect(self._schedule_reparse)
 
         # Top bar: File path and Browse button
         file_bar = QHBoxLayout()
@@ -66,6 +132,7 @@ class ScenarioTimelineWidget(QWidget):
         self.yaml_editor.setPlaceholderText("YAML scenario (editable)")
         self.yaml_editor.setStyleSheet("font-family: monospace;")
         self.yaml_editor.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.yaml_editor.textChanged.connect(self._on_text_changed)
 
         # Final Vertical Splitter (Top: Timeline, Bottom: YAML)
         main_splitter = QSplitter(Qt.Vertical)
@@ -87,7 +154,7 @@ class ScenarioTimelineWidget(QWidget):
             self.load_and_render(yaml_path)
 
     def run_scenario(self):
-        GUI_LOGGER.info(f"Loading Scenario file {self.current_path}")
+        GUI_LOGGER.info("Loading Scenario file %s", self.current_path)
         API_INTERFACE.load_scenario(self.current_path)
         API_INTERFACE.start()
         return
@@ -98,76 +165,145 @@ class ScenarioTimelineWidget(QWidget):
             self.load_and_render(path)
 
     def load_and_render(self, path):
-        with open(path, 'r') as f:
-            text = f.read()
-            data = yaml.safe_load(text)
-            self.yaml_editor.setPlainText(text) 
+        try:
+            with open(path, 'r') as f:
+                text = f.read()
+            # Parsed once through the shared parser; reloads hit its compiled cache
+            events = API_INTERFACE.parser.load(path)
+        except Exception as e:
+            self.path_label.setText(f"Error loading: {e}")
+            return
+
+        # Filling the editor must not trigger a re-parse, and any parse still in
+        # flight for the previous buffer is now stale
+        self._reparse_timer.stop()
+        self._generation += 1
+        self._loading = True
+        try:
+            self.yaml_editor.setPlainText(text)
+        finally:
+            self._loading = False
+
         self.path_label.setText(path)
         self.current_path = path
         self.play_btn.setEnabled(True)
-        try:
-            with open(path, 'r') as f:
-                data = yaml.safe_load(f)
+        self.render_timeline(events)
 
-                # Flexible: support top-level list or {"events": [...]}
-                if isinstance(data, list):
-                    events = data
-                elif isinstance(data, dict) and "events" in data:
-                    events = data["events"]
-                else:
-                    events = []
+    def render_timeline(self, events):
+        self._update_timeline(index_events(events))
+
+    def closeEvent(self, event):
+        self._reparse_timer.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        super().closeEvent(event)
+
+    def _on_text_changed(self):
+        if not self._loading:
+            self._reparse_timer.start()  # Restarts the debounce window
 
-                self.render_timeline(events)
+    def _schedule_reparse(self):
+        self._generation += 1
+        self._executor.submit(
+            self._parse_in_background, self._generation, self.yaml_editor.toPlainText(), self.current_path
+        )
+
+    def _parse_in_background(self, generation, text, path):
+        """
+        Parses an editor buffer on the worker thread and hands the result back to
+        the GUI thread through the `parsed` signal.
+
+        Args:
+            generation (int): Edit generation the buffer belongs to.
+            text (str): Editor contents.
+            path (str): File the buffer was loaded from, for relative imports.
+        """
+        if generation != self._generation:
+            return  # Superseded by a newer edit before it was picked up
+        try:
+            entries, error = index_events(self._parser.loads(text, path)), None
         except Exception as e:
-            self.path_label.setText(f"Error loading: {e}")
+            entries, error = None, e
+        self.parsed.emit(generation, entries, error)
 
+    def _apply_parse(self, generation, entries, error):
+        if generation != self._generation:
+            return
+        if error is not None:
+            # Keep the last good timeline while the buffer does not parse
+            message = str(error).splitlines()[0] if str(error) else type(error).__name__
+            self.path_label.setText(f"YAML error: {message}")
+            return
+        self.path_label.setText(self.current_path or "Unsaved scenario")
+        self._update_timeline(entries)
 
-    def render_timeline(self, events):
-        self.scene.clear()
-        LEFT = 100
-        ROW_HEIGHT = 40
-        EVENT_SIZE = 20
-        TIME_SCALE = 100  # px per sec
-
-        # Normalize keys: map 'target' → 'topic', 'time' → 'sim_time'
-        valid_events = []
-        for e in events:
-            if isinstance(e, dict) and "time" in e and "target" in e:
-                try:
-                    sim_time = float(e["time"])
-                    topic = str(e["target"])
-                    e_copy = dict(e)  # make a shallow copy
-                    e_copy["sim_time"] = sim_time
-                    e_copy["topic"] = topic
-                    valid_events.append({"sim_time": sim_time, "topic": topic, "full_event": e_copy})
-                except (ValueError, TypeError):
-                    continue  # skip invalid rows
-
-        topics = sorted(set(e["topic"] for e in valid_events))
-        topic_y = {t: i * ROW_HEIGHT for i, t in enumerate(topics)}
-        max_time = max((e["sim_time"] for e in valid_events), default=10)
-
-        for topic, y in topic_y.items():
-            self.scene.addLine(LEFT, y + ROW_HEIGHT//2, LEFT + max_time*TIME_SCALE, y + ROW_HEIGHT//2, QPen(Qt.gray))
+    def _update_timeline(self, entries):
+        """
+        Brings the scene in line with a new set of timeline entries.
+
+        Only markers whose key disappeared or appeared are removed or created; rows
+        and the time grid are redrawn only when the topics or the duration change.
+
+        Args:
+            entries (dict): Output of `index_events`.
+        """
+        for key in self._markers.keys() - entries.keys():
+            self.scene.removeItem(self._markers.pop(key))
+
+        topics = sorted(set(e["topic"] for e in entries.values()))
+        max_time = max((e["sim_time"] for e in entries.values()), default=10)
+        if self._layout != (topics, max_time):
+            rows_moved = self._layout is None or self._layout[0] != topics
+            self._draw_layout(topics, max_time)
+            if rows_moved:
+                for key, marker in self._markers.items():
+                    marker.setPos(*self._marker_pos(entries[key]))
+
+        for key in entries.keys() - self._markers.keys():
+            e = entries[key]
+            marker = QGraphicsRectItem(QRectF(0, 0, EVENT_SIZE, EVENT_SIZE))
+            marker.setPos(*self._marker_pos(e))
+            marker.setBrush(QBrush(Qt.black))
+            marker.setToolTip(f"{e['topic']}\nTime: {e['sim_time']}")
+            marker.setData(0, e)
+            self.scene.addItem(marker)
+            self._markers[key] = marker
+
+    def _marker_pos(self, e):
+        x = LEFT + e["sim_time"] * TIME_SCALE
+        y = self._topic_y[e["topic"]] + ROW_HEIGHT//2 - EVENT_SIZE//2
+        return x, y
+
+    def _draw_layout(self, topics, max_time):
+        """
+        Redraws the topic rows and the time grid.
+
+        Args:
+            topics (list[str]): Sorted topic names, one row each.
+            max_time (float): Time of the last event in seconds.
+        """
+        for item in self._layout_items:
+            self.scene.removeItem(item)
+        self._layout_items = []
+        self._layout = (topics, max_time)
+        self._topic_y = {t: i * ROW_HEIGHT for i, t in enumerate(topics)}
+
+        for topic, y in self._topic_y.items():
+            self._layout_items.append(self.scene.addLine(
+                LEFT, y + ROW_HEIGHT//2, LEFT + max_time*TIME_SCALE, y + ROW_HEIGHT//2, QPen(Qt.gray)
+            ))
             label = QGraphicsSimpleTextItem(topic)
             label.setPos(10, y + 5)
             self.scene.addItem(label)
+            self._layout_items.append(label)
 
         for sec in range(int(max_time) + 1):
             x = LEFT + sec * TIME_SCALE
-            self.scene.addLine(x, 0, x, len(topics)*ROW_HEIGHT, QPen(Qt.lightGray, 1, Qt.DashLine))
+            self._layout_items.append(self.scene.addLine(
+                x, 0, x, len(topics)*ROW_HEIGHT, QPen(Qt.lightGray, 1, Qt.DashLine)
+            ))
             label = QGraphicsSimpleTextItem(f"{sec}s")
             label.setPos(x - 10, len(topics)*ROW_HEIGHT + 5)
             self.scene.addItem(label)
-
-        for e in valid_events:
-            x = LEFT + e["sim_time"] * TIME_SCALE
-            y = topic_y[e["topic"]] + ROW_HEIGHT//2 - EVENT_SIZE//2
-            marker = QGraphicsRectItem(QRectF(x, y, EVENT_SIZE, EVENT_SIZE))
-            marker.setBrush(QBrush(Qt.black))
-            marker.setToolTip(f"{e['topic']}\nTime: {e['sim_time']}")
-            marker.setData(0, e["full_event"])
-            self.scene.addItem(marker)
+            self._layout_items.append(label)
 
         self.scene.setSceneRect(0, 0, LEFT + max_time * TIME_SCALE + 200, len(topics) * ROW_HEIGHT + 80)
-    
\ No newline at end of file
@@ -0,0 +1,128 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import os
+import random
+import pytest
+from plugins.can.dbc import DbcMessage, DbcSignal, load_dbc
+
+VEHICLE_DBC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "vehicle.dbc")
+
+
+@pytest.fixture(scope="module")
+def database():
+    return load_dbc(VEHICLE_DBC)
+
+
+def random_message(rng, length):
+    """
+    Builds a message whose signals tile its payload in one byte order, with
+    random widths, so signals also cross byte and 64-bit word boundaries.
+    Widths stay within 52 bits, where physical values (floats) are exact.
+    """
+    big_endian = rng.random() < 0.5
+    message = DbcMessage(0x100, "Random", length)
+    bits = length * 8
+    position = 0
+    while position < bits:
+        width = min(rng.randint(1, 52), bits - position)
+        if big_endian:
+            msb = bits - position - width  # Counted from the left of the big-endian integer
+            start = (msb // 8) * 8 + (7 - msb % 8)
+        else:
+            start = position
+        message.add_signal(DbcSignal(
+            f"S{position}", start, width, big_endian, rng.random() < 0.5, 1.0, 0.0, 0.0, 0.0, "",
+        ))
+        position += width
+    return message
+
+
+def random_values(rng, message):
+    values = {}
+    for name, signal in message.signals.items():
+        low, high = signal.raw_bounds()
+        values[name] = rng.randint(low, high)
+    return values
+
+
+def test_load_reads_messages_and_signals(database):
+    speed = database.messages["VehicleSpeed"]
+    assert (speed.frame_id, speed.length, speed.extended) == (201, 2, False)
+    chassis = database.by_id[0x400]
+    assert chassis.name == "ChassisStatus" and chassis.extended
+    assert database.lookup("YawRate") == (chassis, "YawRate")
+    assert database.lookup("Brake.BrakeApplied")[1] == "BrakeApplied"
+    with pytest.raises(KeyError):
+        database.lookup("Missing")
+
+
+def test_motorola_signal_layout(database):
+    # Speed: start bit 7, 16 bits, Motorola, factor 0.01
+    assert database.messages["VehicleSpeed"].pack({"Speed": 100.0}) == b"\x27\x10"
+
+
+def test_pack_unpack_round_trip(database):
+    chassis = database.messages["ChassisStatus"]
+    values = {"YawRate": -12.34, "LateralAccel": 5.5, "SteeringAngle": -450.3}
+    decoded = chassis.unpack(chassis.pack(values))
+    assert decoded == pytest.approx(values)
+
+
+def test_out_of_range_values_are_rejected(database):
+    with pytest.raises(ValueError, match="out of range"):
+        database.messages["LaneDeparture"].pack({"Side": 4})
+
+
+def test_signal_outside_the_payload_is_rejected():
+    message = DbcMessage(1, "Short", 1)
+    message.add_signal(DbcSignal("Wide", 0, 9, False, False, 1.0, 0.0, 0.0, 0.0, ""))
+    with pytest.raises(ValueError, match="does not fit"):
+        message.pack({"Wide": 1})
+
+
+@pytest.mark.parametrize("length", [1, 2, 8, 12, 20, 64])
+def test_random_layouts_round_trip(length):
+    rng = random.Random(length)
+    for _ in range(50):
+        message = random_message(rng, length)
+        values = random_values(rng, message)
+        assert message.unpack(message.pack(values)) == values
+
+
+@pytest.mark.parametrize("length", [1, 3, 8, 9, 16, 64])
+def test_pack_batch_matches_pack(length):
+    np = pytest.importorskip("numpy")
+    rng = random.Random(1000 + length)
+    for _ in range(30):
+        message = random_message(rng, length)
+        rows = [random_values(rng, message) for _ in range(5)]
+        frames = message.pack_batch({name: [row[name] for row in rows] for name in message.signals})
+        assert frames.dtype == np.uint8 and frames.shape == (5, length)
+        assert [bytes(frame) for frame in frames] == [message.pack(row) for row in rows]
+
+
+def test_pack_batch_rejects_out_of_range_samples(database):
+    pytest.importorskip("numpy")
+    with pytest.raises(ValueError, match="out of range"):
+        database.messages["VehicleSpeed"].pack_batch({"Speed": [1.0, 700.0]})
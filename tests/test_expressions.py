@@ -0,0 +1,82 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import pytest
+from core.expressions import ExpressionError, compile_expression, evaluate, substitute
+
+
+def test_arithmetic_and_comparisons():
+    assert evaluate("speed * 2 + 1", {"speed": 4}) == 9
+    assert evaluate("speed > 80 and active", {"speed": 90, "active": True}) is True
+    assert evaluate("x if flag else y", {"x": 1, "y": 2, "flag": False}) == 2
+    assert evaluate("max(a, b) - abs(c)", {"a": 3, "b": 7, "c": -2}) == 5
+
+
+def test_dotted_names_and_signal_lookup():
+    signals = {"gps.lat": 52.1, "can.rx.0x3E9": [1, 2, 3]}
+    fn = compile_expression('gps.lat > 52 and signal("can.rx.0x3E9")[2] == 3')
+    assert fn(signals.__getitem__) is True
+
+
+def test_constants_are_folded():
+    fn = compile_expression("limit * 2", {"limit": 40})
+    assert fn(lambda name: pytest.fail(f"unexpected lookup of {name}")) == 80
+
+
+def test_unknown_name_raises_expression_error():
+    with pytest.raises(ExpressionError, match="Undefined variable"):
+        evaluate("missing + 1", {})
+
+
+@pytest.mark.parametrize("source", [
+    "__import__('os')",
+    "_private",
+    "open('x')",
+    "(lambda: 1)()",
+    "[x for x in y]",
+    "a.__class__",
+    "print(1, end='')",
+    "x := 1",
+])
+def test_forbidden_constructs_are_rejected(source):
+    with pytest.raises(ExpressionError):
+        compile_expression(source)
+
+
+@pytest.mark.parametrize("source", ["9**9**9", "2**5000", "1 << 100000", "x ** 100000"])
+def test_huge_integer_results_are_refused(source):
+    with pytest.raises(ExpressionError, match="too large"):
+        evaluate(source, {"x": 7})
+
+
+def test_small_powers_and_shifts_still_work():
+    assert evaluate("2**10 + (1 << 4)", {}) == 1040
+    assert evaluate("2 ** -1", {}) == 0.5
+    assert evaluate("1.5 ** 2", {}) == 2.25
+
+
+def test_substitute_keeps_type_of_single_expression():
+    variables = {"initial_speed": 8000}
+    assert substitute("${initial_speed * 2}", variables) == 16000
+    assert substitute("speed=${initial_speed}", variables) == "speed=8000"
+    assert substitute({"a": ["${initial_speed}"], "b": 1}, variables) == {"a": [8000], "b": 1}
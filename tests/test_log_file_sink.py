@@ -0,0 +1,110 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import glob
+import gzip
+import json
+import os
+from utils.log_file_sink import LogFileSink
+
+
+def segments(tmp_path, pattern="trace.0*"):
+    return sorted(glob.glob(str(tmp_path / pattern)))
+
+
+def records(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_records_are_written_as_jsonl(tmp_path):
+    sink = LogFileSink(str(tmp_path / "trace.jsonl"), compress=False)
+    sink.write(100.0, 0.5, "CanPlugin", "INFO", "sent 0x0C9")
+    sink.write(100.1, None, "ORS", "WARN", "done")
+    sink.close()
+    [path] = segments(tmp_path)
+    assert records(path) == [
+        {"sim_time": 0.5, "wall_time": 100.0, "plugin": "CanPlugin", "level": "INFO", "message": "sent 0x0C9"},
+        {"sim_time": None, "wall_time": 100.1, "plugin": "ORS", "level": "WARN", "message": "done"},
+    ]
+
+
+def test_segments_rotate_on_encoded_size(tmp_path):
+    sink = LogFileSink(str(tmp_path / "trace.jsonl"), max_bytes=1000, block_records=1, compress=False)
+    for i in range(40):
+        sink.write(100.0 + i, i * 0.1, "GPS", "INFO", f"Position ✓ {i} " + "é" * 20)
+    sink.close()
+    paths = segments(tmp_path)
+    assert len(paths) > 1
+    largest_record = max(len(line) for path in paths for line in open(path, "rb"))
+    assert all(os.path.getsize(path) < 1000 + largest_record for path in paths)
+    assert [record["sim_time"] for path in paths for record in records(path)] == [i * 0.1 for i in range(40)]
+
+
+def test_rotated_segments_are_compressed(tmp_path):
+    sink = LogFileSink(str(tmp_path / "trace.jsonl"), max_bytes=200, block_records=1, compress=True)
+    for i in range(10):
+        sink.write(100.0 + i, float(i), "ORS", "INFO", "x" * 50)
+    sink.close()
+    paths = segments(tmp_path)
+    assert any(path.endswith(".gz") for path in paths)
+    assert [record["sim_time"] for path in paths for record in records(path)] == [float(i) for i in range(10)]
+
+
+def test_find_segments_by_sim_time_within_one_run(tmp_path):
+    index = str(tmp_path / "trace.index.jsonl")
+    sink = LogFileSink(str(tmp_path / "trace.jsonl"), max_bytes=150, block_records=1, compress=False)
+    for run in range(2):
+        for i in range(10):
+            sink.write(100.0 + run * 10 + i, float(i), "ORS", "INFO", f"run {run} record {i}")
+    sink.close()
+
+    def found(start, end, run=None):
+        paths = LogFileSink.find_segments(index, start, end, run=run)
+        return [record for path in paths for record in records(path) if start <= record["sim_time"] <= end]
+
+    last = found(3.0, 5.0)
+    assert [record["message"] for record in last] == [f"run 1 record {i}" for i in (3, 4, 5)]
+    first = found(3.0, 5.0, run=1)
+    assert [record["message"] for record in first if record["message"].startswith("run 0")] == \
+        [f"run 0 record {i}" for i in (3, 4, 5)]
+
+
+def test_find_segments_by_wall_time(tmp_path):
+    index = str(tmp_path / "trace.index.jsonl")
+    sink = LogFileSink(str(tmp_path / "trace.jsonl"), max_bytes=150, block_records=1, compress=False)
+    for i in range(10):
+        sink.write(100.0 + i, None, "ORS", "INFO", f"record {i}")
+    sink.close()
+    paths = LogFileSink.find_segments(index, 104.0, 104.0, key="wall_time")
+    assert any(record["message"] == "record 4" for path in paths for record in records(path))
+    assert len(paths) < len(segments(tmp_path))
+
+
+def test_numbering_continues_across_sinks(tmp_path):
+    for _ in range(2):
+        sink = LogFileSink(str(tmp_path / "trace.jsonl"), compress=False)
+        sink.write(100.0, 1.0, "ORS", "INFO", "hello")
+        sink.close()
+    assert [os.path.basename(path) for path in segments(tmp_path)] == ["trace.000001.jsonl", "trace.000002.jsonl"]
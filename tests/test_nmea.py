@@ -0,0 +1,153 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import functools
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from utils import nmea
+from utils.nmea import load_track, parse_nmea
+
+
+def sentence(body, checksum=None):
+    """Returns `$body*hh` with the correct checksum, unless one is given."""
+    if checksum is None:
+        checksum = f"{functools.reduce(lambda a, b: a ^ b, body.encode(), 0):02X}"
+    return f"${body}*{checksum}"
+
+
+def gga(hhmmss, lat="5236.123", ns="N", lon="00454.321", ew="E", talker="GP"):
+    return sentence(f"{talker}GGA,{hhmmss},{lat},{ns},{lon},{ew},1,08,1.0,0.0,M,0.0,M,,")
+
+
+def rmc(hhmmss, lat="5236.123", lon="00454.321", knots="10.0", course="90.0", status="A"):
+    return sentence(f"GPRMC,{hhmmss},{status},{lat},N,{lon},E,{knots},{course},010124,,,A")
+
+
+def vtg(course="91.5", kmh="37.0"):
+    return sentence(f"GPVTG,{course},T,,M,10.8,N,{kmh},K,A")
+
+
+def write_log(tmp_path, lines, newline="\n", name="track.nmea"):
+    path = tmp_path / name
+    path.write_bytes(newline.join(lines).encode())
+    return str(path)
+
+
+def test_gga_positions(tmp_path):
+    track = parse_nmea(write_log(tmp_path, [gga("123456.00"), gga("123457.00", ns="S", ew="W")]))
+    assert len(track) == 2
+    assert track.lat == pytest.approx([52 + 36.123 / 60, -(52 + 36.123 / 60)])
+    assert track.lon == pytest.approx([4 + 54.321 / 60, -(4 + 54.321 / 60)])
+    assert list(track.time - track.time[0]) == [0.0, 1.0]
+    assert list(track.quality) == [1, 1]
+
+
+def test_sentences_of_one_epoch_are_merged(tmp_path):
+    lines = [gga("120000.00"), rmc("120000.00", lat="5236.500"), vtg(), gga("120001.00")]
+    track = parse_nmea(write_log(tmp_path, lines))
+    assert len(track) == 2
+    assert track.lat[0] == pytest.approx(52 + 36.5 / 60)  # Last value of the epoch wins
+    assert track.speed[0] == pytest.approx(37.0)  # VTG belongs to the epoch before it
+    assert track.heading[0] == pytest.approx(91.5)
+    assert np.isnan(track.speed[1]) and np.isnan(track.heading[1])
+
+
+def test_rmc_speed_is_converted_to_kmh(tmp_path):
+    track = parse_nmea(write_log(tmp_path, [rmc("120000.00", knots="10.0", status="V")]))
+    assert track.speed[0] == pytest.approx(18.52)
+    assert track.quality[0] == 0
+
+
+def test_bad_and_missing_checksums_are_dropped(tmp_path):
+    lines = [
+        gga("120000.00"),
+        sentence("GPGGA,120001.00,5236.123,N,00454.321,E,1,08,1.0,0.0,M,0.0,M,,", checksum="00"),
+        "$GPGGA,120002.00,5236.123,N,00454.321,E,1,08,1.0,0.0,M,0.0,M,,",
+        gga("120003.00"),
+    ]
+    path = write_log(tmp_path, lines)
+    track = parse_nmea(path)
+    assert (len(track), track.invalid) == (2, 2)
+    assert list(track.time - track.time[0]) == [0.0, 3.0]
+    assert len(parse_nmea(path, validate=False)) == 4
+
+
+def test_other_sentences_and_talkers(tmp_path):
+    lines = [
+        sentence("GPGSV,3,1,11,03,03,111,00,04,15,270,00,06,01,010,00,13,06,292,00"),
+        gga("120000.00", talker="GN"),
+        "garbage",
+        "",
+        gga("120001.00", talker="GL"),
+    ]
+    track = parse_nmea(write_log(tmp_path, lines, newline="\r\n"))
+    assert (len(track), track.invalid) == (2, 0)
+
+
+def test_midnight_rollover_keeps_time_increasing(tmp_path):
+    track = parse_nmea(write_log(tmp_path, [gga("235959.00"), gga("000001.00")]))
+    assert list(track.time - track.time[0]) == [0.0, 2.0]
+
+
+def test_empty_file(tmp_path):
+    assert len(parse_nmea(write_log(tmp_path, []))) == 0
+
+
+def test_chunked_parse_matches_single_chunk(tmp_path, monkeypatch):
+    lines = []
+    for second in range(200):
+        stamp = f"12{second // 60:02d}{second % 60:02d}.00"
+        lines += [gga(stamp), rmc(stamp), vtg()]
+    lines[10] = lines[10][:-2] + "00"  # One bad checksum
+    path = write_log(tmp_path, lines)
+
+    whole = parse_nmea(path, workers=1)
+    monkeypatch.setattr(nmea, "CHUNK_BYTES", 1000)  # Chunks end mid-epoch
+    chunked = parse_nmea(path, workers=3)
+    assert (len(chunked), chunked.invalid) == (len(whole), whole.invalid) == (200, 1)
+    for name in nmea.NmeaTrack.COLUMNS:
+        np.testing.assert_array_equal(getattr(chunked, name), getattr(whole, name))
+
+
+def test_fixes_are_offsets_and_payloads(tmp_path):
+    lines = [sentence("GPGGA,120000.00,,,,,0,00,,,M,,M,,"), gga("120001.00"), vtg(), gga("120002.50")]
+    fixes = list(parse_nmea(write_log(tmp_path, lines)).fixes())
+    assert [offset for offset, _ in fixes] == [1.0, 2.5]
+    assert fixes[0][1] == {"lat": pytest.approx(52.60205), "lon": pytest.approx(4.905350), "speed": 37.0,
+                           "heading": 91.5}
+    assert set(fixes[1][1]) == {"lat", "lon"}
+
+
+def test_load_track_uses_the_cache_until_the_log_changes(tmp_path, monkeypatch):
+    path = write_log(tmp_path, [gga("120000.00")])
+    cache_dir = str(tmp_path / "cache")
+    assert len(load_track(path, cache_dir=cache_dir)) == 1
+
+    monkeypatch.setattr(nmea, "parse_nmea", lambda *args: pytest.fail("cache not used"))
+    assert len(load_track(path, cache_dir=cache_dir)) == 1
+
+    monkeypatch.undo()
+    write_log(tmp_path, [gga("120000.00"), gga("120001.00")])
+    assert len(load_track(path, cache_dir=cache_dir)) == 2
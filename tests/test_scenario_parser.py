@@ -0,0 +1,164 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import os
+import pytest
+from core.scenario_parser import ScenarioParser
+from utils.logger import Logger
+
+MAIN = """
+variables:
+  speed: 40
+import: [fragment]
+events:
+  - time: 0
+    target: echo
+    action: say
+    params: {message: "${speed * 2}"}
+"""
+
+FRAGMENT = """
+- time: 1
+  target: echo
+  action: say
+  params: {message: fragment}
+"""
+
+
+def write(path, text, mtime_ns=None):
+    path.write_text(text)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Records the files each load actually parses, so cache hits read none."""
+    paths = []
+    read_yaml = ScenarioParser._read_yaml
+
+    def spy(self, path):
+        paths.append(os.path.basename(path))
+        return read_yaml(self, path)
+
+    monkeypatch.setattr(ScenarioParser, "_read_yaml", spy)
+    return paths
+
+
+def load(tmp_path, path):
+    return ScenarioParser(Logger("test"), cache_dir=str(tmp_path / "cache")).load(path)
+
+
+def messages(events):
+    return [(event["time"], event["params"]["message"]) for event in events]
+
+
+def test_second_load_is_served_from_the_cache(tmp_path, reads):
+    path = write(tmp_path / "main.yaml", MAIN)
+    write(tmp_path / "fragment.yaml", FRAGMENT)
+
+    first = load(tmp_path, path)
+    assert reads == ["main.yaml", "fragment.yaml"]
+    reads.clear()
+    parser = ScenarioParser(Logger("test"), cache_dir=str(tmp_path / "cache"))
+    second = parser.load(path)
+    assert reads == []
+    assert messages(second) == messages(first) == [(0.0, 80), (1.0, "fragment")]
+    assert parser.variables == {"speed": 40}
+
+
+def test_editing_an_import_invalidates_the_cache(tmp_path, reads):
+    path = write(tmp_path / "main.yaml", MAIN)
+    fragment = tmp_path / "fragment.yaml"
+    write(fragment, FRAGMENT)
+    load(tmp_path, path)
+
+    # Same size and a changed mtime: detected by the content hash
+    write(fragment, FRAGMENT.replace("fragment}", "changed}"), mtime_ns=fragment.stat().st_mtime_ns + 10**9)
+    reads.clear()
+    assert messages(load(tmp_path, path))[-1] == (1.0, "changed")
+    assert "fragment.yaml" in reads
+
+
+def test_touching_a_file_keeps_the_cache(tmp_path, reads):
+    path = write(tmp_path / "main.yaml", MAIN)
+    write(tmp_path / "fragment.yaml", FRAGMENT)
+    load(tmp_path, path)
+
+    os.utime(path, ns=(os.stat(path).st_mtime_ns + 10**9,) * 2)
+    reads.clear()
+    load(tmp_path, path)
+    assert reads == []
+
+
+def test_creating_a_missing_import_invalidates_the_cache(tmp_path):
+    path = write(tmp_path / "main.yaml", MAIN)
+    assert messages(load(tmp_path, path)) == [(0.0, 80)]
+
+    write(tmp_path / "fragment.yaml", FRAGMENT)
+    assert messages(load(tmp_path, path)) == [(0.0, 80), (1.0, "fragment")]
+
+
+def test_variables_do_not_leak_between_loads(tmp_path):
+    parser = ScenarioParser(Logger("test"), cache_dir=str(tmp_path / "cache"))
+    write(tmp_path / "fragment.yaml", FRAGMENT)
+    parser.load(write(tmp_path / "main.yaml", MAIN))
+    parser.load(write(tmp_path / "plain.yaml", "- {time: 0, target: echo, action: say}\n"))
+    assert parser.variables == {}
+
+
+def test_cache_can_be_disabled(tmp_path):
+    parser = ScenarioParser(Logger("test"), cache_dir=None)
+    write(tmp_path / "fragment.yaml", FRAGMENT)
+    assert len(parser.load(write(tmp_path / "main.yaml", MAIN))) == 2
+    assert not (tmp_path / "cache").exists()
+
+
+def test_imports_are_shifted_by_their_offsets_and_merged(tmp_path, reads):
+    write(tmp_path / "fragment.yaml", FRAGMENT)
+    path = write(tmp_path / "main.yaml", """
+import:
+  - fragment
+  - {file: fragment.yaml, offset: 0.5}
+  - {file: fragment, offset: 10}
+events:
+  - {time: 2, target: echo, action: say, params: {message: main}}
+""")
+    events = load(tmp_path, path)
+    assert messages(events) == [(1.0, "fragment"), (1.5, "fragment"), (2.0, "main"), (11.0, "fragment")]
+    assert reads.count("fragment.yaml") == 1  # Parsed once, reused for every import
+
+
+def test_import_cycles_are_skipped(tmp_path):
+    write(tmp_path / "a.yaml", "import: [b]\nevents:\n  - {time: 0, target: echo, action: say, params: {message: a}}\n")
+    write(tmp_path / "b.yaml", "import: [a]\nevents:\n  - {time: 1, target: echo, action: say, params: {message: b}}\n")
+    assert messages(load(tmp_path, str(tmp_path / "a.yaml"))) == [(0.0, "a"), (1.0, "b")]
+
+
+def test_imports_resolve_relative_to_the_importing_file(tmp_path):
+    (tmp_path / "common").mkdir()
+    write(tmp_path / "common" / "setup.yaml", "import: [fragment]\n")
+    write(tmp_path / "common" / "fragment.yaml", FRAGMENT)
+    path = write(tmp_path / "main.yaml", "import: [common/setup]\n")
+    assert messages(load(tmp_path, path)) == [(1.0, "fragment")]
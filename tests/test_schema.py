@@ -0,0 +1,102 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import pytest
+from core.schema import SchemaError, compile_schema
+
+CAN_SEND = {
+    "id": {"type": "int", "required": True, "max": 0x1FFFFFFF},
+    "data": {"type": "bytes", "max_length": 8, "default": []},
+    "extended": {"type": "bool", "default": False},
+}
+
+
+def test_values_are_coerced_to_their_types():
+    validate = compile_schema(CAN_SEND)
+    params = validate({"id": "0x0C9", "data": [0x1F, 0x40], "extended": "yes"})
+    assert params == {"id": 201, "data": b"\x1f@", "extended": True}
+
+
+def test_defaults_fill_missing_and_null_fields():
+    validate = compile_schema(CAN_SEND)
+    assert validate({"id": 1, "data": None}) == {"id": 1, "data": b"", "extended": False}
+
+
+def test_unknown_fields_are_kept_and_input_is_not_modified():
+    validate = compile_schema(CAN_SEND)
+    params = {"id": "5", "note": "kept"}
+    result = validate(params)
+    assert result["note"] == "kept"
+    assert params == {"id": "5", "note": "kept"}
+
+
+@pytest.mark.parametrize("value, expected", [
+    (3, 3),
+    (3.0, 3),
+    ("0b101", 5),
+    (" 42 ", 42),
+])
+def test_int_coercion(value, expected):
+    assert compile_schema({"n": "int"})({"n": value})["n"] == expected
+
+
+@pytest.mark.parametrize("value", [True, 2.5, "abc", [1]])
+def test_int_rejects_non_integers(value):
+    with pytest.raises(SchemaError, match="'n'"):
+        compile_schema({"n": "int"})({"n": value})
+
+
+def test_bytes_from_hex_string():
+    assert compile_schema({"d": "bytes"})({"d": "0xDEADbeef"})["d"] == b"\xde\xad\xbe\xef"
+
+
+@pytest.mark.parametrize("params, message", [
+    ({}, "'id' is required"),
+    ({"id": 0x20000000}, "must be <="),
+    ({"id": 1, "data": list(range(9))}, "at most 8"),
+    ({"id": 1, "data": [256]}, "'data'"),
+])
+def test_invalid_params_raise_schema_error(params, message):
+    with pytest.raises(SchemaError, match=message):
+        compile_schema(CAN_SEND)(params)
+
+
+def test_choices_and_minimum():
+    validate = compile_schema({"mode": {"type": "str", "choices": ["a", "b"]}, "rate": {"type": "float", "min": 0}})
+    assert validate({"mode": "a", "rate": "1.5"}) == {"mode": "a", "rate": 1.5}
+    with pytest.raises(SchemaError, match="one of"):
+        validate({"mode": "c"})
+    with pytest.raises(SchemaError, match=">= 0"):
+        validate({"rate": -1})
+
+
+def test_invalid_schemas_fail_at_compile_time():
+    with pytest.raises(SchemaError, match="Unknown type"):
+        compile_schema({"x": "complex"})
+    with pytest.raises(ValueError):
+        compile_schema({"x": {"type": "int", "max": 3, "default": 5}})
+
+
+def test_params_must_be_a_mapping():
+    with pytest.raises(SchemaError, match="mapping"):
+        compile_schema(CAN_SEND)([1, 2])
@@ -0,0 +1,129 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+"""
+Measures CanPlugin send throughput per backend.
+
+Every interface gets its own CanChannel (send worker thread) and is fed at the
+same time from one producer, like the engine does. Frames are counted on a
+separate receiving bus per interface (socketcan, virtual) or in the recorder
+(loopback).
+
+    python tools/can/benchmark.py --backend all                  # no hardware needed for virtual/loopback
+    sudo ./tools/can/bringup_can.sh                             # plus vcan1, vcan2 for several channels
+    python tools/can/benchmark.py --interfaces vcan0 vcan1 --frames 200000 --fd --size 64
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import can
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from plugins.can.channel import BACKENDS, CanChannel  # noqa: E402
+from utils.logger import Logger  # noqa: E402
+
+
+def count_frames(bus, expected, counts, index, stop):
+    """Receives until `expected` frames arrived or `stop` is set."""
+    while counts[index] < expected and not stop.is_set():
+        if bus.recv(0.2) is not None:
+            counts[index] += 1
+
+
+def run(backend, interfaces, frames, size, fd):
+    logger = Logger("CanBenchmark")
+    channels = []
+    for interface in interfaces:
+        channel = CanChannel(interface, interface, logger, fd=fd, bitrate_switch=fd, queue_size=frames,
+                             backend=backend, record_size=frames)
+        channel.open()
+        channels.append(channel)
+
+    stop = threading.Event()
+    counts = [0] * len(channels)
+    receivers = []
+    if backend != "loopback":
+        for index, interface in enumerate(interfaces):
+            if backend == "virtual":
+                rx = can.interface.Bus(channel=interface, interface="virtual")
+            else:
+                rx = can.interface.Bus(channel=interface, interface="socketcan", fd=fd)
+            thread = threading.Thread(target=count_frames, args=(rx, frames, counts, index, stop), daemon=True)
+            thread.start()
+            receivers.append((rx, thread))
+
+    payload = bytes(range(size))
+    messages = [channel.message(0x100 + i, payload, False) for i, channel in enumerate(channels)]
+
+    started = time.perf_counter()
+    for _ in range(frames):
+        for channel, message in zip(channels, messages):
+            channel.send(message)
+    queued = time.perf_counter() - started
+    for channel in channels:
+        channel.flush()
+    sent = time.perf_counter() - started
+
+    for rx, thread in receivers:
+        thread.join(timeout=5.0)
+    stop.set()
+    if backend == "loopback":
+        counts = [len(channel.bus.recorded) for channel in channels]
+
+    print(f"[{backend}]")
+    print(f"{'channel':<10} {'sent':>9} {'dropped':>8} {'errors':>7} {'received':>9} {'frames/s':>10}")
+    for channel, count in zip(channels, counts):
+        print(f"{channel.name:<10} {channel.sent:>9} {channel.dropped:>8} {channel.errors:>7} {count:>9} "
+              f"{channel.sent / sent:>10.0f}")
+    total = sum(channel.sent for channel in channels)
+    print(f"queued in {queued:.3f} s, sent in {sent:.3f} s: {total / sent:.0f} frames/s over {len(channels)} channel(s)")
+
+    for channel in channels:
+        channel.close()
+    for rx, _ in receivers:
+        rx.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CanPlugin send throughput per backend.")
+    parser.add_argument("--backend", choices=BACKENDS + ("all",), default="socketcan",
+                        help="bus backend; 'all' runs each one (socketcan needs the vcan interfaces)")
+    parser.add_argument("--interfaces", nargs="+", default=["vcan0"], help="vcan interfaces, one channel each")
+    parser.add_argument("--frames", type=int, default=100000, help="frames per channel")
+    parser.add_argument("--size", type=int, default=8, help="payload bytes (up to 64 with --fd)")
+    parser.add_argument("--fd", action="store_true", help="send CAN FD frames with bit rate switch")
+    args = parser.parse_args()
+    for backend in BACKENDS if args.backend == "all" else (args.backend,):
+        try:
+            run(backend, args.interfaces, args.frames, args.size, args.fd)
+        except Exception as e:
+            print(f"[{backend}] skipped: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import os
+import gzip
+import json
+import time
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class LogFileSink:
+    """
+    LogFileSink writes structured log records to rotating JSONL segment files.
+
+    Each record is one JSON object per line:
+        {"sim_time": 3.0, "wall_time": 1718000000.12, "plugin": "CanPlugin",
+         "level": "INFO", "message": "..."}
+
+    Records are buffered and written in blocks. A segment is rotated when it grows
+    beyond `max_bytes` or is older than `max_seconds`; rotated segments are
+    optionally gzip-compressed on a background thread.
+
+    Next to the segments an append-only index (`<stem>.index.jsonl`) records the
+    first wall time of every segment and, per run, the first sim time logged into
+    it, so viewers can open only the segments covering a time window (see
+    `find_segments`). A run starts when records get a sim time again after
+    having none (or it jumps back), since sim time restarts at 0 every run.
+
+    Example:
+        Logger.add_global_sink(LogFileSink("logs/trace.jsonl", max_bytes=8 * 1024 * 1024))
+    """
+
+    def __init__(self, path="logs/trace.jsonl", max_bytes=64 * 1024 * 1024, max_seconds=None,
+                 block_records=512, flush_interval=1.0, compress=True):
+        """
+        Initializes the sink and opens the first segment.
+
+        Args:
+            path (str): Base path; segments are named `<stem>.<n>.jsonl` in the same folder.
+            max_bytes (int): Rotate once a segment reaches this size.
+            max_seconds (float): Rotate once a segment is this old (None disables).
+            block_records (int): Number of buffered records written per block.
+            flush_interval (float): Maximum seconds a record stays buffered.
+            compress (bool): Gzip rotated segments in a background thread.
+        """
+        self.directory = os.path.dirname(path) or "."
+        self.stem = os.path.splitext(os.path.basename(path))[0]
+        self.index_path = os.path.join(self.directory, f"{self.stem}.index.jsonl")
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.block_records = max(1, int(block_records))
+        self.flush_interval = flush_interval
+        self.compress = compress
+
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._file = None
+        self._segment_path = None
+        self._segment_bytes = 0
+        self._segment_opened = 0.0
+        self._segment_indexed = False
+        self._segment_run = None  # Run whose first sim time in this segment is indexed
+        self._last_sim_time = None
+        self._last_flush = time.time()
+        self._compressor = ThreadPoolExecutor(max_workers=1) if compress else None
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._sequence, self._run = self._last_numbers()
+        self._open_segment()
+
+    def write(self, wall_time, sim_time, name, level, message):
+        """
+        Buffers one record; writes a block when the buffer is full or stale.
+
+        Args:
+            wall_time (float): Epoch time of the log call.
+            sim_time (float or None): Simulation time of the log call.
+            name (str): Logger name (usually the plugin name).
+            level (str): Log level.
+            message (str): Formatted message.
+        """
+        line = json.dumps({
+            "sim_time": sim_time,
+            "wall_time": wall_time,
+            "plugin": name,
+            "level": level,
+            "message": message,
+        }, default=str) + "\n"
+
+        with self._lock:
+            if sim_time is not None and (self._last_sim_time is None or sim_time < self._last_sim_time):
+                self._run += 1
+            self._last_sim_time = sim_time
+            if not self._segment_indexed or (sim_time is not None and self._segment_run != self._run):
+                self._append_index(wall_time, sim_time)
+            self._buffer.append(line)
+            if len(self._buffer) >= self.block_records or wall_time - self._last_flush >= self.flush_interval:
+                self._write_block()
+
+    def flush(self):
+        """
+        Writes all buffered records to the current segment.
+        """
+        with self._lock:
+            self._write_block()
+            if self._file:
+                self._file.flush()
+
+    def close(self):
+        """
+        Flushes buffered records, closes the current segment and waits for
+        pending compressions to finish.
+        """
+        with self._lock:
+            self._write_block()
+            if self._file:
+                self._file.close()
+                self._file = None
+                if not self._segment_indexed:
+                    os.remove(self._segment_path)  # Nothing was logged into it
+        if self._compressor:
+            self._compressor.shutdown(wait=True)
+            self._compressor = None
+
+    @staticmethod
+    def find_segments(index_path, start, end, key="sim_time", run=None):
+        """
+        Returns the segment files that may contain records in [start, end].
+
+        Relies on segments being written in time order, which holds for wall time
+        and for the sim time within a run; sim time windows are therefore looked
+        up in one run.
+
+        Args:
+            index_path (str): Path to the `<stem>.index.jsonl` file.
+            start (float): Window start.
+            end (float): Window end.
+            key (str): "sim_time" or "wall_time".
+            run (int): Run to search by sim time; defaults to the last one logged.
+
+        Returns:
+            list[str]: Existing segment paths (compressed ones end in `.gz`).
+        """
+        directory = os.path.dirname(index_path) or "."
+        entries = []
+        with open(index_path, "r") as f:
+            for line in f:
+                entry = json.loads(line)
+                if entry.get(key) is not None:
+                    entries.append(entry)
+        if key == "sim_time" and entries:
+            run = max(entry.get("run") or 0 for entry in entries) if run is None else run
+            entries = [entry for entry in entries if (entry.get("run") or 0) == run]
+
+        selected = []
+        for i, entry in enumerate(entries):
+            next_start = entries[i + 1][key] if i + 1 < len(entries) else float("inf")
+            if entry[key] <= end and next_start >= start:
+                path = os.path.join(directory, entry["segment"])
+                if not os.path.exists(path) and os.path.exists(path + ".gz"):
+                    path += ".gz"
+                if path not in selected:  # A segment has one entry per run it holds
+                    selected.append(path)
+        return selected
+
+    def _last_numbers(self):
+        """
+        Reads the index to continue segment and run numbering across processes.
+
+        Returns:
+            tuple: (highest segment number, highest run number) used so far (0 if none).
+        """
+        if not os.path.exists(self.index_path):
+            return 0, 0
+        sequence = run = 0
+        with open(self.index_path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    sequence = max(sequence, int(entry.get("sequence", 0)))
+                    run = max(run, int(entry.get("run") or 0))
+                except (ValueError, TypeError):
+                    continue
+        return sequence, run
+
+    def _open_segment(self):
+        """
+        Opens the next numbered segment file.
+        """
+        self._sequence += 1
+        name = f"{self.stem}.{self._sequence:06d}.jsonl"
+        self._segment_path = os.path.join(self.directory, name)
+        self._file = open(self._segment_path, "wb")
+        self._segment_bytes = 0
+        self._segment_opened = time.time()
+        self._segment_indexed = False
+        self._segment_run = None
+
+    def _append_index(self, wall_time, sim_time):
+        """
+        Records where the current segment starts: on its first record, and again
+        on its first record with a sim time in each run.
+
+        Args:
+            wall_time (float): Wall time of the record.
+            sim_time (float or None): Sim time of the record (None outside a run).
+        """
+        run = self._run if sim_time is not None else None
+        entry = {
+            "sequence": self._sequence,
+            "segment": os.path.basename(self._segment_path),
+            "wall_time": wall_time,
+            "sim_time": sim_time,
+            "run": run,
+        }
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+        self._segment_indexed = True
+        if run is not None:
+            self._segment_run = run
+
+    def _write_block(self):
+        """
+        Writes the buffer in a single call and rotates the segment if needed.
+        Must be called with the lock held.
+        """
+        if not self._buffer or self._file is None:
+            return
+        block = "".join(self._buffer).encode("utf-8")  # Bytes, so max_bytes holds for non-ASCII text
+        self._buffer = []
+        self._file.write(block)
+        self._segment_bytes += len(block)
+        self._last_flush = time.time()
+
+        too_big = self.max_bytes and self._segment_bytes >= self.max_bytes
+        too_old = self.max_seconds and self._last_flush - self._segment_opened >= self.max_seconds
+        if too_big or too_old:
+            self._rotate()
+
+    def _rotate(self):
+        """
+        Closes the current segment, schedules its compression and opens a new one.
+        Must be called with the lock held.
+        """
+        self._file.close()
+        if self._compressor:
+            self._compressor.submit(self._compress_segment, self._segment_path)
+        self._open_segment()
+
+    @staticmethod
+    def _compress_segment(path):
+        """
+        Gzips a closed segment and removes the uncompressed file.
+
+        Args:
+            path (str): Segment path.
+        """
+        tmp_path = path + ".gz.tmp"
+        with open(path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, path + ".gz")
+        os.remove(path)
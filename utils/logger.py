@@ -22,7 +22,11 @@
 #
 
 import sys
+import time
+import queue
+import atexit
 import datetime
+import threading
 
 class Logger:
     """
@@ -32,12 +36,34 @@ class Logger:
     - INFO, WARN, ERROR, DEBUG log levels
     - Custom listeners per instance or globally
     - Timestamped log dispatching without printing directly to stdout
-    - Debug filtering controlled by the constructor flag
+    - Level thresholds, globally or per logger name (see `configure`)
+    - Lazy %-style formatting: arguments are only formatted, and values wrapped
+      in `Logger.lazy` only computed, when at least one listener receives the message
+    - An optional asynchronous mode where callers only enqueue a record and a
+      background thread formats and dispatches records in batches
 
     Listeners can be used to pipe logs to GUIs, files, or consoles with color formatting.
+    Sinks (see `add_global_sink`) receive structured records including the current
+    simulation time, e.g. for `utils.log_file_sink.LogFileSink`.
     """
 
     _global_listeners = []  # Shared across all Logger instances
+    _global_sinks = []  # Structured record consumers, shared across all Logger instances
+    _sim_time = None  # Latest simulation time reported by the ScenarioEngine
+
+    LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARN': 30, 'ERROR': 40}
+    _default_level = LEVELS['INFO']
+    _levels = {}  # Per-logger-name thresholds, e.g. {"CanPlugin": 30}
+
+    # Asynchronous pipeline state, shared across all Logger instances
+    _queue = None
+    _worker = None
+    _batch_size = 256
+    _dropped = 0
+    _drop_lock = threading.Lock()
+    _clock_offset = 0.0  # Converts time.perf_counter() values to epoch seconds
+    _stamp_cache = (None, "")  # (epoch second, formatted "HH:MM:SS")
+    _STOP = object()
 
     def __init__(self, name='ORS', enable_debug=False):
         """
@@ -45,10 +71,12 @@ class Logger:
 
         Args:
             name (str): Logical name for the logger (e.g., module or plugin name).
-            enable_debug (bool): Whether DEBUG messages should be emitted.
+            enable_debug (bool): Whether DEBUG messages should be emitted. Overrides
+                                 the configured level of this logger when True.
         """
         self.name = name
         self.enable_debug = enable_debug
+        self.level = Logger.LEVELS['DEBUG'] if enable_debug else None
         self.listeners = list(Logger._global_listeners)  # Copy current global listeners
 
     @classmethod
@@ -61,6 +89,272 @@ class Logger:
         """
         cls._global_listeners.append(listener_func)
 
+    @classmethod
+    def configure(cls, settings):
+        """
+        Applies the `logging` section of the central configuration.
+
+        Args:
+            settings (dict): Supported keys are `level` (default threshold name),
+                             `levels` (mapping of logger name to threshold name),
+                             `async` (bool), `queue_size` (int), `batch_size` (int)
+                             and `file` (LogFileSink settings plus `enabled`).
+        """
+        settings = settings or {}
+        file_settings = settings.get("file") or {}
+        if file_settings.get("enabled", False):
+            from utils.log_file_sink import LogFileSink
+            cls.add_global_sink(LogFileSink(
+                path=file_settings.get("path", "logs/trace.jsonl"),
+                max_bytes=file_settings.get("max_bytes", 64 * 1024 * 1024),
+                max_seconds=file_settings.get("max_seconds"),
+                block_records=file_settings.get("block_records", 512),
+                compress=file_settings.get("compress", True),
+            ))
+        if "level" in settings:
+            cls._default_level = cls._level_value(settings["level"])
+        for name, level in (settings.get("levels") or {}).items():
+            cls.set_level(name, level)
+        if settings.get("async", False):
+            cls.enable_async(
+                queue_size=settings.get("queue_size", 10000),
+                batch_size=settings.get("batch_size", 256),
+            )
+
+    @classmethod
+    def add_global_sink(cls, sink):
+        """
+        Registers a structured record consumer for all Logger instances.
+
+        Args:
+            sink: Object with `write(wall_time, sim_time, name, level, message)`
+                  and `close()` methods.
+        """
+        cls._global_sinks.append(sink)
+
+    @classmethod
+    def set_sim_time(cls, sim_time):
+        """
+        Records the current simulation time; attached to every subsequent record.
+
+        Args:
+            sim_time (float or None): Simulation time in seconds.
+        """
+        cls._sim_time = sim_time
+
+    @classmethod
+    def set_level(cls, name, level):
+        """
+        Sets the threshold for all loggers with the given name.
+
+        Args:
+            name (str): Logger name (e.g., "CanPlugin").
+            level (str): One of DEBUG, INFO, WARN, ERROR.
+        """
+        cls._levels[name] = cls._level_value(level)
+
+    @classmethod
+    def _level_value(cls, level):
+        """
+        Converts a level name to its numeric value.
+
+        Args:
+            level (str): Level name, case-insensitive. WARNING is accepted for WARN.
+
+        Returns:
+            int: Numeric level.
+
+        Raises:
+            ValueError: If the level name is unknown.
+        """
+        name = str(level).upper()
+        if name == 'WARNING':
+            name = 'WARN'
+        if name not in cls.LEVELS:
+            raise ValueError(f"Unknown log level: {level}")
+        return cls.LEVELS[name]
+
+    @classmethod
+    def enable_async(cls, queue_size=10000, batch_size=256):
+        """
+        Switches all loggers to asynchronous dispatching.
+
+        Log calls only enqueue a (logger, level, template, args, perf_counter) record.
+        A background thread formats the records and notifies listeners in batches.
+        When the bounded queue is full, records are dropped and counted instead of
+        blocking the caller.
+
+        Args:
+            queue_size (int): Maximum number of pending records.
+            batch_size (int): Maximum number of records dispatched per wake-up.
+        """
+        if cls._queue is not None:
+            return
+
+        cls._batch_size = max(1, int(batch_size))
+        cls._clock_offset = time.time() - time.perf_counter()
+        cls._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        cls._worker = threading.Thread(
+            target=cls._drain, args=(cls._queue,), name="LoggerWorker", daemon=True
+        )
+        cls._worker.start()
+        atexit.register(cls.shutdown)
+
+    @classmethod
+    def flush(cls):
+        """
+        Blocks until every record queued so far has been dispatched to listeners.
+        Does nothing in synchronous mode.
+        """
+        q = cls._queue
+        if q is not None:
+            q.join()
+
+    @classmethod
+    def shutdown(cls):
+        """
+        Flushes pending records, stops the background thread and closes all sinks.
+
+        Loggers fall back to synchronous dispatching afterwards. If records were
+        dropped because the queue was full, a warning is written to stderr.
+        """
+        cls._stop_async()
+        for sink in cls._global_sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                print(f"[Logger] Sink close error: {e}", file=sys.stderr)
+        cls._global_sinks = []
+
+    @classmethod
+    def _stop_async(cls):
+        """
+        Drains the asynchronous queue and stops its background thread, if running.
+        """
+        q, worker = cls._queue, cls._worker
+        if q is None:
+            return
+
+        cls._queue = None  # New records are dispatched synchronously from now on
+        q.put(cls._STOP)
+        worker.join()
+        cls._worker = None
+
+        # Records enqueued by other threads while the worker was stopping
+        while True:
+            try:
+                record = q.get_nowait()
+            except queue.Empty:
+                break
+            if record is not cls._STOP:
+                cls._dispatch(record)
+
+        if cls._dropped:
+            print(f"[Logger] {cls._dropped} log record(s) dropped (queue full)", file=sys.stderr)
+
+    @classmethod
+    def dropped_count(cls):
+        """
+        Returns the number of records dropped because the async queue was full.
+
+        Returns:
+            int: Total dropped records since startup.
+        """
+        return cls._dropped
+
+    @classmethod
+    def _drain(cls, q):
+        """
+        Background thread loop: waits for records and dispatches them in batches.
+
+        Args:
+            q (queue.Queue): The queue this worker owns.
+        """
+        while True:
+            batch = [q.get()]
+            while len(batch) < cls._batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            for record in batch:
+                if record is cls._STOP:
+                    stop = True
+                else:
+                    cls._dispatch(record)
+                q.task_done()
+
+            if stop:
+                return
+
+    @classmethod
+    def _dispatch(cls, record):
+        """
+        Formats a queued record and notifies the listeners of its logger.
+
+        Args:
+            record (tuple): (logger, level, template, args, perf_counter, sim_time).
+        """
+        logger, level, template, args, stamp, sim_time = record
+        logger._emit(level, template, args, stamp + cls._clock_offset, sim_time)
+
+    @staticmethod
+    def lazy(fn):
+        """
+        Wraps a zero-argument callable whose result is a log argument, so it is
+        only called when the message is actually formatted.
+
+        Example:
+            logger.debug("Frame %s", Logger.lazy(lambda: data.hex()))
+
+        Args:
+            fn (callable): Computes the argument value.
+
+        Returns:
+            object: Wrapper to pass in place of the value.
+        """
+        return _LazyArg(fn)
+
+    @classmethod
+    def _format_time(cls, wall_time):
+        """
+        Formats an epoch time as "HH:MM:SS", reusing the last result within the same second.
+
+        Args:
+            wall_time (float): Seconds since the epoch.
+
+        Returns:
+            str: Formatted time string.
+        """
+        second = int(wall_time)
+        cached_second, cached_stamp = cls._stamp_cache
+        if second != cached_second:
+            cached_stamp = datetime.datetime.fromtimestamp(second).strftime('%H:%M:%S')
+            cls._stamp_cache = (second, cached_stamp)
+        return cached_stamp
+
+    def is_enabled(self, level):
+        """
+        Checks whether a message at the given level would reach any listener.
+
+        Use it to guard work that is only needed for logging, e.g. building a
+        payload dump on a hot path.
+
+        Args:
+            level (str): One of DEBUG, INFO, WARN, ERROR.
+
+        Returns:
+            bool: True if the level passes the threshold and a listener or sink is registered.
+        """
+        threshold = self.level
+        if threshold is None:
+            threshold = Logger._levels.get(self.name, Logger._default_level)
+        if Logger.LEVELS[level] < threshold:
+            return False
+        return bool(self.listeners or Logger._global_listeners or Logger._global_sinks)
+
     def add_listener(self, listener_func):
         """
         Adds a listener for this specific logger instance.
@@ -103,33 +397,83 @@ class Logger:
                 except Exception as e:
                     print(f"[Logger:{self.name}] Global listener error: {e}", file=sys.stderr)
 
-    def _log(self, level, message):
+    def _emit(self, level, template, args, wall_time, sim_time):
+        """
+        Formats a message and notifies listeners and sinks. Runs on the caller thread
+        in synchronous mode and on the background thread in asynchronous mode.
+
+        Args:
+            level (str): Log level.
+            template (str): Message, or %-style template when args are given.
+            args (tuple): Arguments for the template. `Logger.lazy` values are
+                          computed here, so expensive values are only built when needed.
+            wall_time (float): Epoch time at which the message was logged.
+            sim_time (float or None): Simulation time at which the message was logged.
+        """
+        try:
+            if args:
+                args = tuple(arg.fn() if isinstance(arg, _LazyArg) else arg for arg in args)
+            message = template % args if args else template
+        except Exception as e:
+            message = f"{template} (format error: {e}; args={args!r})"
+        self._notify(level, message, Logger._format_time(wall_time))
+
+        for sink in Logger._global_sinks:
+            try:
+                sink.write(wall_time, sim_time, self.name, level, message)
+            except Exception as e:
+                print(f"[Logger:{self.name}] Sink error: {e}", file=sys.stderr)
+
+    def _log(self, level, message, *args):
         """
-        Internal method to process a log event and notify listeners if allowed by debug filter.
+        Internal method to process a log event and notify listeners if allowed by the level filter.
+
+        In asynchronous mode only a record is enqueued; formatting happens on the
+        background thread.
 
         Args:
             level (str): Log level.
             message (str): Log message content.
+            *args: Optional %-style arguments (or `Logger.lazy` values) for the message.
         """
-        if level == 'DEBUG' and not self.enable_debug:
+        if not self.is_enabled(level):
+            return
+
+        q = Logger._queue
+        if q is not None:
+            try:
+                q.put_nowait((self, level, message, args, time.perf_counter(), Logger._sim_time))
+            except queue.Full:
+                with Logger._drop_lock:
+                    Logger._dropped += 1
             return
 
-        now = datetime.datetime.now().strftime('%H:%M:%S')
         #print(message) #enable this to debug logging issues(?)
-        self._notify(level, message, now)
+        self._emit(level, message, args, time.time(), Logger._sim_time)
 
-    def info(self, message):
+    def info(self, message, *args):
         """Log an INFO-level message."""
-        self._log('INFO', message)
+        self._log('INFO', message, *args)
 
-    def warn(self, message):
+    def warn(self, message, *args):
         """Log a WARN-level message."""
-        self._log('WARN', message)
+        self._log('WARN', message, *args)
 
-    def error(self, message):
+    def error(self, message, *args):
         """Log an ERROR-level message."""
-        self._log('ERROR', message)
+        self._log('ERROR', message, *args)
+
+    def debug(self, message, *args):
+        """Log a DEBUG-level message (only if enabled by the level threshold)."""
+        self._log('DEBUG', message, *args)
+
+
+class _LazyArg:
+    """
+    A log argument computed on formatting; see `Logger.lazy`.
+    """
+
+    __slots__ = ("fn",)
 
-    def debug(self, message):
-        """Log a DEBUG-level message (only if enabled)."""
-        self._log('DEBUG', message)
+    def __init__(self, fn):
+        self.fn = fn
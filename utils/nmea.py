@@ -0,0 +1,418 @@
+#
+# MIT License
+# Copyright (c) 2024 Gokul Kartha <kartha.gokul@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+
+import os
+import mmap
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # Optional; the GPS replay plugin falls back to line-by-line parsing
+    np = None
+
+CACHE_VERSION = 1
+CHUNK_BYTES = 16 * 1024 * 1024  # Per parser thread, so temporaries stay bounded for huge logs
+MAX_FIELD = 18  # Longest numeric field read, in characters (fits an int64 mantissa)
+
+_GGA, _RMC, _VTG = (int.from_bytes(name, "big") for name in (b"GGA", b"RMC", b"VTG"))
+
+
+class NmeaTrack:
+    """
+    A GPS track as columnar NumPy arrays, one row per epoch (fix time).
+
+    GGA, RMC and VTG sentences of the same epoch are merged into one row; VTG,
+    which carries no time, belongs to the epoch of the sentence before it.
+    Values a sentence type does not provide are NaN.
+
+    Attributes:
+        time (numpy.ndarray): Seconds since midnight of the first fix; a time
+                              of day that jumps back by more than 12 hours is a
+                              midnight rollover, so the column never wraps.
+        lat (numpy.ndarray): Latitude in decimal degrees.
+        lon (numpy.ndarray): Longitude in decimal degrees.
+        speed (numpy.ndarray): Speed over ground in km/h.
+        heading (numpy.ndarray): Course over ground in degrees.
+        quality (numpy.ndarray): GGA fix quality, or 1/0 from the RMC status
+                                 (A/V); -1 when unknown.
+        invalid (int): Sentences dropped for a missing or wrong checksum.
+    """
+
+    COLUMNS = ("time", "lat", "lon", "speed", "heading", "quality")
+
+    def __init__(self, time, lat, lon, speed, heading, quality, invalid=0):
+        self.time = time
+        self.lat = lat
+        self.lon = lon
+        self.speed = speed
+        self.heading = heading
+        self.quality = quality
+        self.invalid = invalid
+
+    def __len__(self):
+        return len(self.time)
+
+    def fixes(self):
+        """
+        Yields the rows that have a position, as `gps.set_location` payloads.
+
+        Yields:
+            tuple: (seconds since the first epoch, {'lat', 'lon'[, 'speed', 'heading']}).
+        """
+        if not len(self):
+            return
+        offsets = self.time - self.time[0]
+        for i in np.flatnonzero(~np.isnan(self.lat) & ~np.isnan(self.lon)):
+            fix = {"lat": float(self.lat[i]), "lon": float(self.lon[i])}
+            if not np.isnan(self.speed[i]):
+                fix["speed"] = float(self.speed[i])
+            if not np.isnan(self.heading[i]):
+                fix["heading"] = float(self.heading[i])
+            yield float(offsets[i]), fix
+
+
+def _empty_columns(rows=0):
+    return {name: np.full(rows, np.nan) for name in NmeaTrack.COLUMNS}
+
+
+def _hex_table():
+    table = np.full(256, -1, dtype=np.int16)
+    for i, char in enumerate(b"0123456789ABCDEF"):
+        table[char] = i
+    for i, char in enumerate(b"abcdef"):
+        table[char] = 10 + i
+    return table
+
+
+def _weight_table():
+    """
+    Integer place value of each character of a field, indexed by
+    [position of the decimal point, field width, column]; a point at the field
+    width means there is none. The point itself is skipped, so the digits of a
+    field read as an exact integer mantissa.
+    """
+    dots = np.arange(MAX_FIELD + 1)[:, None, None]
+    widths = np.arange(MAX_FIELD + 1)[None, :, None]
+    columns = np.arange(MAX_FIELD)[None, None, :]
+    places = widths - 1 - columns - ((columns < dots) & (dots < widths))
+    weights = 10 ** np.maximum(places, 0).astype(np.int64)
+    return np.where((columns < widths) & (columns != dots), weights, 0)
+
+
+_HEX = _hex_table() if np is not None else None
+_WEIGHTS = _weight_table() if np is not None else None
+_POWERS = 10 ** np.arange(MAX_FIELD + 1, dtype=np.int64) if np is not None else None
+
+
+def _decimals(buf, starts, ends):
+    """
+    Reads decimal fields (e.g. b'5236.1234', b'-12.5') in one vectorized pass.
+
+    Args:
+        buf (numpy.ndarray): uint8 view of the data.
+        starts (numpy.ndarray): Field start offsets.
+        ends (numpy.ndarray): Field end offsets (exclusive).
+
+    Returns:
+        tuple: (int64 mantissas, int64 divisors, mask of fields with digits);
+               each value is mantissa / divisor, exactly as written.
+    """
+    widths = np.minimum(ends - starts, MAX_FIELD)
+    width = int(widths.max()) if len(widths) else 0
+    if width <= 0:
+        zeros = np.zeros(len(starts), dtype=np.int64)
+        return zeros, zeros + 1, zeros.astype(bool)
+
+    # One row of `width` bytes per field; the few fields closer than that to the
+    # end of the buffer are read from an earlier window and shifted into place
+    rows = np.minimum(starts, len(buf) - width)
+    chars = np.lib.stride_tricks.sliding_window_view(buf, width)[rows]
+    for row in np.flatnonzero(rows != starts):
+        shift = starts[row] - rows[row]
+        chars[row, :width - shift] = chars[row, shift:].copy()
+    inside = np.arange(width) < widths[:, None]
+    digits = chars - ord("0")  # uint8: anything that is not a digit wraps past 9
+    is_digit = (digits < 10) & inside
+    is_dot = (chars == ord(".")) & inside
+    dots = np.where(is_dot.any(axis=1), is_dot.argmax(axis=1), widths)
+
+    mantissas = np.einsum("ij,ij->i", digits * is_digit, _WEIGHTS[dots, widths, :width], dtype=np.int64)
+    mantissas[chars[:, 0] == ord("-")] *= -1
+    divisors = _POWERS[np.maximum(widths - dots - 1, 0)]
+    return mantissas, divisors, is_digit.any(axis=1)
+
+
+class _Lines:
+    """
+    Field access for a set of sentences in a buffer.
+    """
+
+    def __init__(self, buf, commas, first, count, body_ends):
+        self.buf = buf
+        self.commas = commas
+        self.first = first  # Index of each sentence's first comma
+        self.count = count
+        self.body_ends = body_ends
+
+    def field(self, number):
+        """
+        Returns (starts, ends) of field `number` (1 = after the first comma);
+        missing fields are empty.
+        """
+        last = len(self.commas) - 1
+        starts = self.commas[np.clip(self.first + number - 1, 0, last)] + 1
+        ends = np.where(number < self.count, self.commas[np.clip(self.first + number, 0, last)], self.body_ends)
+        return starts, np.where(number <= self.count, ends, starts)
+
+    def number(self, number):
+        """Returns a decimal field as float64 (NaN if empty)."""
+        mantissas, divisors, present = _decimals(self.buf, *self.field(number))
+        return np.where(present, mantissas / divisors, np.nan)
+
+    def char(self, number):
+        """Returns the first character of a field as an int (0 if empty)."""
+        starts, ends = self.field(number)
+        return np.where(ends > starts, self.buf[np.minimum(starts, len(self.buf) - 1)], 0)
+
+    def degrees(self, number):
+        """Converts a ddmm.mmmm / dddmm.mmmm field and its hemisphere field to decimal degrees."""
+        mantissas, divisors, present = _decimals(self.buf, *self.field(number))
+        whole = mantissas // (100 * divisors)
+        decimal = np.where(present, whole + (mantissas - whole * 100 * divisors) / divisors / 60, np.nan)
+        hemisphere = self.char(number + 1)
+        return np.where((hemisphere == ord("S")) | (hemisphere == ord("W")), -decimal, decimal)
+
+    def seconds(self, number):
+        """Converts an hhmmss.sss field to seconds since midnight."""
+        mantissas, divisors, present = _decimals(self.buf, *self.field(number))
+        hours = mantissas // (10000 * divisors)
+        minutes = mantissas // (100 * divisors) - hours * 100
+        seconds = (mantissas - (hours * 10000 + minutes * 100) * divisors) / divisors
+        return np.where(present, hours * 3600 + minutes * 60 + seconds, np.nan)
+
+
+def _parse_chunk(buf, validate):
+    """
+    Decodes the GGA, RMC and VTG sentences of a buffer of whole lines.
+
+    Returns:
+        tuple: (dict of per-sentence columns in file order, number of sentences
+               dropped for bad checksums).
+    """
+    size = len(buf)
+    newlines = np.flatnonzero(buf == ord("\n"))
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.append(newlines, size)
+    ends -= (ends > starts) & (buf[np.maximum(ends - 1, 0)] == ord("\r"))
+    sentence = (ends - starts > 6) & (buf[np.minimum(starts, size - 1)] == ord("$"))
+    starts, ends = starts[sentence], ends[sentence]
+    if not len(starts):
+        return _empty_columns(), 0
+    star = ends - 3  # Sentences end in '*hh'
+    has_star = buf[star] == ord("*")
+    body_ends = np.where(has_star, star, ends)
+
+    head = buf[np.minimum(starts[:, None] + np.arange(3, 6), size - 1)].astype(np.int32)
+    kind = (head[:, 0] << 16) | (head[:, 1] << 8) | head[:, 2]
+    wanted = (kind == _GGA) | (kind == _RMC) | (kind == _VTG)
+
+    invalid = 0
+    if validate:
+        # XOR of every byte between '$' and '*', one reduceat over the whole chunk
+        bounds = np.column_stack((starts + 1, body_ends)).ravel()
+        if bounds[-1] >= size:
+            bounds = bounds[:-1]
+        checksums = np.bitwise_xor.reduceat(buf, np.minimum(bounds, size - 1))[::2]
+        high = _HEX[buf[star + 1]]
+        low = _HEX[buf[star + 2]]
+        valid = has_star & (high >= 0) & (low >= 0) & (checksums == high * 16 + low)
+        invalid = int(np.count_nonzero(wanted & ~valid))
+        wanted &= valid
+
+    starts, body_ends, kind = starts[wanted], body_ends[wanted], kind[wanted]
+    commas = np.flatnonzero(buf == ord(","))
+    columns = _empty_columns(len(starts))
+    if not len(starts) or not len(commas):
+        return columns, invalid
+
+    first = np.searchsorted(commas, starts)
+    count = np.searchsorted(commas, body_ends) - first
+    for code in (_GGA, _RMC, _VTG):
+        rows = np.flatnonzero(kind == code)
+        if not len(rows):
+            continue
+        lines = _Lines(buf, commas, first[rows], count[rows], body_ends[rows])
+        if code == _GGA:
+            columns["time"][rows] = lines.seconds(1)
+            columns["lat"][rows] = lines.degrees(2)
+            columns["lon"][rows] = lines.degrees(4)
+            columns["quality"][rows] = lines.number(6)
+        elif code == _RMC:
+            columns["time"][rows] = lines.seconds(1)
+            status = lines.char(2)
+            columns["quality"][rows] = np.where(status == ord("A"), 1.0, np.where(status == ord("V"), 0.0, np.nan))
+            columns["lat"][rows] = lines.degrees(3)
+            columns["lon"][rows] = lines.degrees(5)
+            columns["speed"][rows] = lines.number(7) * 1.852  # knots -> km/h
+            columns["heading"][rows] = lines.number(8)
+        else:
+            columns["heading"][rows] = lines.number(1)
+            columns["speed"][rows] = lines.number(7)
+    return columns, invalid
+
+
+def _merge_epochs(columns, invalid):
+    """
+    Merges per-sentence columns into one row per epoch (last value wins).
+    """
+    times = columns["time"]
+    timed = np.where(~np.isnan(times), np.arange(len(times)), -1)
+    owner = np.maximum.accumulate(timed) if len(timed) else timed  # VTG takes the time before it
+    keep = owner >= 0
+    owner = owner[keep]
+    times = times[owner]
+
+    if not len(times):
+        empty = np.empty(0)
+        return NmeaTrack(empty, empty, empty, empty, empty, np.empty(0, dtype=np.int8), invalid)
+
+    new_epoch = np.ones(len(times), dtype=bool)
+    new_epoch[1:] = times[1:] != times[:-1]
+    epoch = np.cumsum(new_epoch) - 1
+    epochs = int(epoch[-1]) + 1
+
+    merged = {}
+    for name in ("lat", "lon", "speed", "heading", "quality"):
+        values = columns[name][keep]
+        present = ~np.isnan(values)
+        rows, values = epoch[present], values[present]
+        last = np.ones(len(rows), dtype=bool)
+        last[:-1] = rows[1:] != rows[:-1]
+        merged[name] = np.full(epochs, np.nan)
+        merged[name][rows[last]] = values[last]
+
+    epoch_times = times[new_epoch]
+    rollovers = np.cumsum(np.diff(epoch_times, prepend=epoch_times[0]) < -43200)
+    quality = np.nan_to_num(merged.pop("quality"), nan=-1).astype(np.int8)
+    return NmeaTrack(epoch_times + rollovers * 86400.0, quality=quality, invalid=invalid, **merged)
+
+
+def parse_nmea(path, validate=True, workers=None):
+    """
+    Parses an NMEA log into an `NmeaTrack`.
+
+    The file is memory-mapped and decoded in chunks of whole lines with NumPy
+    array operations; no Python code runs per sentence. Chunks are parsed on a
+    thread pool, since NumPy releases the GIL for the bulk of the work. GGA,
+    RMC and VTG sentences from any talker (GP, GN, GL, ...) are read, the rest
+    is skipped.
+
+    Args:
+        path (str): NMEA file.
+        validate (bool): Drop sentences with a missing or wrong checksum.
+        workers (int): Parser threads; defaults to the number of CPUs.
+
+    Returns:
+        NmeaTrack: The decoded track.
+
+    Raises:
+        RuntimeError: If NumPy is not installed.
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required for the vectorized NMEA parser")
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return _merge_epochs(_empty_columns(), 0)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            bounds = []
+            offset = 0
+            while offset < size:
+                end = min(offset + CHUNK_BYTES, size)
+                if end < size:
+                    cut = mm.rfind(b"\n", offset, end)
+                    end = cut + 1 if cut >= offset else end
+                bounds.append((offset, end))
+                offset = end
+
+            buf = np.frombuffer(mm, dtype=np.uint8)
+
+            def parse(bound):
+                return _parse_chunk(buf[bound[0]:bound[1]], validate)
+
+            try:
+                workers = min(len(bounds), workers or os.cpu_count() or 1)
+                if workers > 1:
+                    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nmea-chunk") as pool:
+                        parts = list(pool.map(parse, bounds))
+                else:
+                    parts = [parse(bound) for bound in bounds]
+            finally:
+                del buf, parse  # Release the views before the map closes
+
+    columns = {name: np.concatenate([part[0][name] for part in parts]) for name in NmeaTrack.COLUMNS}
+    return _merge_epochs(columns, sum(part[1] for part in parts))
+
+
+def load_track(path, cache_dir=".cache/nmea", validate=True, logger=None):
+    """
+    Returns the parsed track of an NMEA log, from the `.npz` cache when the
+    log is unchanged (same size and mtime) and parsing it otherwise.
+
+    Args:
+        path (str): NMEA file.
+        cache_dir (str): Folder for cached tracks; None disables caching.
+        validate (bool): Drop sentences with a missing or wrong checksum.
+        logger (Logger): Optional logger for cache problems.
+
+    Returns:
+        NmeaTrack: The decoded track.
+    """
+    stat = os.stat(path)
+    cache_path = None
+    if cache_dir:
+        key = hashlib.sha1(f"{os.path.abspath(path)}:{validate}".encode()).hexdigest()
+        cache_path = os.path.join(cache_dir, f"{key}.npz")
+        try:
+            with np.load(cache_path) as cached:
+                version, size, mtime_ns, invalid = (int(value) for value in cached["meta"])
+                if (version, size, mtime_ns) == (CACHE_VERSION, stat.st_size, stat.st_mtime_ns):
+                    return NmeaTrack(*(cached[name] for name in NmeaTrack.COLUMNS), invalid=invalid)
+        except (OSError, KeyError, ValueError):
+            pass
+
+    track = parse_nmea(path, validate)
+    if cache_path:
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            meta = np.array([CACHE_VERSION, stat.st_size, stat.st_mtime_ns, track.invalid], dtype=np.int64)
+            np.savez(tmp_path, meta=meta, **{name: getattr(track, name) for name in NmeaTrack.COLUMNS})
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            if logger is not None:
+                logger.warn("Could not write NMEA cache %s: %s", cache_path, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return track